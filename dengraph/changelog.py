@@ -0,0 +1,185 @@
+from __future__ import absolute_import
+import os
+import pickle
+import struct
+
+import dengraph.dengraph
+
+try:
+    _replace = os.replace
+except AttributeError:  # pragma: no cover
+    _replace = os.rename
+
+# length of each record
+_RECORD_HEADER = struct.Struct('<I')
+# generation of logs and snapshots, incremented on every compaction
+_GENERATION = struct.Struct('<Q')
+
+
+class ChangeLog(object):
+    """
+    Append-only log of all changes to a :py:class:`~dengraph.dengraph.DenGraphIO`
+
+    :param path: path of the log file, which is created if it does not exist
+    :param sync: whether to :py:func:`os.fsync` the log after every record
+
+    A log is attached by setting it as the
+    :py:attr:`~dengraph.dengraph.DenGraphIO.change_log` of a clustering.
+    Every change via item assignment, item deletion and
+    :py:meth:`~dengraph.dengraph.DenGraphIO.update` is then appended as a
+    record before the operation returns. Nodes and values must be picklable.
+
+    Together with a snapshot, the log allows to rebuild the clustering after
+    a crash without clustering from scratch:
+
+    .. code:: python
+
+        # initially
+        io_graph = DenGraphIO(base_graph, cluster_distance, core_neighbours)
+        io_graph.change_log = ChangeLog('clustering.log')
+        io_graph.change_log.compact(io_graph, 'clustering.snapshot')
+        # after a crash
+        io_graph = ChangeLog.recover(base_graph, 'clustering.snapshot', 'clustering.log')
+        io_graph.change_log = ChangeLog('clustering.log')
+
+    The base graph must be in the same state as when the snapshot was taken,
+    as replaying the log also applies all changes to the graph. Use
+    :py:meth:`compact` to periodically store a snapshot and clear the log.
+
+    Each record is written with its length, so that a record which was only
+    partially written before a crash is detected and ignored when reading.
+    Logs and snapshots written by :py:meth:`compact` share a generation
+    number. A log is only replayed by :py:meth:`recover` on a snapshot of the
+    same generation, so that a crash during compaction does not apply
+    changes twice.
+    """
+    def __init__(self, path, sync=False):
+        self.path = path
+        self.sync = sync
+        self._file = open(path, 'a+b')
+        self._file.seek(0)
+        header = self._file.read(_GENERATION.size)
+        if len(header) < _GENERATION.size:
+            self._reset(0)
+        else:
+            self.generation, = _GENERATION.unpack(header)
+            # drop a partially written record, so that new records can be read
+            end = _GENERATION.size
+            for _ in _read_records(self._file):
+                end = self._file.tell()
+            self._file.truncate(end)
+
+    def _reset(self, generation):
+        """Remove all records and start a new `generation`"""
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(_GENERATION.pack(generation))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.generation = generation
+
+    def record(self, *change):
+        """Append a change, such as `('set', key, value)`, `('del', item)` or `('update', add, remove)`"""
+        data = pickle.dumps(change, protocol=2)
+        self._file.write(_RECORD_HEADER.pack(len(data)) + data)
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+
+    def compact(self, io_graph, snapshot_path):
+        """
+        Store a snapshot of `io_graph` and remove all records from the log
+
+        The snapshot is written to a temporary file which replaces
+        `snapshot_path` only when complete. A crash never leaves behind an
+        incomplete snapshot.
+        """
+        generation = self.generation + 1
+        temp_path = snapshot_path + '.tmp'
+        with open(temp_path, 'wb') as snapshot:
+            snapshot.write(_GENERATION.pack(generation))
+            io_graph.snapshot(snapshot)
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        _replace(temp_path, snapshot_path)
+        self._reset(generation)
+
+    def close(self):
+        """Close the log file"""
+        self._file.close()
+
+    @staticmethod
+    def read(path):
+        """Yield all complete changes recorded in the log at `path`"""
+        with open(path, 'rb') as log_file:
+            log_file.seek(_GENERATION.size)
+            for data in _read_records(log_file):
+                yield pickle.loads(data)
+
+    @classmethod
+    def replay(cls, io_graph, path):
+        """
+        Apply all changes recorded in the log at `path` to `io_graph`
+
+        :return: the number of changes applied
+
+        Changes are not recorded to the :py:attr:`~dengraph.dengraph.DenGraphIO.change_log`
+        of `io_graph` while replaying.
+        """
+        change_log, io_graph.change_log = io_graph.change_log, None
+        count = 0
+        try:
+            for change in cls.read(path):
+                operation = change[0]
+                if operation == 'set':
+                    io_graph[change[1]] = change[2]
+                elif operation == 'del':
+                    del io_graph[change[1]]
+                elif operation == 'update':
+                    io_graph.update(add=change[1], remove=change[2])
+                else:
+                    raise ValueError('unknown change %r in %r' % (operation, path))
+                count += 1
+        finally:
+            io_graph.change_log = change_log
+        return count
+
+    @classmethod
+    def recover(cls, base_graph, snapshot_path, path, io_graph_type=None):
+        """
+        Restore a clustering from a snapshot and replay the log at `path`
+
+        :param base_graph: the underlying graph, in the state when the snapshot was taken
+        :param snapshot_path: path of the snapshot written by :py:meth:`compact`
+        :param path: path of the log
+        :param io_graph_type: class of the clustering, default :py:class:`~dengraph.dengraph.DenGraphIO`
+        """
+        io_graph_type = io_graph_type if io_graph_type is not None else dengraph.dengraph.DenGraphIO
+        with open(snapshot_path, 'rb') as snapshot:
+            generation, = _GENERATION.unpack(snapshot.read(_GENERATION.size))
+            io_graph = io_graph_type.restore(base_graph, snapshot)
+        try:
+            with open(path, 'rb') as log_file:
+                log_generation, = _GENERATION.unpack(log_file.read(_GENERATION.size))
+        except (IOError, OSError, struct.error):
+            return io_graph
+        # the log of an older generation is already contained in the snapshot
+        if log_generation == generation:
+            cls.replay(io_graph, path)
+        return io_graph
+
+    def __repr__(self):
+        return '%s(path=%r, sync=%r)' % (self.__class__.__name__, self.path, self.sync)
+
+
+def _read_records(log_file):
+    """Yield the data of all complete records from the current position of `log_file`"""
+    while True:
+        header = log_file.read(_RECORD_HEADER.size)
+        if len(header) < _RECORD_HEADER.size:
+            return
+        size, = _RECORD_HEADER.unpack(header)
+        data = log_file.read(size)
+        if len(data) < size:
+            return
+        yield data
@@ -102,9 +102,10 @@ class DenGraphCluster(dengraph.graph.Graph):
             if self == other:
                 return self
             self.core_nodes.update(other.core_nodes)
-            self.border_nodes.update(other.border_nodes)
             # ensure that none of the core nodes are in list of border nodes
-            self.border_nodes = self.border_nodes - self.core_nodes
+            # only check the nodes of other, instead of all our own nodes
+            self.border_nodes.difference_update(other.core_nodes)
+            self.border_nodes.update(node for node in other.border_nodes if node not in self.core_nodes)
             return self
         return NotImplemented
 
@@ -1,7 +1,17 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import
+import array
+import collections
+import itertools
+import multiprocessing
+import pickle
+import struct
+import sys
+
 import dengraph.graph
 import dengraph.cluster
+import dengraph.primitives.disjointset
+import dengraph.compat
 import dengraph.utilities.pretty
 
 
@@ -9,6 +19,61 @@ class NoSuchCluster(Exception):
     pass
 
 
+def _chunks(iterable, size):
+    """Split `iterable` into lists of at most `size` elements"""
+    iterator = iter(iterable)
+    chunk = list(itertools.islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(iterator, size))
+
+
+#: state of worker processes for parallel clustering
+_WORKER_STATE = {}
+
+# magic and version of snapshots
+_SNAPSHOT_HEADER = struct.Struct('<10sI')
+_SNAPSHOT_MAGIC = b'DENGRAPHIO'
+_SNAPSHOT_VERSION = 1
+
+
+def _init_core_worker(graph, cluster_distance, core_neighbours):
+    """Prepare a worker process for finding core nodes"""
+    _WORKER_STATE['graph'] = graph
+    _WORKER_STATE['cluster_distance'] = cluster_distance
+    _WORKER_STATE['core_neighbours'] = core_neighbours
+
+
+def _core_neighbours_worker(nodes):
+    """Get the neighbours of all core nodes in `nodes` as `[(core_node, neighbours), ...]`"""
+    graph, core_neighbours = _WORKER_STATE['graph'], _WORKER_STATE['core_neighbours']
+    neighbourhoods = graph.get_neighbours_many(nodes, _WORKER_STATE['cluster_distance'])
+    return [
+        (node, neighbours) for node, neighbours in dengraph.compat.viewitems(neighbourhoods)
+        if len(neighbours) >= core_neighbours
+    ]
+
+
+def _pack_ids(ids, nodes):
+    """Encode the ids of `nodes` as little-endian 32 bit integers"""
+    node_ids = array.array('i', [ids[node] for node in nodes])
+    if sys.byteorder == 'big':  # pragma: no cover
+        node_ids.byteswap()
+    return node_ids.tobytes() if hasattr(node_ids, 'tobytes') else node_ids.tostring()
+
+
+def _unpack_ids(nodes, data):
+    """Decode the nodes encoded by :py:func:`_pack_ids`"""
+    node_ids = array.array('i')
+    if hasattr(node_ids, 'frombytes'):
+        node_ids.frombytes(data)
+    else:  # pragma: no cover
+        node_ids.fromstring(data)
+    if sys.byteorder == 'big':  # pragma: no cover
+        node_ids.byteswap()
+    return [nodes[node_id] for node_id in node_ids]
+
+
 class DenGraphIO(dengraph.graph.Graph):
     """
     Density Graph Clustering allowing for Overlap and Incremental updates.
@@ -16,32 +81,104 @@ class DenGraphIO(dengraph.graph.Graph):
     :param base_graph: the underlying graph
     :param cluster_distance: maximum distance for nodes to be considered as neighbours (ε)
     :param core_neighbours: number of neighbours required for core nodes (η)
+    :param processes: number of processes for the initial clustering, or `None` for one per CPU
+
+    During the initial clustering, neighbourhoods are queried for
+    :py:attr:`chunk_size` nodes at once via
+    :py:meth:`~dengraph.graph.Graph.get_neighbours_many`. Core nodes are
+    connected into clusters via a disjoint set as their neighbourhoods arrive.
+
+    If `processes` is not `1`, the neighbourhoods of all nodes are computed in
+    a :py:class:`multiprocessing.Pool` for the initial clustering. The result
+    is the same as for sequential clustering. The `base_graph` and its nodes
+    must be picklable to be sent to worker processes.
+
+    The clustering can be stored via :py:meth:`snapshot` and recreated via
+    :py:meth:`restore`, which skips the initial clustering. All later changes
+    can be recorded by setting a :py:attr:`change_log`.
     """
+    #: number of nodes to query for neighbours at once during the initial clustering
+    chunk_size = 1024
+    #: optional :py:class:`~dengraph.changelog.ChangeLog` recording all changes
+    change_log = None
 
-    def __init__(self, base_graph, cluster_distance, core_neighbours):
+    def __init__(self, base_graph, cluster_distance, core_neighbours, processes=1):
         """
         :param base_graph: the underlying graph
         :param cluster_distance: eta
         :param core_neighbours: epsilon
+        :param processes: number of processes for initial clustering
         """
         if not base_graph.symmetric:
             raise ValueError('undefined behaviour for unsymmetric graphs')
         self.graph = base_graph
         self.cluster_distance = cluster_distance
         self.core_neighbours = core_neighbours
-        self.clusters = []
-        self.noise = set()
+        self.processes = processes
         self._init_cluster()
 
-    def _merge_clusters(self, base_cluster, cluster):
-        if len(base_cluster) > len(cluster):
-            base_cluster, cluster = cluster, base_cluster
-        base_cluster += cluster
-        if base_cluster != cluster:
-            try:
-                self.clusters.remove(cluster)
-            except ValueError:
-                pass
+    @property
+    def clusters(self):
+        """
+        List of all clusters, sorted by size
+
+        The list is sorted only when requested after the clustering has
+        changed. It must not be modified.
+        """
+        if self._ordered_clusters is None:
+            # sort clusters by length to reduce '__contains__' checks
+            # having big clusters first means on average, searched elements are
+            # more likely to be in earlier containers.
+            self._ordered_clusters = sorted(self._clusters, key=len)
+        return self._ordered_clusters
+
+    def _index_cluster(self, cluster):
+        """Register all nodes of `cluster` in the node to cluster lookup tables"""
+        for node in cluster.core_nodes:
+            self._core_cluster[node] = cluster
+        for node in cluster:
+            self._node_clusters.setdefault(node, set()).add(cluster)
+
+    def _unindex_cluster(self, cluster):
+        """Remove all nodes of `cluster` from the node to cluster lookup tables"""
+        for node in cluster.core_nodes:
+            if self._core_cluster.get(node) is cluster:
+                del self._core_cluster[node]
+        for node in cluster:
+            self._unindex_node(node, cluster)
+
+    def _unindex_node(self, node, cluster):
+        """Remove `node` from the lookup tables for `cluster`"""
+        try:
+            node_clusters = self._node_clusters[node]
+        except KeyError:
+            return
+        node_clusters.discard(cluster)
+        if not node_clusters:
+            del self._node_clusters[node]
+
+    def _merge_clusters(self, base_cluster, *clusters):
+        """
+        Merge several clusters into one, returning the merged cluster
+
+        All clusters are merged into the biggest one, so only the nodes of the
+        smaller clusters must be moved and reindexed.
+        """
+        clusters = {id(cluster): cluster for cluster in clusters if cluster is not base_cluster}
+        if not clusters:
+            return base_cluster
+        clusters[id(base_cluster)] = base_cluster
+        base_cluster = max(dengraph.compat.viewvalues(clusters), key=len)
+        del clusters[id(base_cluster)]
+        for cluster in dengraph.compat.viewvalues(clusters):
+            for node in cluster.core_nodes:
+                self._core_cluster[node] = base_cluster
+            for node in cluster:
+                node_clusters = self._node_clusters[node]
+                node_clusters.discard(cluster)
+                node_clusters.add(base_cluster)
+            base_cluster += cluster
+            self._clusters.pop(cluster, None)
         return base_cluster
 
     def core_cluster_for_node(self, core_node):
@@ -52,10 +189,10 @@ class DenGraphIO(dengraph.graph.Graph):
         :return: Cluster that nas node as a core node
         :raise: NoSuchCluster
         """
-        for cluster in self.clusters:
-            if core_node in cluster.core_nodes:
-                return cluster
-        raise NoSuchCluster
+        try:
+            return self._core_cluster[core_node]
+        except KeyError:
+            raise NoSuchCluster
 
     def clusters_for_node(self, node):
         """
@@ -64,53 +201,20 @@ class DenGraphIO(dengraph.graph.Graph):
         :param node: the node to check clusters for
         :return: Cluster generator
         """
-        for cluster in self.clusters:
-            if node in cluster:
-                yield cluster
+        # copy the clusters, as the caller may modify the clustering while iterating
+        for cluster in tuple(self._node_clusters.get(node, ())):
+            yield cluster
 
     def _add_node_to_cluster(self, node, cluster, state):
         """Mark a node as belonging to a specific cluster"""
         cluster.categorize_node(node, state)
+        if state == cluster.CORE_NODE:
+            self._core_cluster[node] = cluster
+        elif self._core_cluster.get(node) is cluster:
+            del self._core_cluster[node]
+        self._node_clusters.setdefault(node, set()).add(cluster)
         self.noise.discard(node)
 
-    def _test_change_to_core(self, node):
-        """
-        Method determines if a given node does become a core node. This method returns False,
-        if the node is already a core node.
-
-        :param node: The node to check
-        :return: True, if node changes to core node, False otherwise
-        """
-        result = False
-        # determine the neighbours of current node
-        neighbours = set(self.graph.get_neighbours(node, self.cluster_distance))
-        try:
-            cluster = self.core_cluster_for_node(core_node=node)
-        except NoSuchCluster:
-            result = len(neighbours) >= self.core_neighbours
-            for neighbour in neighbours:
-                try:
-                    cluster = self.core_cluster_for_node(neighbour)
-                    break
-                except NoSuchCluster:
-                    pass
-            else:
-                cluster = None
-        # return the current result and also the neighbours for further reference
-        return result, cluster, neighbours
-
-    def _test_change_from_core(self, node):
-        result = False
-        neighbours = set(self.graph.get_neighbours(node, self.cluster_distance))
-        try:
-            cluster = self.core_cluster_for_node(core_node=node)
-        except NoSuchCluster:
-            # node was no core before, so False is returned
-            cluster = None
-        else:
-            result = len(neighbours) < self.core_neighbours
-        return result, cluster, neighbours
-
     # TODO: to be changed
     def _recluster(self, cluster):
         clustering = DenGraphIO(
@@ -119,192 +223,435 @@ class DenGraphIO(dengraph.graph.Graph):
             core_neighbours=self.core_neighbours
         )
         self.noise.update(clustering.noise)
-        self.clusters.remove(cluster)
-        self.clusters.extend(clustering.clusters)
+        del self._clusters[cluster]
+        self._unindex_cluster(cluster)
+        for new_cluster in clustering.clusters:
+            self._index_cluster(new_cluster)
+            self._clusters[new_cluster] = None
+        self._ordered_clusters = None
 
     def _cluster_removed(self, cluster):
         for node in cluster.border_nodes:
-            clusters = self.clusters_for_node(node=node)
-            try:
-                # check whether there is at least one additional cluster containing node
-                next(clusters)
-                next(clusters)
-            except StopIteration:
+            # check whether there is at least one additional cluster containing node
+            if len(self._node_clusters.get(node, ())) <= 1:
                 self.noise.add(node)
-        try:
-            self.clusters.remove(cluster)
-        except ValueError:
-            pass
+        if cluster in self._clusters:
+            del self._clusters[cluster]
+            self._unindex_cluster(cluster)
 
     def _cluster_added(self, cluster):
         for node in cluster:
             self.noise.discard(node)
-        self.clusters.append(cluster)
-
-    def _validate_cluster(self, cluster, nodes, base=None):
-        unchecked, checked = set(nodes), set(nodes)
-        tmp_cluster = dengraph.cluster.DenGraphCluster(graph=self.graph)
-        while unchecked:
-            checking = unchecked.pop()
-            if checking == base:
-                return
-            neighbours = set(cluster.get_neighbours(node=checking,
-                                                distance=self.cluster_distance))
-            if len(neighbours) >= self.core_neighbours:
-                tmp_cluster.categorize_node(checking, tmp_cluster.CORE_NODE)
-                self._expand_unchecked(unchecked=unchecked, checked=checked, neighbours=neighbours)
-            elif neighbours:
-                tmp_cluster.categorize_node(checking, tmp_cluster.BORDER_NODE)
-        return tmp_cluster
-
-    def _remove_noise(self, candidates):
-        for candidate in candidates:
-            clusters = self.clusters_for_node(node=candidate)
-            try:
-                # noise is contained in no clusters
-                next(clusters)
-            except StopIteration:
-                self.noise.add(candidate)
-
-    def _edge_removed(self, node):
-        is_downgraded, cluster, _ = self._test_change_from_core(node=node)
-        if is_downgraded:
-            self._add_node_to_cluster(node=node, cluster=cluster, state=cluster.BORDER_NODE)
-            if not cluster.core_nodes:
-                # remove cluster
-                self._cluster_removed(cluster=cluster)
-
-    def _check_cluster(self, nodes, core_cluster):
-        missing = set(nodes)
-        try:
-            new_cluster = self._validate_cluster(cluster=core_cluster, nodes=[missing.pop()])
-            missing -= new_cluster.core_nodes
-            noise = core_cluster.core_nodes.union(core_cluster.border_nodes) - \
-                new_cluster.core_nodes - new_cluster.border_nodes
-            while missing:
-                split_cluster = self._validate_cluster(cluster=core_cluster, nodes=[missing.pop()])
-                if split_cluster.core_nodes:
-                    self._cluster_added(split_cluster)
-                    noise -= split_cluster.core_nodes.union(split_cluster.border_nodes)
-                    missing -= split_cluster.core_nodes
-            self._cluster_removed(cluster=core_cluster)
-            if new_cluster.core_nodes:
-                self._cluster_added(new_cluster)
-            self._remove_noise(candidates=noise)
-        except KeyError:
-            if len(core_cluster.core_nodes) <= 1:
-                self._cluster_removed(core_cluster)
-
-    def _node_removed(self, node, neighbours):
-        if node not in self.noise:
-            for neighbour in neighbours:
-                del self.graph[node:neighbour]
-                self._edge_removed(node=neighbour)
-            cluster = self.core_cluster_for_node(core_node=node)
-            self._check_cluster(
-                nodes=[neighbour for neighbour in neighbours if neighbour in cluster.core_nodes],
-                core_cluster=cluster)
+        self._clusters[cluster] = None
+        self._index_cluster(cluster)
+
+    def _downgraded_cores(self, nodes):
+        """Get all core nodes of `nodes` which no longer have enough neighbours to be core nodes"""
+        cores = [node for node in nodes if node in self._core_cluster]
+        if not cores:
+            return []
+        neighbour_counts = self.graph.neighbour_counts(cores, self.cluster_distance)
+        return [node for node in cores if neighbour_counts[node] < self.core_neighbours]
+
+    def _node_removed(self, node):
+        """
+        Remove a node from all clusters
+
+        :param node: the node that was just removed from the graph
+        :return: all clusters of which `node` was a core node
+        """
         self.noise.discard(node)
+        damaged = set()
+        for cluster in self.clusters_for_node(node):
+            if node in cluster.core_nodes:
+                damaged.add(cluster)
+            cluster.core_nodes.discard(node)
+            cluster.border_nodes.discard(node)
+        self._core_cluster.pop(node, None)
+        self._node_clusters.pop(node, None)
+        return damaged
+
+    def _connections_removed(self, nodes, damaged):
+        """
+        Update the clustering after some nodes have lost neighbours
+
+        :param nodes: all nodes which have lost neighbours
+        :param damaged: clusters which have lost a core node or an edge between core nodes
+
+        Only the neighbourhoods of nodes changing state are inspected. Damaged
+        clusters are checked for splits by searching outwards from the core
+        nodes which may have been disconnected, see :py:meth:`_split_cluster`.
+        """
+        self._ordered_clusters = None
+        candidates = set(nodes)  # nodes which may have lost their connection to a cluster
+        for node in self._downgraded_cores(nodes):
+            cluster = self._core_cluster.pop(node)
+            cluster.categorize_node(node, cluster.BORDER_NODE)
+            damaged.add(cluster)
+            candidates.update(self.graph.get_neighbours(node, self.cluster_distance))
+        for cluster in damaged:
+            seeds = [node for node in candidates if self._core_cluster.get(node) is cluster]
+            candidates.update(self._split_cluster(cluster, seeds))
+        self._check_borders(candidates)
+
+    def _split_cluster(self, cluster, seeds):
+        """
+        Split off all parts of `cluster` which are no longer connected
+
+        :param cluster: the cluster which may have been split
+        :param seeds: core nodes of `cluster` which may have been disconnected from each other
+        :return: the border nodes of all split off clusters
+
+        A separate breadth-first search over core nodes is started from each
+        seed, always expanding the search which has reached the fewest nodes.
+        Searches meeting each other are joined. Once all remaining searches are joined,
+        the rest of `cluster` is known to be connected and is not traversed.
+        A search running out of nodes before meeting the others has found a
+        disconnected part, which becomes a new cluster.
+        """
+        if not cluster.core_nodes:
+            self._cluster_removed(cluster)
+            return set()
+        searches = dengraph.primitives.disjointset.DisjointSet(seeds)
+        origins = {seed: seed for seed in seeds}  # {core node: search which reached it first}
+        frontiers = {seed: collections.deque([seed]) for seed in seeds}  # {search: core nodes to expand}
+        core_nodes = {seed: {seed} for seed in seeds}  # {search: core nodes reached}
+        border_nodes = {seed: set() for seed in seeds}  # {search: border nodes reached}
+        split_border_nodes = set()
+        while len(frontiers) > 1:
+            search = min(frontiers, key=lambda key: len(core_nodes[key]))
+            node = frontiers[search].popleft()
+            for neighbour in self.graph.get_neighbours(node, self.cluster_distance):
+                if self._core_cluster.get(neighbour) is not cluster:
+                    border_nodes[search].add(neighbour)
+                elif neighbour not in origins:
+                    origins[neighbour] = search
+                    core_nodes[search].add(neighbour)
+                    frontiers[search].append(neighbour)
+                else:
+                    other = searches.find(origins[neighbour])
+                    if other != search:
+                        search = self._join_searches(
+                            searches, search, other, frontiers, core_nodes, border_nodes
+                        )
+            if not frontiers[search]:
+                # the search is exhausted without meeting the remaining searches
+                del frontiers[search]
+                split_cluster = dengraph.cluster.DenGraphCluster(
+                    self.graph, core_nodes=core_nodes.pop(search), border_nodes=border_nodes.pop(search)
+                )
+                cluster.core_nodes.difference_update(split_cluster.core_nodes)
+                for node in split_cluster.core_nodes:
+                    self._unindex_node(node, cluster)
+                self._cluster_added(split_cluster)
+                split_border_nodes.update(split_cluster.border_nodes)
+        return split_border_nodes
 
-    def _merge_neighbours(self, neighbours, cluster):
-        for neighbour in neighbours:
-            try:
-                neighbouring_cluster = self.core_cluster_for_node(core_node=neighbour)
-                cluster = self._merge_clusters(cluster, neighbouring_cluster)
-            except NoSuchCluster:
-                # node is no core
-                self._add_node_to_cluster(node=neighbour, cluster=cluster, state=cluster.BORDER_NODE)
-        return cluster
-
-    def _edge_added(self, nodes, new_node=None):
+    @staticmethod
+    def _join_searches(searches, search, other, frontiers, core_nodes, border_nodes):
+        """Join the searches `search` and `other`, returning the joined search"""
+        joined = searches.union(search, other)
+        absorbed = other if joined == search else search
+        frontiers[joined].extend(frontiers.pop(absorbed))
+        for reached in (core_nodes, border_nodes):
+            # move the smaller set into the larger one
+            if len(reached[absorbed]) > len(reached[joined]):
+                reached[absorbed], reached[joined] = reached[joined], reached[absorbed]
+            reached[joined].update(reached.pop(absorbed))
+        return joined
+
+    def _check_borders(self, nodes):
+        """Remove any of `nodes` from clusters to which they are no longer connected"""
+        nodes = [node for node in nodes if node in self._node_clusters and node not in self._core_cluster]
+        if not nodes:
+            return
+        neighbourhoods = self.graph.get_neighbours_many(nodes, self.cluster_distance)
         for node in nodes:
-            becomes_core, cluster, neighbours = self._test_change_to_core(node=node)
-            if becomes_core:
-                if cluster is None:
-                    cluster = dengraph.cluster.DenGraphCluster(self.graph)
-                    self.clusters.append(cluster)
+            neighbours = neighbourhoods[node]
+            for cluster in self.clusters_for_node(node):
+                if not any(self._core_cluster.get(neighbour) is cluster for neighbour in neighbours):
+                    cluster.border_nodes.discard(node)
+                    self._unindex_node(node, cluster)
+            if node not in self._node_clusters:
+                self.noise.add(node)
+
+    def _connections_added(self, neighbourhoods):
+        """
+        Update the clustering after some nodes have gained neighbours
+
+        :param neighbourhoods: mapping `{node: neighbours}` of all nodes which have gained neighbours
+
+        Nodes may only gain neighbours by being new nodes, by being neighbours
+        of new nodes, or via new edges. Any changes to cores, borders and
+        connections of clusters involve at least one of these nodes.
+        """
+        self._ordered_clusters = None
+        core_cluster = self._core_cluster
+        for node, neighbours in dengraph.compat.viewitems(neighbourhoods):
+            if node not in core_cluster and len(neighbours) >= self.core_neighbours:
+                cluster = dengraph.cluster.DenGraphCluster(self.graph)
+                self._cluster_added(cluster)
                 self._add_node_to_cluster(node=node, cluster=cluster, state=cluster.CORE_NODE)
-                self._merge_neighbours(neighbours=neighbours, cluster=cluster)
-            elif cluster and new_node:
-                self._add_node_to_cluster(node=new_node, cluster=cluster, state=cluster.BORDER_NODE)
+        # join the clusters of core nodes which are neighbours now
+        for node, neighbours in dengraph.compat.viewitems(neighbourhoods):
+            if node in core_cluster:
+                self._merge_clusters(
+                    core_cluster[node],
+                    *{core_cluster[neighbour] for neighbour in neighbours if neighbour in core_cluster}
+                )
+        for node, neighbours in dengraph.compat.viewitems(neighbourhoods):
+            if node in core_cluster:
+                cluster = core_cluster[node]
+                for neighbour in neighbours:
+                    if neighbour not in core_cluster:
+                        self._add_node_to_cluster(node=neighbour, cluster=cluster, state=cluster.BORDER_NODE)
+            else:
+                for neighbour in neighbours:
+                    if neighbour in core_cluster:
+                        cluster = core_cluster[neighbour]
+                        self._add_node_to_cluster(node=node, cluster=cluster, state=cluster.BORDER_NODE)
 
-    def _node_added(self, node):
+    def _add(self, nodes):
         """
-        Method calculates for a newly added node, how it influences the current clustering.
-        The node might become core, border, or even noise.
+        Add nodes to the graph and update the clustering
 
-        :param node: The node that was just added
+        :param nodes: mapping of new nodes to their edges
+        """
+        if not nodes:
+            return
+        for node, value in dengraph.compat.viewitems(nodes):
+            self.graph[node] = value
+        self.noise.update(node for node in nodes if node not in self._node_clusters)
+        neighbourhoods = self.graph.get_neighbours_many(nodes, self.cluster_distance)
+        # the neighbours of new nodes have gained neighbours as well
+        affected = set()
+        for neighbours in dengraph.compat.viewvalues(neighbourhoods):
+            affected.update(neighbours)
+        affected.difference_update(neighbourhoods)
+        if affected:
+            neighbourhoods.update(self.graph.get_neighbours_many(affected, self.cluster_distance))
+        self._connections_added(neighbourhoods)
+
+    def _remove(self, items):
         """
-        self.noise.add(node)
-        neighbours = set(self.graph.get_neighbours(node=node, distance=self.cluster_distance))
-        neighbours.add(node)
-        self._edge_added(neighbours, new_node=node)
+        Remove nodes and edges from the graph and update the clustering
 
-    @staticmethod
-    def _expand_unchecked(unchecked, neighbours, checked=None):
-        to_be_checked = set(neighbours) - checked
-        unchecked.update(to_be_checked)
-        checked.update(to_be_checked)
+        :param items: nodes and edges `a:b` to remove
+        """
+        nodes, edges = [], []
+        for item in items:
+            (edges if isinstance(item, slice) else nodes).append(item)
+        if not nodes and not edges:
+            return
+        damaged = set()  # clusters which lost a core node or an edge between core nodes
+        affected = set()  # nodes which lost neighbours
+        for edge in edges:
+            del self.graph[edge]
+            core_cluster = self._core_cluster.get(edge.start)
+            if core_cluster is not None and core_cluster is self._core_cluster.get(edge.stop):
+                damaged.add(core_cluster)
+            affected.update((edge.start, edge.stop))
+        neighbourhoods = self.graph.get_neighbours_many(nodes, self.cluster_distance)
+        for node, neighbours in dengraph.compat.viewitems(neighbourhoods):
+            del self.graph[node]
+            damaged.update(self._node_removed(node))
+            affected.update(neighbours)
+        affected.difference_update(neighbourhoods)
+        self._connections_removed(nodes=affected, damaged=damaged)
+
+    def update(self, add=(), remove=()):
+        """
+        Add and remove several nodes at once
+
+        :param add: nodes to add, or a mapping of nodes to add to their edges
+        :param remove: nodes and edges `a:b` to remove
+
+        All removals are applied before all additions. The resulting clustering
+        is the same as for individually removing and adding each node, e.g.
+        via ``del io_graph[node]`` and ``io_graph[node] = {}``. However, the
+        neighbourhoods of all affected nodes are queried in bulk, and clusters
+        are reconciled only once for all changes.
+        """
+        if not isinstance(add, dengraph.compat.collections_abc.Mapping):
+            add = {node: {} for node in add}
+        remove = list(remove)
+        self._remove(remove)
+        self._add(add)
+        if self.change_log is not None:
+            self.change_log.record('update', add, remove)
+
+    def snapshot(self, writable):
+        """
+        Write the parameters and clustering to a binary file
+
+        :param writable: a binary file-like object to write to
+
+        Nodes are pickled once in a node table. Clusters and noise are stored
+        as arrays of node ids. The graph is not stored.
+        """
+        nodes = list(self.graph)
+        ids = {node: node_id for node_id, node in enumerate(nodes)}
+        state = {
+            'cluster_distance': self.cluster_distance,
+            'core_neighbours': self.core_neighbours,
+            'nodes': nodes,
+            'clusters': [
+                (_pack_ids(ids, cluster.core_nodes), _pack_ids(ids, cluster.border_nodes))
+                for cluster in self._clusters
+            ],
+            'noise': _pack_ids(ids, self.noise),
+        }
+        writable.write(_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, _SNAPSHOT_VERSION))
+        pickle.dump(state, writable, protocol=2)
+
+    @classmethod
+    def restore(cls, base_graph, readable, processes=1):
+        """
+        Recreate a clustering from a snapshot without querying the graph
+
+        :param base_graph: the underlying graph, with the same nodes as when the snapshot was taken
+        :param readable: a binary file-like object to read from
+        :param processes: number of processes for reclustering
+        :raises ValueError: if `readable` is not a snapshot or does not match `base_graph`
+
+        The clustering is restored in time linear to the size of the snapshot,
+        and can be updated incrementally afterwards. The initializer of `cls`
+        is not called.
+
+        :see: :py:meth:`snapshot` for creating snapshots.
+        """
+        try:
+            magic, version = _SNAPSHOT_HEADER.unpack(readable.read(_SNAPSHOT_HEADER.size))
+        except struct.error:
+            raise ValueError('not a %s snapshot' % cls.__name__)
+        if magic != _SNAPSHOT_MAGIC or version != _SNAPSHOT_VERSION:
+            raise ValueError('not a %s snapshot of version %d' % (cls.__name__, _SNAPSHOT_VERSION))
+        state = pickle.load(readable)
+        nodes = state['nodes']
+        if len(nodes) != len(base_graph) or not all(node in base_graph for node in nodes):
+            raise ValueError('snapshot nodes do not match the nodes of the graph')
+        if not base_graph.symmetric:
+            raise ValueError('undefined behaviour for unsymmetric graphs')
+        io_graph = cls.__new__(cls)
+        io_graph.graph = base_graph
+        io_graph.cluster_distance = state['cluster_distance']
+        io_graph.core_neighbours = state['core_neighbours']
+        io_graph.processes = processes
+        io_graph._reset_clustering()
+        io_graph.noise = set(_unpack_ids(nodes, state['noise']))
+        for core_ids, border_ids in state['clusters']:
+            cluster = dengraph.cluster.DenGraphCluster(
+                base_graph, core_nodes=_unpack_ids(nodes, core_ids), border_nodes=_unpack_ids(nodes, border_ids)
+            )
+            io_graph._clusters[cluster] = None
+            io_graph._index_cluster(cluster)
+        return io_graph
+
+    def _reset_clustering(self):
+        """Remove all clusters and noise"""
+        self._clusters = collections.OrderedDict()  # {cluster: None, ...} in insertion order
+        self._ordered_clusters = None  # clusters sorted by size, or None if outdated
+        self._core_cluster = {}  # {node: cluster, ...} for all core nodes
+        self._node_clusters = {}  # {node: {cluster, cluster, ...}, ...} for all clustered nodes
+        self.noise = set()
 
     def _init_cluster(self):
         """Perform initial clustering"""
-        self.clusters = type(self.clusters)()
-        # Avoid nodes for which a decision has been made:
-        # - Core nodes can only belong to one cluster; once a node is a cluster
-        #   core node, it cannot change state.
-        # - Border nodes are treated when clusters are created, so we can skip them
-        self.noise = set(self.graph)
-        for node in self.graph:  # nodes from single iteration over graph
-            if node in self.noise:
-                neighbours = set(self.graph.get_neighbours(node=node, distance=self.cluster_distance))
-                if len(neighbours) >= self.core_neighbours:
-                    # node forms a new cluster
-                    this_cluster = dengraph.cluster.DenGraphCluster(self.graph)
-                    self.clusters.append(this_cluster)
-                    self._add_node_to_cluster(
-                        node=node,
-                        cluster=this_cluster,
-                        state=this_cluster.CORE_NODE
-                    )
-                    outstanding_nodes = set()  # nodes which still need categorizing
-                    connected_nodes = {node}  # nodes which need not be scheduled for categorizing again
-                    outstanding_nodes.update(neighbours)
-                    connected_nodes.update(neighbours)
-                    while outstanding_nodes:
-                        checking = outstanding_nodes.pop()
-                        neighbours = set(self.graph.get_neighbours(
-                            node=checking,
-                            distance=self.cluster_distance
-                        ))
-                        if len(neighbours) >= self.core_neighbours:
-                            self._add_node_to_cluster(
-                                node=checking,
-                                cluster=this_cluster,
-                                state=this_cluster.CORE_NODE
-                            )
-                            self._expand_unchecked(outstanding_nodes, neighbours, connected_nodes)
-                        else:
-                            self._add_node_to_cluster(
-                                node=checking,
-                                cluster=this_cluster,
-                                state=this_cluster.BORDER_NODE
-                            )
-        # sort clusters by length to reduce '__contains__' checks
-        # having big clusters first means on average, searched elements are
-        # more likely to be in earlier containers.
-        self.clusters.sort(key=len)
+        self._reset_clustering()
+        self.noise.update(self.graph)
+        if self.processes != 1:
+            self._cluster_cores(self._core_neighbourhoods_parallel())
+        else:
+            self._cluster_cores(self._core_neighbourhoods())
+
+    def _core_neighbourhoods(self):
+        """Yield all core nodes and their neighbours as `(core_node, neighbours)`"""
+        core_neighbours = self.core_neighbours
+        for nodes in _chunks(self.graph, self.chunk_size):
+            neighbourhoods = self.graph.get_neighbours_many(nodes, self.cluster_distance)
+            for node, neighbours in dengraph.compat.viewitems(neighbourhoods):
+                if len(neighbours) >= core_neighbours:
+                    yield node, neighbours
+
+    def _core_neighbourhoods_parallel(self):
+        """Yield all core nodes and their neighbours as `(core_node, neighbours)`, querying in parallel"""
+        nodes = list(self.graph)
+        processes = self.processes or multiprocessing.cpu_count()
+        # several chunks per process to balance uneven neighbourhood sizes
+        chunk_size = max(1, min(self.chunk_size, len(nodes) // (4 * processes)))
+        pool = multiprocessing.Pool(
+            processes=processes,
+            initializer=_init_core_worker,
+            initargs=(self.graph, self.cluster_distance, self.core_neighbours),
+        )
+        try:
+            for chunk_cores in pool.imap_unordered(_core_neighbours_worker, _chunks(nodes, chunk_size)):
+                for core_node, neighbours in chunk_cores:
+                    yield core_node, neighbours
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _cluster_cores(self, core_neighbourhoods):
+        """
+        Create clusters from the neighbourhoods of all core nodes
+
+        :param core_neighbourhoods: iterable of `(core_node, neighbours)` for every core node
+
+        Clusters are the connected components of core nodes, plus any
+        non-core neighbours as border nodes. Core nodes are connected via a
+        :py:class:`~dengraph.primitives.disjointset.DisjointSet` as their
+        neighbourhoods arrive. Instead of individual neighbourhoods, only the
+        combined neighbourhood of each group of core nodes is kept.
+        """
+        core_nodes = dengraph.primitives.disjointset.DisjointSet()
+        known_cores = set()
+        group_neighbours = {}  # {root: {node, ...}, ...} neighbours of all core nodes of each group
+        add_core, find_many, union = core_nodes.add, core_nodes.find_many, core_nodes.union
+        root = None  # group of the previous core node
+        for core_node, neighbours in core_neighbourhoods:
+            add_core(core_node)
+            # As edges are symmetric, a core node is adjacent to a group if it
+            # is a neighbour of the group. Known core nodes amongst the
+            # neighbours of a group are members of the group.
+            if root is not None and core_node in group_neighbours[root]:
+                outside = neighbours - group_neighbours[root]
+                if outside.isdisjoint(known_cores):
+                    # the core node is adjacent only to the previous group
+                    known_cores.add(core_node)
+                    neighbourhood = group_neighbours.pop(root)
+                    neighbourhood |= outside
+                    root = union(root, core_node)
+                    group_neighbours[root] = neighbourhood
+                    continue
+            # the core node is not yet known, since it is its own neighbour if it has an edge to itself
+            other_roots = find_many(neighbours & known_cores)
+            known_cores.add(core_node)
+            neighbourhood = set(neighbours)
+            root = core_node
+            for other_root in other_roots:
+                other_neighbourhood = group_neighbours.pop(other_root)
+                root = union(root, other_root)
+                if len(other_neighbourhood) > len(neighbourhood):
+                    neighbourhood, other_neighbourhood = other_neighbourhood, neighbourhood
+                neighbourhood |= other_neighbourhood
+            group_neighbours[root] = neighbourhood
+        clusters = {
+            root: dengraph.cluster.DenGraphCluster(
+                self.graph, core_nodes=members, border_nodes=group_neighbours[root] - known_cores
+            )
+            for root, members in dengraph.compat.viewitems(core_nodes.groups())
+        }
+        for cluster in dengraph.compat.viewvalues(clusters):
+            self._cluster_added(cluster)
 
     def __contains__(self, item):
         if isinstance(item, slice):
             return item.start in self and item.stop in self
-        else:
-            for cluster in self.clusters:
-                if item in cluster:
-                    return True
-        return False
+        return item in self._node_clusters
 
     def __len__(self):
-        return sum(len(clstr) for clstr in self.clusters)
+        return sum(len(clstr) for clstr in self._clusters)
 
     def __getitem__(self, item):
         if item in self:
@@ -316,37 +663,18 @@ class DenGraphIO(dengraph.graph.Graph):
             raise dengraph.graph.NoSuchNode  # Node not in any Cluster
 
     def __setitem__(self, key, value):
-        # add stuff to graph
-        try:
+        if isinstance(key, slice):
             self.graph[key] = value
-        except:
-            raise
+            self._connections_added(self.graph.get_neighbours_many([key.start, key.stop], self.cluster_distance))
         else:
-            if isinstance(key, slice):
-                nodes = [key.start, key.stop]
-                self._edge_added(nodes)
-            else:
-                self._node_added(key)
-            self.clusters.sort(key=len)
+            self._add({key: value})
+        if self.change_log is not None:
+            self.change_log.record('set', key, value)
 
     def __delitem__(self, item):
-        # a:b -> slice -> edge
-        if isinstance(item, slice):
-            del self.graph[item]
-            self._edge_removed(node=item.start)
-            self._edge_removed(node=item.stop)
-            try:
-                cluster = self.core_cluster_for_node(core_node=item.start)
-            except NoSuchCluster:
-                try:
-                    cluster = self.core_cluster_for_node(core_node=item.stop)
-                except NoSuchCluster:
-                    return
-            self._check_cluster(nodes=[item.start, item.stop], core_cluster=cluster)
-        else:
-            neighbours = set(self.graph.get_neighbours(node=item, distance=self.cluster_distance))
-            self._node_removed(node=item, neighbours=neighbours)
-            del self.graph[item]
+        self._remove([item])
+        if self.change_log is not None:
+            self.change_log.record('del', item)
 
     def __iter__(self):
         for cluster in self.clusters:
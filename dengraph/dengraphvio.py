@@ -18,14 +18,15 @@ class DenGraphVIO(DenGraphIO):
     :param base_graph: the underlying graph
     :param cluster_distance: maximum distance for nodes to be considered as neighbours (ε)
     :param core_neighbours: number of neighbours required for core nodes (η)
+    :param processes: number of processes for the initial clustering, or `None` for one per CPU
     """
-    def __init__(self, base_graph, cluster_distance, core_neighbours):
+    def __init__(self, base_graph, cluster_distance, core_neighbours, processes=1):
         try:
             if not isinstance(base_graph.distance, dengraph.distance.Distance):
                 raise dengraph.distance.NoDistanceSupport
         except AttributeError:
             raise dengraph.distance.NoDistanceSupport
-        super(DenGraphVIO, self).__init__(base_graph, cluster_distance, core_neighbours)
+        super(DenGraphVIO, self).__init__(base_graph, cluster_distance, core_neighbours, processes)
 
     def probe(self, virtual_node):
         for cluster in self.clusters:
@@ -51,8 +51,34 @@ class Distance(dengraph.compat.ABCBase):
        representation to return if the provided iterable is empty. If the iterable is empty and
        *default* is not provided, a :exc:`ValueError` is raised.
 
+    .. attribute:: is_symmetric
+
+       Whether `dist(a, b) == dist(b, a)` holds for all nodes.
+
+    .. attribute:: is_metric
+
+       Whether the distance is a metric on numeric distances, i.e. it is symmetric, satisfies the
+       triangle inequality `dist(a, c) <= dist(a, b) + dist(b, c)`, and `dist(a, b) == 0` only
+       for equal nodes. Graphs may use this to avoid computing distances, for example by
+       pruning neighbourhoods.
+
+    .. function:: one_to_many(first, others)
+
+       Return a list of the distances between *first* and each node in *others*.
+
+       The default implementation calls the distance for each pair of nodes. Implementations
+       may compute all distances at once, e.g. using :py:mod:`numpy`.
+
+    .. function:: pairwise(firsts, seconds)
+
+       Return a list with a row for each node in *firsts*, containing the distances to each
+       node in *seconds*.
+
+       The default implementation calls :py:meth:`one_to_many` for each node in *firsts*.
+
     """
     is_symmetric = True
+    is_metric = False
 
     def __call__(self, first, second, default=None):
         raise NotImplementedError
@@ -63,6 +89,29 @@ class Distance(dengraph.compat.ABCBase):
     def median(self, *args, **kwargs):
         raise NotImplementedError
 
+    def one_to_many(self, first, others):
+        return [self(first, other) for other in others]
+
+    def pairwise(self, firsts, seconds):
+        seconds = list(seconds)
+        return [self.one_to_many(first, seconds) for first in firsts]
+
+
+def one_to_many(distance, first, others):
+    """
+    Compute the distances between `first` and each node in `others`
+
+    :param distance: a :py:class:`Distance` or any function `dist(a, b)->object`
+    :return: list of distances in the order of `others`
+
+    Uses the bulk :py:meth:`Distance.one_to_many` of `distance` if available.
+    """
+    try:
+        bulk_distance = distance.one_to_many
+    except AttributeError:
+        return [distance(first, other) for other in others]
+    return bulk_distance(first, others)
+
 
 class IncrementalDistance(Distance):
     """
@@ -1,12 +1,39 @@
 from __future__ import absolute_import
 
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
 import dengraph.distance
 
+#: minimum number of nodes for which :py:mod:`numpy` is faster than plain python
+_NUMPY_THRESHOLD = 64
+#: bound for integers whose difference cannot overflow in :py:mod:`numpy`
+_INT_LIMIT = 2 ** 62
+
 
 class DeltaDistance(dengraph.distance.Distance):
+    is_metric = True
+
     def __call__(self, x, y, default=None):
         return abs(x - y)
 
+    def one_to_many(self, first, others):
+        others = list(others)
+        if numpy is not None and len(others) >= _NUMPY_THRESHOLD:
+            values = numpy.asarray(others)
+            # only plain numbers are vectorized, other nodes are subtracted by python
+            kind = values.dtype.kind if values.ndim == 1 else None
+            try:
+                if kind == 'f' or (
+                        kind == 'i' and abs(first) < _INT_LIMIT and numpy.abs(values).max() < _INT_LIMIT
+                ):
+                    return numpy.abs(values - first).tolist()
+            except (TypeError, OverflowError):
+                pass
+        return [abs(first - other) for other in others]
+
     def mean(self, *args, **kwargs):
         if len(args) == 1:
             args = args[0]
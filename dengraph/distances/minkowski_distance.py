@@ -0,0 +1,66 @@
+from __future__ import absolute_import
+
+import dengraph.distance
+
+
+class MinkowskiDistance(dengraph.distance.Distance):
+    """
+    Distance between numeric vectors using the Minkowski p-norm
+
+    :param p: order of the norm, e.g. `1` (manhattan), `2` (euclidean) or `float('inf')` (chebyshev)
+
+    Nodes must be sequences of numbers of equal length, such as tuples of
+    coordinates. The distance between two nodes is never smaller than the
+    difference of any of their coordinates, which allows graphs to prune
+    candidates using individual coordinates.
+    """
+    is_metric = True
+
+    def __init__(self, p=2):
+        if p < 1:
+            raise ValueError('Minkowski distance requires p >= 1')
+        self.p = p
+
+    def __call__(self, first, second, default=None):
+        p = self.p
+        if p == 2:
+            return sum((a - b) ** 2 for a, b in zip(first, second)) ** 0.5
+        elif p == 1:
+            return sum(abs(a - b) for a, b in zip(first, second))
+        elif p == float('inf'):
+            return max(abs(a - b) for a, b in zip(first, second))
+        return sum(abs(a - b) ** p for a, b in zip(first, second)) ** (1.0 / p)
+
+    def mean(self, *args, **kwargs):
+        if len(args) == 1:
+            args = args[0]
+        args = list(args)
+        if not args:
+            if "default" in kwargs:
+                return kwargs.get("default")
+            raise ValueError()
+        return tuple(sum(coordinates) / float(len(args)) for coordinates in zip(*args))
+
+    def median(self, *args, **kwargs):
+        if len(args) == 1:
+            args = args[0]
+        args = list(args)
+        if not args:
+            if "default" in kwargs:
+                return kwargs.get("default")
+            raise ValueError()
+        return tuple(sorted(coordinates)[int(len(args) / 2)] for coordinates in zip(*args))
+
+    def __eq__(self, other):
+        if isinstance(self, other.__class__):
+            return self.p == other.p
+        return NotImplemented
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((self.__class__, self.p))
+
+    def __repr__(self):
+        return '%s(p=%r)' % (self.__class__.__name__, self.p)
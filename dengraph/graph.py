@@ -163,6 +163,69 @@ class Graph(dengraph.compat.ABCBase):
         """
         raise NotImplementedError
 
+    def get_neighbours_many(self, nodes, distance=ANY_DISTANCE):
+        """
+        Get the neighbours of several nodes with edge weight smaller or equal to `distance`
+
+        :param nodes: nodes from which edges originate.
+        :param distance: maximum allowed distance to other nodes.
+        :return: mapping of each node to the set of its neighbouring nodes
+        :raises NoSuchNode: if any of ``nodes`` is not in graph
+
+        :note: The default implementation queries each node via
+               :py:meth:`get_neighbours`. Graphs should override this method if
+               they can amortize the work for multiple nodes.
+        """
+        return {node: set(self.get_neighbours(node, distance)) for node in nodes}
+
+    def get_neighbour_distances(self, nodes, distance=ANY_DISTANCE):
+        """
+        Get the edges of several nodes with edge weight smaller or equal to `distance`
+
+        :param nodes: nodes from which edges originate.
+        :param distance: maximum allowed distance to other nodes.
+        :return: mapping of each node to a mapping of its neighbouring nodes to edge weights
+        :raises NoSuchNode: if any of ``nodes`` is not in graph
+
+        :note: The default implementation reads entire rows via ``g[a]`` for
+               `ANY_DISTANCE` if the graph provides them as a mapping.
+               Otherwise, it queries each node via :py:meth:`get_neighbours`
+               and each edge via ``g[a:b]``. If the graph is
+               :py:attr:`symmetric`, edges already fetched for the opposite
+               direction are reused. Graphs should override this method if
+               they compute edge weights to find neighbours.
+        """
+        neighbour_distances = {}
+        symmetric = self.symmetric
+        for node in nodes:
+            if distance is ANY_DISTANCE:
+                row = self[node]
+                if isinstance(row, dengraph.compat.collections_abc.Mapping):
+                    neighbour_distances[node] = dict(row)
+                    continue
+            node_distances = {}
+            for neighbour in self.get_neighbours(node, distance):
+                if symmetric and neighbour in neighbour_distances:
+                    node_distances[neighbour] = neighbour_distances[neighbour][node]
+                else:
+                    node_distances[neighbour] = self[node:neighbour]
+            neighbour_distances[node] = node_distances
+        return neighbour_distances
+
+    def neighbour_counts(self, nodes, distance=ANY_DISTANCE):
+        """
+        Count the neighbours of several nodes with edge weight smaller or equal to `distance`
+
+        :param nodes: nodes from which edges originate.
+        :param distance: maximum allowed distance to other nodes.
+        :return: mapping of each node to the number of its neighbouring nodes
+        :raises NoSuchNode: if any of ``nodes`` is not in graph
+        """
+        return {
+            node: len(neighbours)
+            for node, neighbours in dengraph.compat.viewitems(self.get_neighbours_many(nodes, distance))
+        }
+
     # TODO:
     # -- intra distance
     # -- inter distance
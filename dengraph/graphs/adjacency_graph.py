@@ -1,6 +1,8 @@
 from __future__ import absolute_import
 
+import bisect
 import itertools
+import operator
 import dengraph.graph
 import dengraph.utilities.pretty
 import dengraph.compat
@@ -22,8 +24,8 @@ class AdjacencyGraph(dengraph.graph.Graph):
 
     :py:class:`~dengraph.graph.Graph`
         Any subclass of :py:class:`~dengraph.graph.Graph`; complexity depends
-        on the graph's implementation of `iter(graph)`, `graph.get_neighbours`
-        and `graph[node_from:node_to]`.
+        on the graph's implementation of `iter(graph)` and
+        :py:meth:`~dengraph.graph.Graph.get_neighbour_distances`.
 
     :py:const:`None`
         Initialize the graph as empty.
@@ -53,10 +55,8 @@ class AdjacencyGraph(dengraph.graph.Graph):
 
     @staticmethod
     def _adjacency_from_graph(graph, max_distance):
-        adjacency = {}
-        for node in graph:
-            adjacency[node] = {other: graph[node:other] for other in graph.get_neighbours(node, max_distance)}
-        return adjacency
+        # fetch all edges at once, which graphs may compute in bulk and only once for symmetric edges
+        return graph.get_neighbour_distances(list(graph), max_distance)
 
     @staticmethod
     def _adjacency_from_dict(adjacency_dict, max_distance):
@@ -178,6 +178,34 @@ class AdjacencyGraph(dengraph.graph.Graph):
                 return iter(adjacency_list)
             return (neighbour for neighbour in adjacency_list if adjacency_list[neighbour] <= distance)
 
+    def get_neighbours_many(self, nodes, distance=dengraph.graph.ANY_DISTANCE):
+        adjacency = self._adjacency
+        try:
+            if distance is dengraph.graph.ANY_DISTANCE:
+                return {node: set(adjacency[node]) for node in nodes}
+            return {
+                node: {
+                    neighbour for neighbour, neighbour_distance in dengraph.compat.viewitems(adjacency[node])
+                    if neighbour_distance <= distance
+                } for node in nodes
+            }
+        except KeyError:
+            raise dengraph.graph.NoSuchNode
+
+    def neighbour_counts(self, nodes, distance=dengraph.graph.ANY_DISTANCE):
+        adjacency = self._adjacency
+        try:
+            if distance is dengraph.graph.ANY_DISTANCE:
+                return {node: len(adjacency[node]) for node in nodes}
+            return {
+                node: sum(
+                    1 for neighbour_distance in dengraph.compat.viewvalues(adjacency[node])
+                    if neighbour_distance <= distance
+                ) for node in nodes
+            }
+        except KeyError:
+            raise dengraph.graph.NoSuchNode
+
     def __add__(self, other):
         if isinstance(other, dengraph.graph.Graph):
             new_adjacency = {}
@@ -239,11 +267,146 @@ class BoundedAdjacencyGraph(AdjacencyGraph):
         except KeyError:
             raise dengraph.graph.NoSuchNode
         else:
-            if (
-                distance is dengraph.graph.ANY_DISTANCE or (
-                    self._max_distance is not dengraph.graph.ANY_DISTANCE and
-                    self._max_distance <= distance
-                )
-            ):
+            if self._covers_bound(distance):
                 return iter(adjacency_list)
             return (neighbour for neighbour in adjacency_list if adjacency_list[neighbour] <= distance)
+
+    def _covers_bound(self, distance):
+        """Whether all stored edges are within `distance`"""
+        return distance is dengraph.graph.ANY_DISTANCE or (
+            self._max_distance is not dengraph.graph.ANY_DISTANCE and
+            self._max_distance <= distance
+        )
+
+    def get_neighbours_many(self, nodes, distance=dengraph.graph.ANY_DISTANCE):
+        if self._covers_bound(distance):
+            distance = dengraph.graph.ANY_DISTANCE
+        return super(BoundedAdjacencyGraph, self).get_neighbours_many(nodes, distance)
+
+    def neighbour_counts(self, nodes, distance=dengraph.graph.ANY_DISTANCE):
+        if self._covers_bound(distance):
+            distance = dengraph.graph.ANY_DISTANCE
+        return super(BoundedAdjacencyGraph, self).neighbour_counts(nodes, distance)
+
+
+class SortedAdjacencyGraph(AdjacencyGraph):
+    """
+    Graph storing distances via adjacency lists sorted by distance
+
+    :param source: adjacency mapping or graph
+    :param max_distance: maximum allowed distance
+    :param symmetric: whether the graph enforces symmetry
+
+    :see: :py:class:`~AdjacencyGraph` for formats of the `source` parameter.
+
+    In addition to the adjacency mappings, the neighbours of each node are
+    stored ordered by distance. Querying for neighbours within a distance via
+    :py:meth:`get_neighbours` requires a binary search and a slice, instead
+    of checking every edge of a node. Counting neighbours via
+    :py:meth:`neighbour_counts` requires only the binary search, i.e.
+    O(log d) time for a node with d neighbours.
+
+    Adding or removing an edge requires O(d) time to keep neighbours ordered.
+    Distances must be comparable with each other.
+    """
+    def __init__(self, source=None, max_distance=dengraph.graph.ANY_DISTANCE, symmetric=False):
+        super(SortedAdjacencyGraph, self).__init__(source=source, max_distance=max_distance, symmetric=symmetric)
+        self._sorted = {}  # {node: ([distance, distance, ...], [neighbour, neighbour, ...]), ...}
+        for node in self._adjacency:
+            self._sort_node(node)
+
+    def _sort_node(self, node):
+        """Order all neighbours of `node` by distance"""
+        edges = sorted(dengraph.compat.viewitems(self._adjacency[node]), key=operator.itemgetter(1))
+        self._sorted[node] = [distance for _, distance in edges], [neighbour for neighbour, _ in edges]
+
+    def _insert_sorted(self, node, neighbour, distance):
+        distances, neighbours = self._sorted[node]
+        index = bisect.bisect_right(distances, distance)
+        distances.insert(index, distance)
+        neighbours.insert(index, neighbour)
+
+    def _remove_sorted(self, node, neighbour, distance):
+        distances, neighbours = self._sorted[node]
+        index = bisect.bisect_left(distances, distance)
+        # several neighbours may have the same distance
+        while neighbours[index] != neighbour:
+            index += 1
+        del distances[index]
+        del neighbours[index]
+
+    def _edge_distances(self, edge):
+        """Get the distances of `edge` in both directions, or `None` for missing edges"""
+        pairs = ((edge.start, edge.stop), (edge.stop, edge.start))
+        return {pair: self._adjacency.get(pair[0], {}).get(pair[1]) for pair in pairs}
+
+    def _resort_edges(self, old_distances):
+        """Reorder the neighbours of edges which have changed from `old_distances`"""
+        for (node_from, node_to), old_distance in dengraph.compat.viewitems(old_distances):
+            new_distance = self._adjacency.get(node_from, {}).get(node_to)
+            if old_distance == new_distance:
+                continue
+            if old_distance is not None:
+                self._remove_sorted(node_from, node_to, old_distance)
+            if new_distance is not None:
+                self._insert_sorted(node_from, node_to, new_distance)
+
+    def __setitem__(self, item, value):
+        # a:b -> slice -> edge
+        if isinstance(item, slice):
+            old_distances = self._edge_distances(item)
+            super(SortedAdjacencyGraph, self).__setitem__(item, value)
+            self._resort_edges(old_distances)
+        else:
+            old_neighbours = set(self._sorted[item][1]) if item in self._sorted else set()
+            super(SortedAdjacencyGraph, self).__setitem__(item, value)
+            self._sort_node(item)
+            if self._symmetric:
+                # the adjacency of item may have been modified in-place, so
+                # rebuild the order of neighbours instead of updating it
+                for node_to in old_neighbours.union(self._adjacency[item]):
+                    self._sort_node(node_to)
+
+    def __delitem__(self, item):
+        # a:b -> slice -> edge
+        if isinstance(item, slice):
+            old_distances = self._edge_distances(item)
+            super(SortedAdjacencyGraph, self).__delitem__(item)
+            self._resort_edges(old_distances)
+        else:
+            if self._symmetric:
+                old_distances = [(node, self._adjacency[node][item]) for node in self._adjacency.get(item, ())]
+            else:
+                old_distances = [
+                    (node, adjacency[item]) for node, adjacency in dengraph.compat.viewitems(self._adjacency)
+                    if item in adjacency
+                ]
+            super(SortedAdjacencyGraph, self).__delitem__(item)
+            del self._sorted[item]
+            for node, distance in old_distances:
+                if node != item:
+                    self._remove_sorted(node, item, distance)
+
+    def _neighbours_within(self, node, distance):
+        try:
+            distances, neighbours = self._sorted[node]
+        except KeyError:
+            raise dengraph.graph.NoSuchNode
+        if distance is dengraph.graph.ANY_DISTANCE:
+            return neighbours[:]
+        return neighbours[:bisect.bisect_right(distances, distance)]
+
+    def get_neighbours(self, node, distance=dengraph.graph.ANY_DISTANCE):
+        return iter(self._neighbours_within(node, distance))
+
+    def get_neighbours_many(self, nodes, distance=dengraph.graph.ANY_DISTANCE):
+        return {node: set(self._neighbours_within(node, distance)) for node in nodes}
+
+    def neighbour_counts(self, nodes, distance=dengraph.graph.ANY_DISTANCE):
+        sorted_adjacency = self._sorted
+        try:
+            if distance is dengraph.graph.ANY_DISTANCE:
+                return {node: len(sorted_adjacency[node][1]) for node in nodes}
+            return {node: bisect.bisect_right(sorted_adjacency[node][0], distance) for node in nodes}
+        except KeyError:
+            raise dengraph.graph.NoSuchNode
@@ -0,0 +1,265 @@
+from __future__ import absolute_import
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+from dengraph import graph
+import dengraph.utilities.pretty
+
+
+def euclidean_metric(queries, points):
+    """Euclidean distance between each of `queries` and `points`"""
+    return numpy.sqrt(_coordinate_reduce(queries, points, lambda delta: delta * delta, numpy.add))
+
+
+def manhattan_metric(queries, points):
+    """Manhattan distance between each of `queries` and `points`"""
+    return _coordinate_reduce(queries, points, numpy.abs, numpy.add)
+
+
+def chebyshev_metric(queries, points):
+    """Chebyshev distance between each of `queries` and `points`"""
+    return _coordinate_reduce(queries, points, numpy.abs, numpy.maximum)
+
+
+def cosine_metric(queries, points):
+    """
+    Cosine distance between each of `queries` and `points`
+
+    The distance between a zero vector and any other vector is defined as `1`.
+    """
+    norms = numpy.outer(numpy.sqrt((queries * queries).sum(axis=1)), numpy.sqrt((points * points).sum(axis=1)))
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        similarity = queries.dot(points.T) / norms
+    similarity[norms == 0] = 0
+    return 1 - similarity
+
+
+def _coordinate_reduce(queries, points, transform, reduce):
+    """
+    Reduce the transformed coordinate differences of `queries` and `points`
+    to a `len(queries)`x`len(points)` matrix
+    """
+    result = transform(queries[:, 0, None] - points[None, :, 0])
+    for dimension in range(1, queries.shape[1]):
+        reduce(result, transform(queries[:, dimension, None] - points[None, :, dimension]), out=result)
+    return result
+
+
+#: metrics available by name for :py:class:`ArrayDistanceGraph`
+METRICS = {
+    'euclidean': euclidean_metric,
+    'manhattan': manhattan_metric,
+    'chebyshev': chebyshev_metric,
+    'cosine': cosine_metric,
+}
+
+
+class ArrayDistanceGraph(graph.Graph):
+    r"""
+    Graph of vector nodes connected by a vectorized metric
+
+    :param nodes: all nodes contained in the graph, as sequences of coordinates
+    :param metric: name of a metric in :py:data:`METRICS` or a vectorized metric function
+    :param symmetric: whether the metric can be treated as symmetric, i.e. `dist(a, b) == dist(b, a)`
+
+    Nodes must be hashable sequences of numbers of equal length, for example
+    tuples of coordinates. Their coordinates are stored in a contiguous
+    :py:mod:`numpy` array. Distances from a node to all other nodes are
+    computed in a single vectorized operation, instead of one Python call per
+    pair of nodes as for :py:class:`~dengraph.graphs.distance_graph.DistanceGraph`.
+
+    .. function:: metric(queries, points) -> distances
+
+        A vectorized metric receives two arrays of shape `(Q, D)` and
+        `(P, D)`, and must return an array of shape `(Q, P)` containing the
+        distance of every query to every point.
+
+    :note: This graph requires :py:mod:`numpy` to be installed.
+
+    :warning: For N nodes, all NxN edges are exposed. This may lead to
+              O(N\ :sup:2\ ) runtime complexity.
+    """
+    #: maximum number of elements in intermediate arrays
+    block_size = 2 ** 22
+
+    def __init__(self, nodes, metric='euclidean', symmetric=True):
+        if numpy is None:
+            raise ImportError('%s requires numpy' % self.__class__.__name__)
+        self.metric = metric
+        self._metric = METRICS[metric] if metric in METRICS else metric
+        if not callable(self._metric):
+            raise ValueError('metric must be callable or one of %s' % ', '.join(sorted(METRICS)))
+        self.symmetric = symmetric
+        self._rows = {}  # {node: row, ...}
+        self._nodes = []  # [node, ...] by row
+        self._points = None  # coordinates by row, with spare rows for insertion
+        if isinstance(nodes, numpy.ndarray):
+            nodes = [tuple(point) for point in nodes.tolist()]
+        nodes = [node for node in dict.fromkeys(nodes)]
+        if nodes:
+            self._points = numpy.array(nodes, dtype=float)
+            if self._points.ndim != 2:
+                raise ValueError('%s requires nodes of equal dimension' % self.__class__.__name__)
+            self._nodes = nodes
+            self._rows = {node: row for row, node in enumerate(nodes)}
+
+    @property
+    def points(self):
+        """Array of the coordinates of all nodes, in the order of iteration"""
+        if self._points is None:
+            return numpy.empty((0, 0))
+        return self._points[:len(self._nodes)]
+
+    def _distances(self, rows):
+        """Compute the distances from the nodes at `rows` to all nodes"""
+        points = self.points
+        return self._metric(points[rows], points)
+
+    def _row_blocks(self, rows):
+        """Split `rows` into blocks which can be processed in a single step"""
+        size = max(1, self.block_size // max(1, len(self._nodes) * self.points.shape[1]))
+        for start in range(0, len(rows), size):
+            yield rows[start:start + size]
+
+    def __contains__(self, item):
+        # a:b -> slice -> edge
+        if item.__class__ == slice:
+            node_from, node_to = item.start, item.stop
+            return node_from in self._rows and node_to in self._rows
+        # node
+        return item in self._rows
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __getitem__(self, item):
+        # a:b -> slice -> edge
+        if isinstance(item, slice):
+            assert item.step is None, '%s does not support stride argument for edges' % self.__class__.__name__
+            try:
+                row_from, row_to = self._rows[item.start], self._rows[item.stop]
+            except KeyError:
+                raise graph.NoSuchEdge
+            points = self.points
+            return float(self._metric(points[row_from:row_from + 1], points[row_to:row_to + 1])[0, 0])
+        else:
+            try:
+                row = self._rows[item]
+            except KeyError:
+                raise graph.NoSuchNode
+            distances = self._distances([row])[0].tolist()
+            return {candidate: distances[idx] for idx, candidate in enumerate(self._nodes) if idx != row}
+
+    def __setitem__(self, item, value):
+        if value or isinstance(item, slice):
+            raise TypeError('%s does not support edge assignment' % self.__class__.__name__)
+        elif item not in self._rows:
+            point = numpy.array(item, dtype=float)
+            if self._points is None:
+                self._points = numpy.empty((1, len(point)))
+            elif point.shape != self._points.shape[1:]:
+                raise ValueError('%s requires nodes of dimension %d, got %r' % (
+                    self.__class__.__name__, self._points.shape[1], item
+                ))
+            elif len(self._nodes) == len(self._points):
+                points = numpy.empty((2 * len(self._points), self._points.shape[1]))
+                points[:len(self._nodes)] = self._points
+                self._points = points
+            self._points[len(self._nodes)] = point
+            self._rows[item] = len(self._nodes)
+            self._nodes.append(item)
+
+    def __delitem__(self, item):
+        # a:b -> slice -> edge
+        if isinstance(item, slice):
+            raise TypeError('%s does not support edge deletion' % self.__class__.__name__)
+        else:
+            try:
+                row = self._rows.pop(item)
+            except KeyError:
+                raise graph.NoSuchNode
+            # move the last node into the free row
+            last_node = self._nodes.pop()
+            if last_node != item:
+                self._nodes[row] = last_node
+                self._rows[last_node] = row
+                self._points[row] = self._points[len(self._nodes)]
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def get_neighbours(self, node, distance=graph.ANY_DISTANCE):
+        try:
+            row = self._rows[node]
+        except KeyError:
+            raise graph.NoSuchNode
+        if distance is graph.ANY_DISTANCE:
+            return (candidate for candidate in self._nodes if candidate != node)
+        in_reach = self._distances([row])[0] <= distance
+        in_reach[row] = False
+        nodes = self._nodes
+        return iter([nodes[idx] for idx in numpy.flatnonzero(in_reach)])
+
+    def get_neighbours_many(self, nodes, distance=graph.ANY_DISTANCE):
+        """
+        Get all neighbours of several nodes with edge weight smaller or equal to `distance`
+
+        :param nodes: nodes from which edges originate.
+        :param distance: maximum allowed distance to other nodes.
+        :return: mapping of each node to the set of its neighbours
+        :raises NoSuchNode: if any of ``nodes`` is not in graph
+
+        Distances are computed for blocks of nodes at once.
+        """
+        nodes = list(nodes)
+        try:
+            rows = [self._rows[node] for node in nodes]
+        except KeyError:
+            raise graph.NoSuchNode
+        if distance is graph.ANY_DISTANCE:
+            return {node: set(self._nodes) - {node} for node in nodes}
+        neighbours = {}
+        all_nodes = self._nodes
+        for block in self._row_blocks(rows):
+            in_reach = self._distances(block) <= distance
+            in_reach[numpy.arange(len(block)), block] = False
+            for idx, row in enumerate(block):
+                neighbours[all_nodes[row]] = {all_nodes[col] for col in numpy.flatnonzero(in_reach[idx])}
+        return neighbours
+
+    def neighbour_counts(self, nodes, distance=graph.ANY_DISTANCE):
+        nodes = list(nodes)
+        try:
+            rows = [self._rows[node] for node in nodes]
+        except KeyError:
+            raise graph.NoSuchNode
+        if distance is graph.ANY_DISTANCE:
+            return {node: len(self._nodes) - 1 for node in nodes}
+        counts = {}
+        all_nodes = self._nodes
+        for block in self._row_blocks(rows):
+            in_reach = self._distances(block) <= distance
+            in_reach[numpy.arange(len(block)), block] = False
+            for row, count in zip(block, in_reach.sum(axis=1).tolist()):
+                counts[all_nodes[row]] = count
+        return counts
+
+    def __add__(self, other):
+        if isinstance(self, other.__class__) and self.metric == other.metric:
+            return self.__class__(
+                self._nodes + [node for node in other if node not in self._rows],
+                self.metric,
+                self.symmetric and other.symmetric
+            )
+        return NotImplemented
+
+    def __repr__(self):
+        return '%s(metric=%r, symmetric=%r, nodes=%s)' % (
+            self.__class__.__name__,
+            self.metric,
+            self.symmetric,
+            dengraph.utilities.pretty.repr_container(self._nodes)
+        )
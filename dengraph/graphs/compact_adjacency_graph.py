@@ -0,0 +1,323 @@
+from __future__ import absolute_import
+
+import array
+import bisect
+import itertools
+
+import dengraph.graph
+import dengraph.utilities.pretty
+import dengraph.compat
+
+try:
+    array.array('q')
+except ValueError:  # pragma: no cover
+    _OFFSET_TYPECODE = 'l'
+else:
+    _OFFSET_TYPECODE = 'q'
+
+#: placeholder for the nodes of removed ids
+_REMOVED = object()
+
+
+class CompactAdjacencyGraph(dengraph.graph.Graph):
+    r"""
+    Graph storing distances as compressed sparse rows
+
+    :param source: adjacency information
+    :param max_distance: maximum allowed distance
+    :param symmetric: whether the graph enforces symmetry
+
+    :see: :py:class:`~dengraph.graphs.adjacency_graph.AdjacencyGraph` for
+          formats of the `source` parameter.
+
+    Nodes are interned to integer ids. The edges of all nodes are stored in
+    three flat :py:class:`array.array`\ s: the ids of all neighbours sorted by
+    node and neighbour, their distances, and the offset of the first edge of
+    each node. This requires 12 bytes per edge, compared to about 70 bytes
+    per edge for the mappings of an
+    :py:class:`~dengraph.graphs.adjacency_graph.AdjacencyGraph`. Looking up
+    an edge takes O(log d) time for a node with d neighbours.
+
+    Modifying the edges of a node moves them to a mapping, until the graph is
+    rebuilt by :py:meth:`compact`. Removed nodes are skipped, but their ids are
+    only released when compacting. This happens automatically once
+    :py:attr:`compact_ratio` of all nodes have been modified or removed.
+
+    :note: Distances are stored as floats. Any `source` edges must connect
+           nodes of the `source`.
+    """
+    #: fraction of modified nodes after which the graph is compacted automatically
+    compact_ratio = 0.25
+
+    def __init__(self, source=None, max_distance=dengraph.graph.ANY_DISTANCE, symmetric=False):
+        self._symmetric = symmetric
+        if isinstance(source, dengraph.graph.Graph):
+            nodes = list(source)
+            adjacency = (
+                {other: source[node:other] for other in source.get_neighbours(node, max_distance)}
+                for node in nodes
+            )
+        elif isinstance(source, dengraph.compat.collections_abc.Mapping):
+            nodes = list(source)
+            adjacency = (
+                {
+                    other: distance for other, distance in dengraph.compat.viewitems(source[node])
+                    if max_distance is dengraph.graph.ANY_DISTANCE or distance <= max_distance
+                } for node in nodes
+            )
+        elif source is None:
+            nodes, adjacency = [], []
+        else:
+            raise TypeError("parameter 'source' must be an instance of Graph, a Mapping or None")
+        ids = {node: node_id for node_id, node in enumerate(nodes)}
+        try:
+            self._build(nodes, (
+                [(ids[other], float(distance)) for other, distance in dengraph.compat.viewitems(node_adjacency)]
+                for node_adjacency in adjacency
+            ))
+        except KeyError as err:
+            raise ValueError('edge to unknown node %r' % err.args[0])
+        if self._symmetric:
+            self._check_symmetry()
+
+    def _build(self, nodes, rows):
+        """
+        Create the compressed rows
+
+        :param nodes: all nodes, ordered by their new id
+        :param rows: the `[(neighbour_id, distance), ...]` edges of each node, ordered by id
+        """
+        offsets = array.array(_OFFSET_TYPECODE, [0])
+        neighbours = array.array('i')
+        distances = array.array('d')
+        for row in rows:
+            row = sorted(row)
+            neighbours.extend(neighbour_id for neighbour_id, _ in row)
+            distances.extend(distance for _, distance in row)
+            offsets.append(len(neighbours))
+        self._nodes = nodes  # [node, ...] by id, with _REMOVED for removed nodes
+        self._ids = {node: node_id for node_id, node in enumerate(nodes)}  # {node: id, ...}
+        self._offsets = offsets
+        self._neighbours = neighbours
+        self._distances = distances
+        self._rows = {}  # {id: {neighbour_id: distance, ...}, ...} for modified and new nodes
+        self._removed = 0  # number of removed ids
+
+    def compact(self):
+        """Rebuild the compressed rows to include all modifications and release removed nodes"""
+        old_ids = [old_id for old_id, node in enumerate(self._nodes) if node is not _REMOVED]
+        new_ids = {old_id: new_id for new_id, old_id in enumerate(old_ids)}
+        self._build([self._nodes[old_id] for old_id in old_ids], (
+            [
+                (new_ids[neighbour_id], distance) for neighbour_id, distance in self._row(old_id)
+                if neighbour_id in new_ids
+            ] for old_id in old_ids
+        ))
+
+    def _modified(self):
+        if len(self._rows) + self._removed > self.compact_ratio * len(self._nodes):
+            self.compact()
+
+    @property
+    def symmetric(self):
+        """Whether this graph enforces symmetry. Read-only attribute."""
+        return self._symmetric
+
+    def _check_symmetry(self):
+        """Validate that adjacency list is symmetric"""
+        for node_id in range(len(self._nodes)):
+            for neighbour_id, distance in self._row(node_id):
+                try:
+                    if self._distance(neighbour_id, node_id) != distance:
+                        raise ValueError("symmetric graph initialized with assymetric edges")
+                except KeyError:
+                    raise ValueError("symmetric graph initialized with assymetric edges")
+        return True
+
+    def _id(self, node):
+        try:
+            return self._ids[node]
+        except KeyError:
+            raise dengraph.graph.NoSuchNode
+
+    def _row(self, node_id):
+        """Get all `(neighbour_id, distance)` edges of a node, including edges to removed nodes"""
+        try:
+            return dengraph.compat.viewitems(self._rows[node_id])
+        except KeyError:
+            start, end = self._offsets[node_id], self._offsets[node_id + 1]
+            return zip(self._neighbours[start:end], self._distances[start:end])
+
+    def _edit_row(self, node_id):
+        """Get the edges of a node as a modifiable mapping `{neighbour_id: distance, ...}`"""
+        try:
+            return self._rows[node_id]
+        except KeyError:
+            row = self._rows[node_id] = dict(self._row(node_id))
+            return row
+
+    def _distance(self, node_id, neighbour_id):
+        """Get the distance of an edge, raising :py:exc:`KeyError` if it does not exist"""
+        if node_id in self._rows:
+            return self._rows[node_id][neighbour_id]
+        start, end = self._offsets[node_id], self._offsets[node_id + 1]
+        index = bisect.bisect_left(self._neighbours, neighbour_id, start, end)
+        if index == end or self._neighbours[index] != neighbour_id:
+            raise KeyError(neighbour_id)
+        return self._distances[index]
+
+    def _neighbour_ids(self, node_id, distance):
+        """Get the ids of all neighbours of a node with edge weight smaller or equal to `distance`"""
+        try:
+            row = self._rows[node_id]
+        except KeyError:
+            start, end = self._offsets[node_id], self._offsets[node_id + 1]
+            if distance is dengraph.graph.ANY_DISTANCE:
+                neighbour_ids = self._neighbours[start:end]
+            else:
+                neighbour_ids = list(itertools.compress(
+                    self._neighbours[start:end],
+                    [neighbour_distance <= distance for neighbour_distance in self._distances[start:end]]
+                ))
+        else:
+            if distance is dengraph.graph.ANY_DISTANCE:
+                neighbour_ids = row
+            else:
+                neighbour_ids = [
+                    neighbour_id for neighbour_id, neighbour_distance in dengraph.compat.viewitems(row)
+                    if neighbour_distance <= distance
+                ]
+        if self._removed:
+            nodes = self._nodes
+            return [neighbour_id for neighbour_id in neighbour_ids if nodes[neighbour_id] is not _REMOVED]
+        return neighbour_ids
+
+    def __contains__(self, item):
+        # a:b -> slice -> edge
+        if item.__class__ == slice:
+            try:
+                self._distance(self._ids[item.start], self._ids[item.stop])
+            except KeyError:
+                return False
+            return True
+        # node
+        return item in self._ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, item):
+        # a:b -> slice -> edge
+        if isinstance(item, slice):
+            assert item.step is None, '%s does not support stride argument for edges' % self.__class__.__name__
+            try:
+                return self._distance(self._ids[item.start], self._ids[item.stop])
+            except KeyError:
+                raise dengraph.graph.NoSuchEdge
+        else:
+            nodes = self._nodes
+            return {
+                nodes[neighbour_id]: distance for neighbour_id, distance in self._row(self._id(item))
+                if nodes[neighbour_id] is not _REMOVED
+            }
+
+    def __setitem__(self, item, value):
+        # a:b -> slice -> edge
+        if isinstance(item, slice):
+            node_to = self._id(item.stop)
+            node_from = self._id(item.start)
+            self._edit_row(node_from)[node_to] = float(value)
+            if self.symmetric:
+                self._edit_row(node_to)[node_from] = float(value)
+        else:
+            # g[a] = None, g[a] = a
+            if value is None or value is item:
+                if item not in self._ids:
+                    self._add_node(item)
+            # g[a] = {b: 3, c: 4, d: 6}
+            elif isinstance(value, dengraph.compat.collections_abc.Mapping):
+                row = {self._id(node_to): float(distance) for node_to, distance in dengraph.compat.viewitems(value)}
+                node_id = self._ids[item] if item in self._ids else self._add_node(item)
+                if self._symmetric:
+                    # if we know node already, clean up first
+                    for neighbour_id, _ in list(self._row(node_id)):
+                        if self._nodes[neighbour_id] is not _REMOVED:
+                            self._edit_row(neighbour_id).pop(node_id, None)
+                    for neighbour_id, distance in dengraph.compat.viewitems(row):
+                        self._edit_row(neighbour_id)[node_id] = distance
+                self._rows[node_id] = row
+            else:
+                raise dengraph.graph.AdjacencyListTypeError(value)
+        self._modified()
+
+    def _add_node(self, node):
+        node_id = self._ids[node] = len(self._nodes)
+        self._nodes.append(node)
+        self._rows[node_id] = {}
+        return node_id
+
+    def __delitem__(self, item):
+        # a:b -> slice -> edge
+        if isinstance(item, slice):
+            try:
+                node_from, node_to = self._ids[item.start], self._ids[item.stop]
+                self._distance(node_from, node_to)
+            except KeyError:
+                raise dengraph.graph.NoSuchEdge
+            del self._edit_row(node_from)[node_to]
+            if self.symmetric:
+                self._edit_row(node_to).pop(node_from, None)
+        else:
+            try:
+                node_id = self._ids.pop(item)
+            except KeyError:
+                raise dengraph.graph.NoSuchNode
+            # edges to this node are skipped until compacting
+            self._nodes[node_id] = _REMOVED
+            self._rows.pop(node_id, None)
+            self._removed += 1
+        self._modified()
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def get_neighbours(self, node, distance=dengraph.graph.ANY_DISTANCE):
+        nodes = self._nodes
+        return iter([nodes[neighbour_id] for neighbour_id in self._neighbour_ids(self._id(node), distance)])
+
+    def get_neighbours_many(self, nodes, distance=dengraph.graph.ANY_DISTANCE):
+        all_nodes = self._nodes
+        return {
+            node: {all_nodes[neighbour_id] for neighbour_id in self._neighbour_ids(self._id(node), distance)}
+            for node in nodes
+        }
+
+    def neighbour_counts(self, nodes, distance=dengraph.graph.ANY_DISTANCE):
+        return {node: len(self._neighbour_ids(self._id(node), distance)) for node in nodes}
+
+    def __add__(self, other):
+        if isinstance(other, dengraph.graph.Graph):
+            new_adjacency = {}
+            for node in itertools.chain(self, other):
+                if node in new_adjacency:
+                    continue
+                self_adjacency = self[node] if node in self else {}
+                other_adjacency = dict(other[node]) if node in other else {}
+                # make sure there is no ambiguity in edges from sequence of merging
+                for common_node in dengraph.compat.viewkeys(self_adjacency) & dengraph.compat.viewkeys(other_adjacency):
+                    if self_adjacency[common_node] != other_adjacency[common_node]:
+                        raise ValueError('Edge inconsistent in graphs')
+                other_adjacency.update(self_adjacency)
+                new_adjacency[node] = other_adjacency
+            return self.__class__(new_adjacency, symmetric=self.symmetric and other.symmetric)
+        return NotImplemented
+
+    # order is not important
+    __radd__ = __add__
+
+    def __repr__(self):
+        return '%s(symmetric=%r, nodes=%s)' % (
+            self.__class__.__name__,
+            self.symmetric,
+            dengraph.utilities.pretty.repr_container(list(self._ids))
+        )
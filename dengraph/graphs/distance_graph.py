@@ -1,6 +1,28 @@
 from __future__ import absolute_import
+import itertools
+import numbers
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
 from dengraph import graph
+import dengraph.distance
 import dengraph.utilities.pretty
+import dengraph.primitives.lrucache
+
+#: placeholder for distances not in the cache
+_NOT_CACHED = object()
+#: relative tolerance of pruning, compensating rounding errors of distances
+_TOLERANCE = 1e-9
+#: placeholder for unused slots of pivot distances
+_FREE = object()
+
+
+def _chunk_distances(distance, node, candidates):
+    """Compute the distances from `node` to a chunk of `candidates` in a worker of an executor"""
+    return dengraph.distance.one_to_many(distance, node, candidates)
 
 
 class DistanceGraph(graph.Graph):
@@ -10,14 +32,49 @@ class DistanceGraph(graph.Graph):
     :param nodes: all nodes contained in the graph
     :param distance: a function `dist(a, b)->object` that computes the distance between any two nodes
     :param symmetric: whether distance can be treated as symmetric, i.e. `dist(a, b) == dist(b, a)`
+    :param pivots: maximum number of pivot nodes for pruning neighbourhoods of metric distances
+    :param executor: a :py:class:`concurrent.futures.Executor` to compute distances in parallel
+    :param chunk_size: number of distances computed by the `executor` per task
+
+    If `distance` is a metric, as declared by its
+    :py:attr:`~dengraph.distance.Distance.is_metric` flag, neighbourhood
+    queries use the triangle inequality to skip most candidates. All nodes
+    store their distance to a few pivot nodes; a candidate `b` is no
+    neighbour of `a` if `abs(dist(a, p) - dist(b, p)) > distance` for any
+    pivot `p`. Only the remaining candidates are compared to `a`. Pivots are
+    chosen to be far apart on the first query, and kept even if they are
+    removed from the graph later on. Pruning is skipped if distances are not
+    real numbers, such as the :py:class:`~datetime.timedelta` between
+    :py:class:`~datetime.datetime` nodes.
+
+    If an `executor` is set, distances from one node to more than
+    `chunk_size` other nodes are split into chunks, which the `executor`
+    computes concurrently. This applies to node lookups via `graph[node]` and
+    to neighbourhood queries. A
+    :py:class:`~concurrent.futures.ProcessPoolExecutor` uses all cores, but
+    requires `distance` and the nodes to be picklable. A
+    :py:class:`~concurrent.futures.ThreadPoolExecutor` only helps if
+    `distance` releases the GIL. The executor is owned by the caller, and is
+    not copied when the graph is pickled.
 
     :warning: For N nodes, all NxN edges are exposed. This may lead to
               O(N\ :sup:2\ ) runtime complexity.
     """
-    def __init__(self, nodes, distance, symmetric=True):
+    def __init__(self, nodes, distance, symmetric=True, pivots=8, executor=None, chunk_size=256):
         self._nodes = set(nodes)
         self.distance = distance
         self.symmetric = symmetric
+        self.pivots = pivots
+        self.executor = executor
+        self.chunk_size = chunk_size
+        self._pivots = []  # [pivot, ...], chosen on the first query
+        # distances of each node to all pivots are stored in slots of a table
+        self._pivot_slots = {}  # {node: slot, ...}
+        self._slot_nodes = []  # [node or _FREE, ...] by slot
+        self._free_slots = []  # [slot, ...] of removed nodes, whose distances are infinite
+        self._pivot_table = None  # numpy array or list of rows of distances to pivots, by slot
+        self._pivot_limit = 0  # maximum distance to any pivot
+        self._real_distances = True  # whether distances are real numbers, which pivots require
 
     def __contains__(self, item):
         # a:b -> slice -> edge
@@ -39,22 +96,20 @@ class DistanceGraph(graph.Graph):
                 raise graph.NoSuchEdge  # first edge node
             elif node_to not in self._nodes:
                 raise graph.NoSuchEdge  # second edge node
-            # Since we don't know the type of nodes, we cannot test
-            # node_to > node_from to detect swapped pairs. Since we
-            # *do* store nodes in a `set`, they must support hash.
-            if self.symmetric and hash(node_to) > hash(node_from):
-                node_to, node_from = node_from, node_to
             return self.distance(node_from, node_to)
         else:
             if item not in self:
                 raise dengraph.graph.NoSuchNode
-            return {candidate: self[item:candidate] for candidate in self if candidate != item}
+            candidates = [candidate for candidate in self._nodes if candidate != item]
+            return dict(zip(candidates, self._distances(item, candidates)))
 
     def __setitem__(self, item, value):
         if value or isinstance(item, slice):
             raise TypeError('%s does not support edge assignment' % self.__class__.__name__)
         else:
             self._nodes.add(item)
+            if self._pivots and item not in self._pivot_slots:
+                self._add_pivot_row(item)
 
     def __delitem__(self, item):
         # a:b -> slice -> edge
@@ -65,17 +120,167 @@ class DistanceGraph(graph.Graph):
                 self._nodes.remove(item)
             except KeyError:
                 raise graph.NoSuchNode
+            self._remove_pivot_row(item)
 
     def __iter__(self):
         return iter(self._nodes)
 
+    def _use_pivots(self):
+        return (
+            self.pivots > 0 and self.symmetric and self._real_distances and getattr(self.distance, 'is_metric', False)
+        )
+
+    def _select_pivots(self):
+        """Choose pivots far apart from each other, starting from an arbitrary node"""
+        nodes = list(self._nodes)
+        pivots, columns, closest = [], [], None  # closest: [distance to the closest pivot, ...] per node
+        while nodes and len(pivots) < self.pivots:
+            if closest is None:
+                index = 0
+            else:
+                index = max(range(len(nodes)), key=closest.__getitem__)
+                if not closest[index] > 0:
+                    break
+            column = dengraph.distance.one_to_many(self.distance, nodes[index], nodes)
+            if not all(isinstance(value, numbers.Real) for value in column):
+                # pruning requires distances convertible to float, unlike e.g. timedelta of datetime nodes
+                self._real_distances = False
+                return
+            closest = column if closest is None else [min(old, new) for old, new in zip(closest, column)]
+            pivots.append(nodes[index])
+            columns.append(column)
+        rows = list(zip(*columns))
+        self._pivots = pivots
+        self._pivot_slots = {node: slot for slot, node in enumerate(nodes)}
+        self._slot_nodes = nodes
+        self._free_slots = []
+        self._pivot_table = numpy.array(rows, dtype=float) if numpy is not None else rows
+        self._pivot_limit = max(max(column) for column in columns)
+
+    def _add_pivot_row(self, node):
+        """Store the distances of a new `node` to all pivots"""
+        row = dengraph.distance.one_to_many(self.distance, node, self._pivots)
+        self._pivot_limit = max(self._pivot_limit, max(row))
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._slot_nodes[slot] = node
+        else:
+            slot = len(self._slot_nodes)
+            self._slot_nodes.append(node)
+            if numpy is None:
+                self._pivot_table.append(None)
+            elif slot == len(self._pivot_table):
+                table = numpy.empty((2 * slot, len(self._pivots)))
+                table[:slot] = self._pivot_table
+                self._pivot_table = table
+        self._pivot_table[slot] = tuple(row)
+        self._pivot_slots[node] = slot
+
+    def _remove_pivot_row(self, node):
+        try:
+            slot = self._pivot_slots.pop(node)
+        except KeyError:
+            return
+        self._slot_nodes[slot] = _FREE
+        self._free_slots.append(slot)
+        # a removed node is never in reach of any other node
+        self._pivot_table[slot] = (float('inf'),) * len(self._pivots)
+
+    def _candidates(self, nodes, distance):
+        """Yield each of `nodes` with a list of all other nodes which may be within `distance`"""
+        if self._use_pivots() and self._nodes and not self._pivots:
+            self._select_pivots()
+        if not self._use_pivots() or not self._nodes:
+            for node in nodes:
+                yield node, [candidate for candidate in self._nodes if candidate != node]
+            return
+        slots, slot_nodes, table = self._pivot_slots, self._slot_nodes, self._pivot_table
+        # rounding errors of distances to far away pivots must not exclude neighbours at the limit
+        distance += _TOLERANCE * (1 + self._pivot_limit)
+        if numpy is not None:
+            table = table[:len(slot_nodes)]
+            for node in nodes:
+                slot = slots[node]
+                in_reach = numpy.abs(table - table[slot]).max(axis=1) <= distance
+                in_reach[slot] = False
+                yield node, [slot_nodes[index] for index in numpy.flatnonzero(in_reach)]
+        else:
+            for node in nodes:
+                slot = slots[node]
+                row = table[slot]
+                yield node, [
+                    slot_nodes[index] for index, candidate_row in enumerate(table)
+                    if index != slot and all(abs(a - b) <= distance for a, b in zip(row, candidate_row))
+                ]
+
+    def _distances(self, node, candidates):
+        """Get the distances from `node` to each of the nodes in the list `candidates`"""
+        chunk_size = self.chunk_size
+        if self.executor is None or len(candidates) <= chunk_size:
+            return dengraph.distance.one_to_many(self.distance, node, candidates)
+        chunks = [candidates[start:start + chunk_size] for start in range(0, len(candidates), chunk_size)]
+        repeat = len(chunks)
+        distances = []
+        for chunk_distances in self.executor.map(
+                _chunk_distances, itertools.repeat(self.distance, repeat), itertools.repeat(node, repeat), chunks
+        ):
+            distances.extend(chunk_distances)
+        return distances
+
     def get_neighbours(self, node, distance=graph.ANY_DISTANCE):
         if node not in self._nodes:
             raise graph.NoSuchNode
         if distance is graph.ANY_DISTANCE:
             return (candidate for candidate in self if candidate != node)
         else:
-            return (candidate for candidate in self if self[node:candidate] <= distance and candidate != node)
+            _, candidates = next(self._candidates([node], distance))
+            return (
+                candidate for candidate, value in zip(candidates, self._distances(node, candidates))
+                if value <= distance
+            )
+
+    def get_neighbours_many(self, nodes, distance=graph.ANY_DISTANCE):
+        nodes = list(nodes)
+        for node in nodes:
+            if node not in self._nodes:
+                raise graph.NoSuchNode
+        if distance is graph.ANY_DISTANCE:
+            return {node: self._nodes - {node} for node in nodes}
+        return {
+            node: set(node_distances)
+            for node, node_distances in self.get_neighbour_distances(nodes, distance).items()
+        }
+
+    def get_neighbour_distances(self, nodes, distance=graph.ANY_DISTANCE):
+        nodes = list(nodes)
+        for node in nodes:
+            if node not in self._nodes:
+                raise graph.NoSuchNode
+        if distance is graph.ANY_DISTANCE:
+            node_candidates = ((node, [other for other in self._nodes if other != node]) for node in nodes)
+        else:
+            node_candidates = self._candidates(nodes, distance)
+        neighbour_distances = {}
+        for node, candidates in node_candidates:
+            node_distances = {}
+            if self.symmetric:
+                # reuse distances already computed from the other side
+                remaining = []
+                for candidate in candidates:
+                    if candidate not in neighbour_distances:
+                        remaining.append(candidate)
+                    elif node in neighbour_distances[candidate]:
+                        node_distances[candidate] = neighbour_distances[candidate][node]
+                candidates = remaining
+            if distance is graph.ANY_DISTANCE:
+                node_distances.update(zip(candidates, self._distances(node, candidates)))
+            else:
+                node_distances.update(
+                    (candidate, value) for candidate, value in zip(candidates, self._distances(node, candidates))
+                    if value <= distance
+                )
+            neighbour_distances[node] = node_distances
+        return neighbour_distances
 
     def __add__(self, other):
         if isinstance(self, other.__class__) and self.distance == other.distance:
@@ -90,6 +295,11 @@ class DistanceGraph(graph.Graph):
             dengraph.utilities.pretty.repr_container(self._nodes)
         )
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['executor'] = None
+        return state
+
 
 class CachedDistanceGraph(DistanceGraph):
     r"""
@@ -102,56 +312,177 @@ class CachedDistanceGraph(DistanceGraph):
     :param nodes: all nodes contained in the graph
     :param distance: a function `dist(a, b)->object` that computes the distance between any two nodes
     :param symmetric: whether distance can be treated as symmetric, i.e. `dist(a, b) == dist(b, a)`
+    :param cache_size: maximum number of cached distances, or :py:const:`None` for no limit
+    :param cache_distance: maximum distance to cache, beyond which distances are recomputed on every lookup
+    :param pivots: maximum number of pivot nodes for pruning neighbourhoods of metric distances
+    :param executor: a :py:class:`concurrent.futures.Executor` to compute distances in parallel
+    :param chunk_size: number of distances computed by the `executor` per task
+
+    If `cache_size` is set, the least recently used distances are evicted
+    once the cache is full. Setting `cache_distance` to the
+    `cluster_distance` used for clustering only caches distances relevant
+    for neighbourhoods. Statistics of the cache are provided by
+    :py:meth:`cache_info`.
+
+    Removing a node takes time proportional to the number of its cached and
+    deleted edges. Distances of removed nodes left in a bounded cache are
+    never looked up again, and are evicted eventually.
 
     :warning: For N nodes, all NxN edges are exposed and stored. This may lead
-              to O(N\ :sup:2\ ) runtime and memory complexity.
+              to O(N\ :sup:2\ ) runtime and memory complexity, unless the
+              cache is limited.
     """
-    def __init__(self, nodes, distance, symmetric=True):
-        super(CachedDistanceGraph, self).__init__(nodes, distance, symmetric)
-        self._distance_values = {}
+    def __init__(
+            self, nodes, distance, symmetric=True, cache_size=None, cache_distance=graph.ANY_DISTANCE, pivots=8,
+            executor=None, chunk_size=256,
+    ):
+        super(CachedDistanceGraph, self).__init__(nodes, distance, symmetric, pivots, executor, chunk_size)
+        self.cache_distance = cache_distance
+        self._next_id = itertools.count()
+        self._ids = {node: next(self._next_id) for node in self._nodes}  # {node: id, ...}, ids are never reused
+        # distances and deleted edges are stored by pairs of ids, ordered for symmetric graphs
+        self._distance_values = dengraph.primitives.lrucache.LRUCache(cache_size)
+        self._deleted_edges = set()  # {(id_from, id_to), ...}
+        # {id: {other_id, ...}, ...} of deleted edges, and distances unless the cache evicts them anyways
+        self._pairs = {}
+
+    def cache_info(self):
+        """Get the :py:data:`~dengraph.primitives.lrucache.CacheInfo` of cached distances"""
+        return self._distance_values.info()
+
+    def _pair(self, node_from, node_to, missing_error):
+        """Get the key `(id_from, id_to)` for the edge `node_from:node_to`"""
+        try:
+            id_from, id_to = self._ids[node_from], self._ids[node_to]
+        except KeyError:
+            raise missing_error
+        if self.symmetric and id_from > id_to:
+            return id_to, id_from
+        return id_from, id_to
+
+    def _index_pairs(self, node_id, other_ids):
+        """Index the stored pairs of `node_id` with each of `other_ids` for both of their nodes"""
+        pairs = self._pairs
+        try:
+            pairs[node_id].update(other_ids)
+        except KeyError:
+            pairs[node_id] = set(other_ids)
+        for other_id in other_ids:
+            try:
+                pairs[other_id].add(node_id)
+            except KeyError:
+                pairs[other_id] = {node_id}
+
+    def _distances(self, node, candidates):
+        ids, deleted_edges = self._ids, self._deleted_edges
+        node_id = ids[node]
+        candidate_ids = [ids[candidate] for candidate in candidates]
+        if self.symmetric:
+            pairs = [(other_id, node_id) if other_id < node_id else (node_id, other_id) for other_id in candidate_ids]
+        else:
+            pairs = [(node_id, other_id) for other_id in candidate_ids]
+        values = self._distance_values.get_many(pairs, _NOT_CACHED)
+        if deleted_edges:
+            for index, pair in enumerate(pairs):
+                if pair in deleted_edges:
+                    values[index] = float("Inf")
+        missing = [index for index, value in enumerate(values) if value is _NOT_CACHED]
+        if missing:
+            computed = super(CachedDistanceGraph, self)._distances(node, [candidates[index] for index in missing])
+            for index, value in zip(missing, computed):
+                values[index] = value
+            if self.cache_distance is not graph.ANY_DISTANCE:
+                missing = [index for index in missing if values[index] <= self.cache_distance]
+            self._distance_values.update((pairs[index], values[index]) for index in missing)
+            if self._distance_values.max_size is None:
+                self._index_pairs(node_id, [candidate_ids[index] for index in missing])
+        return values
 
     def __getitem__(self, item):
         # a:b -> slice -> edge
         if isinstance(item, slice):
             assert item.step is None, '%s does not support stride argument for edges' % self.__class__.__name__
-            node_from, node_to = item.start, item.stop
-            if node_from not in self._nodes:
-                raise graph.NoSuchEdge  # first edge node
-            elif node_to not in self._nodes:
-                raise graph.NoSuchEdge  # second edge node
-            # Since we don't know the type of nodes, we cannot test
-            # node_to > node_from to detect swapped pairs. Since we
-            # *do* store nodes in a `set`, they must support hash.
-            if self.symmetric and hash(node_to) > hash(node_from):
-                node_to, node_from = node_from, node_to
-            try:
-                return self._distance_values[node_from, node_to]
-            except KeyError:
-                self._distance_values[node_from, node_to] = self.distance(node_from, node_to)
-                return self._distance_values[node_from, node_to]
+            pair = self._pair(item.start, item.stop, graph.NoSuchEdge)
+            if self._deleted_edges and pair in self._deleted_edges:
+                return float("Inf")
+            value = self._distance_values.get(pair, _NOT_CACHED)
+            if value is _NOT_CACHED:
+                value = self.distance(item.start, item.stop)
+                if self.cache_distance is graph.ANY_DISTANCE or value <= self.cache_distance:
+                    self._distance_values[pair] = value
+                    if self._distance_values.max_size is None:
+                        self._index_pairs(pair[0], (pair[1],))
+            return value
         else:
             return super(CachedDistanceGraph, self).__getitem__(item)
 
+    def __setitem__(self, item, value):
+        super(CachedDistanceGraph, self).__setitem__(item, value)
+        if item not in self._ids:
+            self._ids[item] = next(self._next_id)
+
     def __delitem__(self, item):
         # a:b -> slice -> edge
         if isinstance(item, slice):
-            node_from, node_to = item.start, item.stop
-            if node_from not in self._nodes:
-                raise graph.NoSuchEdge  # first edge node
-            elif node_to not in self._nodes:
-                raise graph.NoSuchEdge  # second edge node
-            if self.symmetric and hash(node_to) > hash(node_from):
-                node_to, node_from = node_from, node_to
-            self._distance_values[node_from, node_to] = float("Inf")
+            pair = self._pair(item.start, item.stop, graph.NoSuchEdge)
+            self._distance_values.pop(pair)
+            self._deleted_edges.add(pair)
+            self._index_pairs(pair[0], (pair[1],))
         else:
             try:
                 self._nodes.remove(item)
             except KeyError:
                 raise graph.NoSuchNode
             else:
-                # clean up all stored distances
-                for node in self:
-                    self._distance_values.pop((item, node), None)
-                    if self.symmetric:
-                        continue
-                    self._distance_values.pop((node, item), None)
+                self._remove_pivot_row(item)
+                # The id of the node is never reused, so pairs left in a
+                # bounded cache can no longer be looked up and are evicted
+                # eventually. All other pairs of the node are indexed.
+                node_id = self._ids.pop(item)
+                pairs, distance_values, deleted_edges = self._pairs, self._distance_values, self._deleted_edges
+                for other_id in pairs.pop(node_id, ()):
+                    if not self.symmetric:
+                        distance_values.pop((other_id, node_id))
+                        deleted_edges.discard((other_id, node_id))
+                    pair = (node_id, other_id) if node_id < other_id or not self.symmetric else (other_id, node_id)
+                    distance_values.pop(pair)
+                    if deleted_edges:
+                        deleted_edges.discard(pair)
+                    if other_id != node_id:
+                        other_ids = pairs[other_id]
+                        other_ids.discard(node_id)
+                        if not other_ids:
+                            del pairs[other_id]
+
+
+class IndexedDistanceGraph(DistanceGraph):
+    """
+    Base for graphs of nodes connected by a distance function, whose neighbours are found via an index
+
+    Subclasses implement :py:meth:`_query_radius` to find the neighbours of a
+    node and their distances using an index, instead of scanning all nodes.
+    """
+    def _query_radius(self, node, distance):
+        """Find all nodes with a distance to `node` of at most `distance`, as pairs of `(neighbour, distance)`"""
+        raise NotImplementedError
+
+    def get_neighbours(self, node, distance=graph.ANY_DISTANCE):
+        if node not in self._nodes:
+            raise graph.NoSuchNode
+        if distance is graph.ANY_DISTANCE:
+            return (candidate for candidate in self if candidate != node)
+        return iter([neighbour for neighbour, _ in self._query_radius(node, distance)])
+
+    def get_neighbours_many(self, nodes, distance=graph.ANY_DISTANCE):
+        # query the index per node instead of scanning all nodes
+        return graph.Graph.get_neighbours_many(self, nodes, distance)
+
+    def get_neighbour_distances(self, nodes, distance=graph.ANY_DISTANCE):
+        if distance is graph.ANY_DISTANCE:
+            return super(IndexedDistanceGraph, self).get_neighbour_distances(nodes, distance)
+        nodes = list(nodes)
+        for node in nodes:
+            if node not in self._nodes:
+                raise graph.NoSuchNode
+        # the index computes the distances of all neighbours it finds
+        return {node: dict(self._query_radius(node, distance)) for node in nodes}
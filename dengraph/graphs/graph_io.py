@@ -3,7 +3,16 @@ Utilities for loading and storing Graphs
 """
 import csv
 import ast
+import gzip
+import io
 import itertools
+import multiprocessing
+import sys
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
 
 import dengraph.compat
 import dengraph.graph
@@ -58,6 +67,7 @@ def csv_graph_reader(
     :param max_distance: maximum allowed distance for edges, beyond which edges are ignored
     :param valid_edge: callable to test whether an edge should be inserted
     :param symmetric: whether to mirror the underlying matrix
+    :param processes: number of processes for parsing rows, or `None` for one per CPU
 
     The `iterable` argument can be any object that returns a line of
     input for each iteration step, such as a file object or a list.
@@ -98,6 +108,11 @@ def csv_graph_reader(
         `not_an_edge`, any literal of non-True values signifies a missing edge:
         `None`, `False`, `0` etc.
 
+        If `literal_type` is :py:class:`float`, the matrix is read in a fast
+        mode for numeric data: entire rows are converted and filtered at once,
+        using :py:mod:`numpy` if it is available. All distances are of type
+        :py:class:`float`, and every field must be a number.
+
     The CSV is interpreted as a matrix, where the row marks the origin of an
     edge and the column marks the destination. For an undirected graph, the
     matrix must be symmetric.
@@ -123,10 +138,20 @@ def csv_graph_reader(
     1  4  1          1    7     1
     ```
 
+    If `processes` is not `1`, lines are read in chunks of rows, which are
+    parsed in a :py:class:`multiprocessing.Pool`. The resulting graph is the
+    same as for sequential parsing. The `literal_type` and `valid_edge`
+    callables must be picklable, e.g. not a :py:keyword:`lambda`, and no
+    field may span several lines. As :py:func:`csv_graph_reader` accepts
+    `*args`, `processes` can only be passed as a keyword.
+
     :see: The `*args` and `**kwargs` are passed on directly to
           :py:class:`csv.reader` for extracting lines.
     """
-    reader = csv.reader(iterable, *args, **kwargs)
+    processes = kwargs.pop('processes', 1)
+    # the lines after the header may be passed to worker processes unparsed
+    iter_lines = iter(iterable)
+    reader = csv.reader(iter_lines, *args, **kwargs)
     first_line = next(reader)
     if nodes_header is False:
         first_line = list(first_line)
@@ -141,24 +166,233 @@ def csv_graph_reader(
         first_line = None
     else:
         raise TypeError("parameter 'nodes_header' must be True, False, an iterable or a callable")
-    # merge edge conditions to reduce checks
-    if max_distance is dengraph.graph.ANY_DISTANCE:
-        _valid_edge = valid_edge
+    if processes != 1:
+        row_edges = _row_edges_parallel(
+            first_line, iter_lines, len(nodes), processes,
+            (literal_type, max_distance, valid_edge, symmetric), args, kwargs
+        )
     else:
-        def _valid_edge(this_edge):
-            return valid_edge(this_edge) and this_edge <= max_distance
-    # fill graph with nodes
-    graph = dengraph.graphs.adjacency_graph.AdjacencyGraph({node: {} for node in nodes}, symmetric=symmetric)
-    # still need to consume the first line as content if not unset
-    iter_rows = reader if first_line is None else itertools.chain([first_line], reader)
-    for row_idx, row in enumerate(iter_rows):
+        # still need to consume the first line as content if not unset
+        iter_rows = reader if first_line is None else itertools.chain([first_line], reader)
+        row_edges = (
+            _row_edges(row_idx, row, len(nodes), literal_type, max_distance, valid_edge, symmetric)
+            for row_idx, row in enumerate(iter_rows)
+        )
+    adjacency = {node: {} for node in nodes}
+    for row_idx, (columns, distances) in enumerate(row_edges):
         node_from = nodes[row_idx]
-        for idx, literal in enumerate(row if not symmetric else row[-len(nodes) + row_idx:]):
-            node_to = nodes[idx] if not symmetric else nodes[row_idx + idx]
-            edge = literal_type(literal.strip())
-            if not _valid_edge(edge):
-                continue
-            graph[node_from:node_to] = edge
-            if symmetric and node_to != node_from:
-                graph[node_to:node_from] = edge
-    return graph
+        edges = [(nodes[column], distance) for column, distance in zip(columns, distances)]
+        adjacency[node_from].update(edges)
+        if symmetric:
+            for node_to, distance in edges:
+                adjacency[node_to][node_from] = distance
+    return dengraph.graphs.adjacency_graph.AdjacencyGraph(adjacency, symmetric=symmetric)
+
+
+def _row_edges(row_idx, row, node_count, literal_type, max_distance, valid_edge, symmetric):
+    """Parse the edges of a matrix row as a pair of lists `[column, ...], [distance, ...]`"""
+    # the upper right corner of a symmetric matrix starts at the diagonal
+    offset, row = (row_idx, row[-node_count + row_idx:]) if symmetric else (0, row)
+    if literal_type is float and numpy is not None:
+        distances = numpy.array(row, dtype=float)
+        if valid_edge is bool:
+            in_reach = distances != 0
+        else:
+            in_reach = numpy.fromiter((valid_edge(distance) for distance in distances.tolist()), bool)
+        if max_distance is not dengraph.graph.ANY_DISTANCE:
+            in_reach &= distances <= max_distance
+        columns = numpy.flatnonzero(in_reach)
+        return (columns + offset).tolist(), distances[columns].tolist()
+    if literal_type is float:
+        distances = [float(literal) for literal in row]
+    else:
+        distances = [literal_type(literal.strip()) for literal in row]
+    edges = [
+        (offset + column, distance) for column, distance in enumerate(distances)
+        if valid_edge(distance) and (max_distance is dengraph.graph.ANY_DISTANCE or distance <= max_distance)
+    ]
+    return [column for column, _ in edges], [distance for _, distance in edges]
+
+
+#: state of worker processes for parallel parsing
+_WORKER_STATE = {}
+
+
+def _init_row_worker(node_count, literal_type, max_distance, valid_edge, symmetric, csv_args, csv_kwargs):
+    """Prepare a worker process for parsing matrix rows"""
+    # ANY_DISTANCE is not identical after pickling
+    max_distance = dengraph.graph.ANY_DISTANCE if max_distance is None else max_distance
+    _WORKER_STATE['row_args'] = node_count, literal_type, max_distance, valid_edge, symmetric
+    _WORKER_STATE['csv_args'] = csv_args, csv_kwargs
+
+
+def _row_edges_worker(task):
+    """Parse the edges of all rows in `task = (first_row_idx, lines)`"""
+    first_row_idx, lines = task
+    csv_args, csv_kwargs = _WORKER_STATE['csv_args']
+    row_args = _WORKER_STATE['row_args']
+    return [
+        _row_edges(first_row_idx + idx, row, *row_args)
+        for idx, row in enumerate(csv.reader(lines, *csv_args, **csv_kwargs))
+    ]
+
+
+def _row_edges_parallel(first_line, iter_lines, node_count, processes, row_args, csv_args, csv_kwargs):
+    """Parse the edges of all rows in worker processes, in order of rows"""
+    processes = processes or multiprocessing.cpu_count()
+    literal_type, max_distance, valid_edge, symmetric = row_args
+    # several chunks per process, each with about 2**20 fields at most
+    chunk_size = max(1, min(node_count // (4 * processes), 2 ** 20 // max(1, node_count)))
+    if first_line is not None:
+        yield _row_edges(0, first_line, node_count, *row_args)
+    first_row_idx = 0 if first_line is None else 1
+
+    def tasks():
+        row_idx = first_row_idx
+        while True:
+            lines = list(itertools.islice(iter_lines, chunk_size))
+            if not lines:
+                break
+            yield row_idx, lines
+            row_idx += len(lines)
+
+    pool = multiprocessing.Pool(
+        processes=processes,
+        initializer=_init_row_worker,
+        initargs=(
+            node_count, literal_type, None if max_distance is dengraph.graph.ANY_DISTANCE else max_distance,
+            valid_edge, symmetric, csv_args, csv_kwargs,
+        ),
+    )
+    try:
+        for chunk_edges in pool.imap(_row_edges_worker, tasks()):
+            for edges in chunk_edges:
+                yield edges
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def open_graph_file(path, mode='r'):
+    """
+    Open a text file for reading or writing graphs, which is gzip compressed if `path` ends with ``.gz``
+
+    :param path: path of the file to open
+    :param mode: either ``'r'`` for reading or ``'w'`` for writing
+
+    Lines are read and written as native strings, i.e. :py:class:`str` in
+    both python 2 and python 3.
+    """
+    if mode not in ('r', 'w'):
+        raise ValueError("parameter 'mode' must be 'r' or 'w'")
+    if sys.version_info < (3,):
+        # text files of python 2 only accept unicode, but str is written
+        if path.endswith('.gz'):
+            return gzip.open(path, mode + 'b')
+        return open(path, mode)
+    if path.endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(path, mode + 'b'))
+    return io.open(path, mode)
+
+
+def edge_list_reader(
+        iterable,
+        node_type=str,
+        literal_type=stripped_literal,
+        max_distance=dengraph.graph.ANY_DISTANCE,
+        symmetric=False,
+        graph_type=dengraph.graphs.adjacency_graph.AdjacencyGraph,
+        delimiter=None,
+):
+    """
+    Utility for reading a graph from a list of edges
+
+    :param iterable: an iterable yielding lines of edges
+    :param node_type: type callable to evaluate nodes
+    :param literal_type: type callable to evaluate distances
+    :param max_distance: maximum allowed distance for edges, beyond which edges are ignored
+    :param symmetric: whether to mirror each edge
+    :param graph_type: class of the graph to create from the edges
+    :param delimiter: string separating the fields of each line, or :py:const:`None` for any whitespace
+
+    Each line of `iterable` contains an edge as `node_from node_to distance`,
+    for example:
+
+    ```
+    a b 2
+    a c 1
+    b c 3
+    d
+    ```
+
+    A line containing only a single node, such as `d`, adds the node without
+    any edges. Empty lines and lines starting with ``#`` are ignored.
+
+    Lines are consumed lazily, and edges beyond `max_distance` are discarded
+    while reading. Only the final adjacency is held in memory, which is
+    passed to `graph_type` as
+    `graph_type(source=adjacency, max_distance=max_distance, symmetric=symmetric)`.
+    Use :py:func:`open_graph_file` to read from a plain or gzip compressed file.
+
+    If `symmetric` evaluates to `True`, each edge `a b` also adds the edge
+    `b a`. An edge thus only needs to be listed for one direction.
+
+    :see: :py:func:`csv_graph_reader` for the `literal_type` parameter. For
+          numeric distances, :py:class:`float` is considerably faster than
+          the default.
+    """
+    adjacency = {}
+    for line in iterable:
+        line = line.strip()
+        if not line or line[0] == '#':
+            continue
+        fields = line.split(delimiter)
+        node_from = node_type(fields[0].strip())
+        neighbours = adjacency.setdefault(node_from, {})
+        if len(fields) == 1:
+            continue
+        node_to, distance = node_type(fields[1].strip()), literal_type(fields[2].strip())
+        other_neighbours = adjacency.setdefault(node_to, {})
+        if max_distance is dengraph.graph.ANY_DISTANCE or distance <= max_distance:
+            neighbours[node_to] = distance
+            if symmetric:
+                other_neighbours[node_from] = distance
+    return graph_type(source=adjacency, max_distance=max_distance, symmetric=symmetric)
+
+
+def edge_list_writer(graph, writable, max_distance=dengraph.graph.ANY_DISTANCE, delimiter=' '):
+    """
+    Utility for writing a graph as a list of edges
+
+    :param graph: the :py:class:`~dengraph.graph.Graph` to write
+    :param writable: a file-like object to write lines to
+    :param max_distance: maximum allowed distance for edges, beyond which edges are not written
+    :param delimiter: string separating the fields of each line
+
+    Edges are written as `node_from node_to distance` lines, readable by
+    :py:func:`edge_list_reader`. Nodes are written via :py:func:`str` and
+    distances via :py:func:`repr`. Nodes without any edges are written as a
+    line of their own.
+
+    The edges of each node are queried and written in turn. If the graph is
+    symmetric, each edge is only written for one direction; it must be read
+    back with `symmetric=True`.
+    """
+    symmetric = getattr(graph, 'symmetric', False)
+    done = set()  # nodes whose edges have been written
+    listed = set()  # nodes contained in any line
+    for node in graph:
+        neighbours = [
+            neighbour for neighbour in graph.get_neighbours(node, max_distance)
+            if not symmetric or neighbour not in done
+        ]
+        if symmetric:
+            done.add(node)
+        if neighbours:
+            writable.writelines(
+                '%s%s%s%s%r\n' % (node, delimiter, neighbour, delimiter, graph[node:neighbour])
+                for neighbour in neighbours
+            )
+            listed.update(neighbours)
+        elif node not in listed:
+            writable.write('%s\n' % (node,))
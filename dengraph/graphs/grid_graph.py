@@ -0,0 +1,127 @@
+from __future__ import absolute_import
+import math
+import itertools
+
+from dengraph import graph
+from dengraph.graphs.distance_graph import IndexedDistanceGraph
+from dengraph.distances.minkowski_distance import MinkowskiDistance
+
+#: relative tolerance for rounding errors of cell coordinates
+_TOLERANCE = 1e-9
+
+
+class GridGraph(IndexedDistanceGraph):
+    r"""
+    Graph of vector nodes connected by a distance, indexed by a uniform grid
+
+    :param nodes: all nodes contained in the graph, as sequences of coordinates
+    :param cell_size: edge length of the grid cells
+    :param distance: a function `dist(a, b)->object` that computes the distance between any two nodes
+    :param symmetric: whether distance can be treated as symmetric, i.e. `dist(a, b) == dist(b, a)`
+
+    Nodes must be sequences of numbers of equal length, for example tuples of
+    coordinates. By default, the :py:class:`~.MinkowskiDistance` with `p=2`
+    is used, i.e. the euclidean distance.
+
+    Nodes are bucketed into cubic cells of width `cell_size`. Queries for
+    neighbours within a distance only inspect nodes in cells close enough to
+    hold neighbours. This is most efficient if `cell_size` is the
+    `cluster_distance` used for clustering: a query then only inspects the
+    3\ :sup:`d` cells surrounding a node of dimension `d`. Adding and removing
+    nodes requires O(1) time.
+
+    Larger query distances inspect more cells. If there are fewer occupied
+    cells than cells to inspect, all occupied cells are scanned instead.
+
+    :warning: The `distance` must never be smaller than the difference in any
+              coordinate, i.e. `dist(a, b) >= abs(a[i] - b[i])`. This holds for
+              any :py:class:`~.MinkowskiDistance`, but not for arbitrary
+              distances such as the cosine distance.
+    """
+    def __init__(self, nodes, cell_size, distance=None, symmetric=True):
+        super(GridGraph, self).__init__(nodes, distance if distance is not None else MinkowskiDistance(), symmetric)
+        if not cell_size > 0:
+            raise ValueError('cell_size must be positive')
+        self.cell_size = cell_size
+        self._dimensions = None
+        self._cells = {}  # {cell: {node, node, ...}, ...}
+        for node in self._nodes:
+            self._cells.setdefault(self._cell(node), set()).add(node)
+
+    def _cell(self, node):
+        """Get the cell containing `node`"""
+        if self._dimensions is None:
+            self._dimensions = len(node)
+        elif len(node) != self._dimensions:
+            raise ValueError('%s requires nodes of dimension %d, got %r' % (
+                self.__class__.__name__, self._dimensions, node
+            ))
+        cell_size = self.cell_size
+        return tuple(int(math.floor(coordinate / cell_size)) for coordinate in node)
+
+    def __setitem__(self, item, value):
+        if value or isinstance(item, slice):
+            raise TypeError('%s does not support edge assignment' % self.__class__.__name__)
+        elif item not in self._nodes:
+            self._cells.setdefault(self._cell(item), set()).add(item)
+            self._nodes.add(item)
+
+    def __delitem__(self, item):
+        # a:b -> slice -> edge
+        if isinstance(item, slice):
+            raise TypeError('%s does not support edge deletion' % self.__class__.__name__)
+        else:
+            try:
+                self._nodes.remove(item)
+            except KeyError:
+                raise graph.NoSuchNode
+            else:
+                cell = self._cell(item)
+                cell_nodes = self._cells[cell]
+                cell_nodes.discard(item)
+                if not cell_nodes:
+                    del self._cells[cell]
+
+    def _query_radius(self, node, distance):
+        """Find all nodes with a distance to `node` of at most `distance`, as pairs of `(neighbour, distance)`"""
+        dist = self.distance
+        return (
+            (candidate, value) for candidate, value in (
+                (candidate, dist(node, candidate)) for cell_nodes in self._cells_in_reach(node, distance)
+                for candidate in cell_nodes if candidate != node
+            ) if value <= distance
+        )
+
+    def _cells_in_reach(self, node, distance):
+        """Yield the nodes of all cells that may contain nodes within `distance` of `node`"""
+        cell_size = float(self.cell_size)
+        # widen the bounds slightly, as rounding may move nodes at the edge of
+        # a cell into the next one
+        bounds = []
+        for coordinate in node:
+            lower, upper = (coordinate - distance) / cell_size, (coordinate + distance) / cell_size
+            bounds.append((
+                int(math.floor(lower - (abs(lower) + 1) * _TOLERANCE)),
+                int(math.floor(upper + (abs(upper) + 1) * _TOLERANCE)),
+            ))
+        cells = self._cells
+        cell_count = 1
+        for lower, upper in bounds:
+            cell_count *= upper - lower + 1
+        if cell_count <= len(cells):
+            for cell in itertools.product(*(range(lower, upper + 1) for lower, upper in bounds)):
+                try:
+                    yield cells[cell]
+                except KeyError:
+                    pass
+        else:
+            for cell, cell_nodes in cells.items():
+                if all(lower <= index <= upper for index, (lower, upper) in zip(cell, bounds)):
+                    yield cell_nodes
+
+    def __add__(self, other):
+        if isinstance(self, other.__class__) and self.distance == other.distance:
+            return self.__class__(
+                self._nodes.union(other), self.cell_size, self.distance, self.symmetric and other.symmetric
+            )
+        return NotImplemented
@@ -0,0 +1,162 @@
+from __future__ import absolute_import
+from dengraph import graph
+from dengraph.graphs.distance_graph import IndexedDistanceGraph
+from dengraph.distances.minkowski_distance import MinkowskiDistance
+
+
+class _KDLeaf(object):
+    """Bucket of nodes at the bottom of a :py:class:`KDTreeGraph`"""
+    __slots__ = ('nodes',)
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+
+class _KDSplit(object):
+    """Inner node of a :py:class:`KDTreeGraph`, separating nodes along one axis"""
+    __slots__ = ('axis', 'split', 'lower', 'upper')
+
+    def __init__(self, axis, split, lower, upper):
+        self.axis = axis
+        self.split = split
+        self.lower = lower  # all nodes with node[axis] < split
+        self.upper = upper  # all nodes with node[axis] >= split
+
+
+class KDTreeGraph(IndexedDistanceGraph):
+    r"""
+    Graph of vector nodes connected by a distance, indexed by a k-d tree
+
+    :param nodes: all nodes contained in the graph, as sequences of coordinates
+    :param distance: a function `dist(a, b)->object` that computes the distance between any two nodes
+    :param symmetric: whether distance can be treated as symmetric, i.e. `dist(a, b) == dist(b, a)`
+    :param leaf_size: maximum number of nodes stored in a leaf of the tree
+
+    Nodes must be sequences of numbers of equal length, for example tuples of
+    coordinates. By default, the :py:class:`~.MinkowskiDistance` with `p=2`
+    is used, i.e. the euclidean distance.
+
+    Queries for neighbours within a distance are answered by walking only
+    those branches of the tree which may contain nodes in range. For N nodes,
+    this requires O(log N + k) distance computations to find k neighbours.
+    Adding and removing nodes modifies the tree in-place, splitting leaves
+    that grow beyond `leaf_size`.
+
+    :warning: The `distance` must never be smaller than the difference in any
+              coordinate, i.e. `dist(a, b) >= abs(a[i] - b[i])`. This holds for
+              any :py:class:`~.MinkowskiDistance`, but not for arbitrary
+              distances such as the cosine distance.
+    """
+    def __init__(self, nodes, distance=None, symmetric=True, leaf_size=16):
+        super(KDTreeGraph, self).__init__(nodes, distance if distance is not None else MinkowskiDistance(), symmetric)
+        if leaf_size < 1:
+            raise ValueError('leaf_size must be at least 1')
+        self.leaf_size = leaf_size
+        self._dimensions = None
+        for node in self._nodes:
+            self._check_dimensions(node)
+        self._root = self._build_tree(list(self._nodes))
+
+    def _check_dimensions(self, node):
+        if self._dimensions is None:
+            self._dimensions = len(node)
+        elif len(node) != self._dimensions:
+            raise ValueError('%s requires nodes of dimension %d, got %r' % (
+                self.__class__.__name__, self._dimensions, node
+            ))
+
+    def _build_tree(self, nodes):
+        """Create a (sub-)tree containing all of `nodes`"""
+        if len(nodes) <= self.leaf_size:
+            return _KDLeaf(nodes)
+        axis, split = self._split_point(nodes)
+        if axis is None:
+            return _KDLeaf(nodes)
+        return _KDSplit(
+            axis, split,
+            self._build_tree([node for node in nodes if node[axis] < split]),
+            self._build_tree([node for node in nodes if node[axis] >= split]),
+        )
+
+    def _split_point(self, nodes):
+        """Find the axis with the widest spread and its median, or `None, None` if nodes cannot be split"""
+        axis, spread = None, 0
+        for dimension in range(self._dimensions):
+            coordinates = [node[dimension] for node in nodes]
+            if max(coordinates) - min(coordinates) > spread:
+                axis, spread = dimension, max(coordinates) - min(coordinates)
+        if axis is None:
+            return None, None
+        coordinates = sorted(node[axis] for node in nodes)
+        split = coordinates[len(coordinates) // 2]
+        if split == coordinates[0]:
+            # ensure the lower branch is not empty
+            split = next(coordinate for coordinate in coordinates if coordinate > split)
+        return axis, split
+
+    def _find_leaf(self, node):
+        parent, tree = None, self._root
+        while tree.__class__ is _KDSplit:
+            parent, tree = tree, tree.lower if node[tree.axis] < tree.split else tree.upper
+        return parent, tree
+
+    def __setitem__(self, item, value):
+        if value or isinstance(item, slice):
+            raise TypeError('%s does not support edge assignment' % self.__class__.__name__)
+        elif item not in self._nodes:
+            self._check_dimensions(item)
+            self._nodes.add(item)
+            parent, leaf = self._find_leaf(item)
+            leaf.nodes.append(item)
+            if len(leaf.nodes) > self.leaf_size:
+                subtree = self._build_tree(leaf.nodes)
+                if parent is None:
+                    self._root = subtree
+                elif parent.lower is leaf:
+                    parent.lower = subtree
+                else:
+                    parent.upper = subtree
+
+    def __delitem__(self, item):
+        # a:b -> slice -> edge
+        if isinstance(item, slice):
+            raise TypeError('%s does not support edge deletion' % self.__class__.__name__)
+        else:
+            try:
+                self._nodes.remove(item)
+            except KeyError:
+                raise graph.NoSuchNode
+            else:
+                self._find_leaf(item)[1].nodes.remove(item)
+
+    def _query_radius(self, node, distance):
+        """Find all nodes with a distance to `node` of at most `distance`, as pairs of `(neighbour, distance)`"""
+        neighbours = []
+        dist = self.distance
+        stack = [self._root]
+        while stack:
+            tree = stack.pop()
+            if tree.__class__ is _KDSplit:
+                offset = node[tree.axis] - tree.split
+                if offset < 0:
+                    stack.append(tree.lower)
+                    if -offset <= distance:
+                        stack.append(tree.upper)
+                else:
+                    stack.append(tree.upper)
+                    if offset <= distance:
+                        stack.append(tree.lower)
+            else:
+                neighbours.extend(
+                    (candidate, value) for candidate, value in (
+                        (candidate, dist(node, candidate)) for candidate in tree.nodes if candidate != node
+                    ) if value <= distance
+                )
+        return neighbours
+
+    def __add__(self, other):
+        if isinstance(self, other.__class__) and self.distance == other.distance:
+            return self.__class__(
+                self._nodes.union(other), self.distance, self.symmetric and other.symmetric, self.leaf_size
+            )
+        return NotImplemented
@@ -0,0 +1,260 @@
+from __future__ import absolute_import
+
+import array
+import bisect
+import mmap
+import pickle
+import shutil
+import struct
+import sys
+import tempfile
+
+import dengraph.graph
+import dengraph.utilities.pretty
+
+try:
+    array.array('q')
+except ValueError:  # pragma: no cover
+    _OFFSET_TYPECODE = 'l'
+else:
+    _OFFSET_TYPECODE = 'q'
+
+#: identifier at the start of every graph file
+MAGIC = b'DENGRAPH'
+#: version of the file layout written by :py:func:`write_mmap_graph`
+VERSION = 1
+
+# magic, version, flags, node count, edge count, position of the node table
+_HEADER = struct.Struct('<8sIIQQQ')
+_FLAG_SYMMETRIC = 1
+_OFFSET = struct.Struct('<q')
+_NEIGHBOUR = struct.Struct('<i')
+
+
+def write_mmap_graph(graph, path, max_distance=dengraph.graph.ANY_DISTANCE):
+    """
+    Store any graph as a file readable by :py:class:`MMapGraph`
+
+    :param graph: the :py:class:`~dengraph.graph.Graph` to store
+    :param path: path of the file to write
+    :param max_distance: maximum allowed distance for stored edges
+
+    Nodes are stored via :py:mod:`pickle` in a table at the end of the file.
+    The edges of each node are written as soon as they are queried from
+    `graph`, so that only the node table and the offset of each node are
+    held in memory.
+
+    The file starts with a header of magic, version, flags and sizes,
+    followed by three arrays of compressed sparse rows: the offset of the
+    first edge of each node as 64 bit integers, the ids of all neighbours as
+    32 bit integers, and the distance of all edges as 64 bit floats. All
+    values are little-endian.
+    """
+    nodes = list(graph)
+    ids = {node: node_id for node_id, node in enumerate(nodes)}
+    offsets = array.array(_OFFSET_TYPECODE, [0])
+    with open(path, 'wb') as graph_file, tempfile.TemporaryFile() as distance_file:
+        # header and offsets are only known at the end
+        graph_file.write(b'\0' * (_HEADER.size + _OFFSET.size * (len(nodes) + 1)))
+        for node in nodes:
+            row = sorted(
+                (ids[neighbour], float(graph[node:neighbour]))
+                for neighbour in graph.get_neighbours(node, max_distance)
+            )
+            graph_file.write(struct.pack('<%di' % len(row), *(neighbour_id for neighbour_id, _ in row)))
+            distance_file.write(struct.pack('<%dd' % len(row), *(distance for _, distance in row)))
+            offsets.append(offsets[-1] + len(row))
+        # align distances to 8 bytes
+        graph_file.write(b'\0' * (-graph_file.tell() % 8))
+        distance_file.seek(0)
+        shutil.copyfileobj(distance_file, graph_file)
+        nodes_position = graph_file.tell()
+        pickle.dump(nodes, graph_file, protocol=2)
+        graph_file.seek(0)
+        graph_file.write(_HEADER.pack(
+            MAGIC, VERSION, _FLAG_SYMMETRIC if getattr(graph, 'symmetric', False) else 0,
+            len(nodes), offsets[-1], nodes_position,
+        ))
+        if offsets.itemsize == _OFFSET.size:
+            if sys.byteorder == 'big':  # pragma: no cover
+                offsets.byteswap()
+            offsets.tofile(graph_file)
+        else:  # pragma: no cover
+            graph_file.write(struct.pack('<%dq' % len(offsets), *offsets))
+
+
+class MMapGraph(dengraph.graph.Graph):
+    r"""
+    Read-only graph served from a memory-mapped file
+
+    :param path: path of a file written by :py:func:`write_mmap_graph`
+
+    Edges are stored as compressed sparse rows, as for
+    :py:class:`~dengraph.graphs.compact_adjacency_graph.CompactAdjacencyGraph`.
+    The file is memory-mapped instead of being read: only the node table is
+    loaded into memory, whereas edges are read on demand. This allows to use
+    graphs with more edges than fit into memory, and opening a file takes
+    time proportional to its number of nodes, not edges.
+
+    Looking up an edge takes O(log d) time for a node with d neighbours.
+    The graph cannot be modified; create a new file with
+    :py:func:`write_mmap_graph` instead.
+
+    The file is closed via :py:meth:`close`, or by using the graph as a
+    context manager.
+    """
+    #: maximum number of neighbours of a node for which edge lookups read the entire row
+    bisect_threshold = 256
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as graph_file:
+            self._mmap = mmap.mmap(graph_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, flags, node_count, edge_count, nodes_position = _HEADER.unpack_from(self._mmap, 0)
+        except struct.error:
+            self._mmap.close()
+            raise ValueError('%r is not a graph file' % path)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError('%r is not a graph file of version %d' % (path, VERSION))
+        self._symmetric = bool(flags & _FLAG_SYMMETRIC)
+        self._offsets_position = _HEADER.size
+        self._neighbours_position = self._offsets_position + _OFFSET.size * (node_count + 1)
+        distances_position = self._neighbours_position + _NEIGHBOUR.size * edge_count
+        self._distances_position = distances_position + (-distances_position % 8)
+        self._nodes = pickle.loads(self._mmap[nodes_position:])  # [node, ...] by id
+        self._ids = {node: node_id for node_id, node in enumerate(self._nodes)}  # {node: id, ...}
+
+    @property
+    def symmetric(self):
+        """Whether the stored graph was symmetric. Read-only attribute."""
+        return self._symmetric
+
+    def close(self):
+        """Release the memory-mapped file"""
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def _id(self, node):
+        try:
+            return self._ids[node]
+        except KeyError:
+            raise dengraph.graph.NoSuchNode
+
+    def _bounds(self, node_id):
+        """Get the indices of the first and behind the last edge of a node"""
+        return struct.unpack_from('<2q', self._mmap, self._offsets_position + _OFFSET.size * node_id)
+
+    def _row_ids(self, start, end):
+        return struct.unpack_from(
+            '<%di' % (end - start), self._mmap, self._neighbours_position + _NEIGHBOUR.size * start
+        )
+
+    def _row_distances(self, start, end):
+        return struct.unpack_from('<%dd' % (end - start), self._mmap, self._distances_position + 8 * start)
+
+    def _distance(self, node_id, neighbour_id):
+        """Get the distance of an edge, raising :py:exc:`KeyError` if it does not exist"""
+        start, end = self._bounds(node_id)
+        if end - start <= self.bisect_threshold:
+            neighbour_ids = self._row_ids(start, end)
+            index = bisect.bisect_left(neighbour_ids, neighbour_id)
+            if index == len(neighbour_ids) or neighbour_ids[index] != neighbour_id:
+                raise KeyError(neighbour_id)
+            index += start
+        else:
+            # bisect the neighbours without reading the entire row
+            unpack_neighbour, neighbours_position = _NEIGHBOUR.unpack_from, self._neighbours_position
+            low, high = start, end
+            while low < high:
+                middle = (low + high) // 2
+                if unpack_neighbour(self._mmap, neighbours_position + _NEIGHBOUR.size * middle)[0] < neighbour_id:
+                    low = middle + 1
+                else:
+                    high = middle
+            if (
+                    low == end or
+                    unpack_neighbour(self._mmap, neighbours_position + _NEIGHBOUR.size * low)[0] != neighbour_id
+            ):
+                raise KeyError(neighbour_id)
+            index = low
+        return self._row_distances(index, index + 1)[0]
+
+    def _neighbour_ids(self, node_id, distance):
+        """Get the ids of all neighbours of a node with edge weight smaller or equal to `distance`"""
+        start, end = self._bounds(node_id)
+        neighbour_ids = self._row_ids(start, end)
+        if distance is dengraph.graph.ANY_DISTANCE:
+            return neighbour_ids
+        return [
+            neighbour_id for neighbour_id, neighbour_distance in zip(neighbour_ids, self._row_distances(start, end))
+            if neighbour_distance <= distance
+        ]
+
+    def __contains__(self, item):
+        # a:b -> slice -> edge
+        if item.__class__ == slice:
+            try:
+                self._distance(self._ids[item.start], self._ids[item.stop])
+            except KeyError:
+                return False
+            return True
+        # node
+        return item in self._ids
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __getitem__(self, item):
+        # a:b -> slice -> edge
+        if isinstance(item, slice):
+            assert item.step is None, '%s does not support stride argument for edges' % self.__class__.__name__
+            try:
+                return self._distance(self._ids[item.start], self._ids[item.stop])
+            except KeyError:
+                raise dengraph.graph.NoSuchEdge
+        else:
+            start, end = self._bounds(self._id(item))
+            nodes = self._nodes
+            return {
+                nodes[neighbour_id]: distance for neighbour_id, distance
+                in zip(self._row_ids(start, end), self._row_distances(start, end))
+            }
+
+    def __setitem__(self, item, value):
+        raise TypeError('%s does not support modification' % self.__class__.__name__)
+
+    def __delitem__(self, item):
+        raise TypeError('%s does not support modification' % self.__class__.__name__)
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def get_neighbours(self, node, distance=dengraph.graph.ANY_DISTANCE):
+        nodes = self._nodes
+        return iter([nodes[neighbour_id] for neighbour_id in self._neighbour_ids(self._id(node), distance)])
+
+    def get_neighbours_many(self, nodes, distance=dengraph.graph.ANY_DISTANCE):
+        all_nodes = self._nodes
+        return {
+            node: {all_nodes[neighbour_id] for neighbour_id in self._neighbour_ids(self._id(node), distance)}
+            for node in nodes
+        }
+
+    def neighbour_counts(self, nodes, distance=dengraph.graph.ANY_DISTANCE):
+        return {node: len(self._neighbour_ids(self._id(node), distance)) for node in nodes}
+
+    def __repr__(self):
+        return '%s(path=%r, symmetric=%r, nodes=%s)' % (
+            self.__class__.__name__,
+            self.path,
+            self.symmetric,
+            dengraph.utilities.pretty.repr_container(self._nodes)
+        )
@@ -0,0 +1,188 @@
+from __future__ import absolute_import
+import numbers
+
+from dengraph import graph
+import dengraph.distance
+from dengraph.graphs.distance_graph import IndexedDistanceGraph
+
+#: relative tolerance of pruning, compensating rounding errors of distances
+_TOLERANCE = 1e-9
+
+
+def _reach(distance, scale):
+    """Widen `distance` to compensate rounding errors of distances up to `scale`"""
+    if isinstance(distance, numbers.Real):
+        return distance + _TOLERANCE * (1 + scale)
+    # other distances, such as the timedelta of datetime nodes, are exact
+    return distance
+
+
+class _VPLeaf(object):
+    """Bucket of nodes at the bottom of a :py:class:`VPTreeGraph`"""
+    __slots__ = ('nodes', 'rows')
+
+    def __init__(self, nodes, rows):
+        self.nodes = nodes
+        self.rows = rows  # distances of each node to the vantage points of all parents, from the root
+
+
+class _VPSplit(object):
+    """Inner node of a :py:class:`VPTreeGraph`, separating nodes by their distance to a vantage point"""
+    __slots__ = ('vantage', 'radius', 'inner_max', 'outer_min', 'outer_max', 'inner', 'outer')
+
+    def __init__(self, vantage, radius, inner_max, outer_min, outer_max, inner, outer):
+        self.vantage = vantage
+        self.radius = radius
+        # bounds of the distances to the vantage point in each branch
+        self.inner_max = inner_max
+        self.outer_min = outer_min
+        self.outer_max = outer_max
+        self.inner = inner  # all nodes with dist(vantage, node) < radius
+        self.outer = outer  # all nodes with dist(vantage, node) >= radius
+
+
+class VPTreeGraph(IndexedDistanceGraph):
+    r"""
+    Graph of nodes connected by a metric distance, indexed by a vantage-point tree
+
+    :param nodes: all nodes contained in the graph
+    :param distance: a metric :py:class:`~dengraph.distance.Distance`
+    :param leaf_size: maximum number of nodes stored in a leaf of the tree
+
+    Unlike the :py:class:`~.KDTreeGraph`, nodes may be arbitrary objects. The
+    tree only relies on the `distance` being a metric, as declared by its
+    :py:attr:`~dengraph.distance.Distance.is_metric` flag. Each branch splits
+    nodes by their distance to a vantage point; by the triangle inequality,
+    queries for neighbours within a distance only walk those branches which
+    may contain nodes in range. Nodes in leaves are further pruned by their
+    distances to all vantage points above them. Distances need not be real
+    numbers, e.g. :py:class:`~datetime.datetime` nodes with a
+    :py:class:`~dengraph.distances.delta_distance.DeltaDistance` work as well.
+
+    Building the tree requires O(N log N) distance computations. Adding a
+    node requires O(log N) distance computations, removing a node none.
+    Leaves that grow beyond `leaf_size` are split in-place.
+
+    :warning: Vantage points stay in the tree even if their node is removed
+              from the graph. A graph with many removed nodes should be
+              rebuilt eventually.
+    """
+    def __init__(self, nodes, distance, leaf_size=16):
+        if not getattr(distance, 'is_metric', False):
+            raise ValueError('%s requires a metric distance, got %r' % (self.__class__.__name__, distance))
+        if leaf_size < 1:
+            raise ValueError('leaf_size must be at least 1')
+        super(VPTreeGraph, self).__init__(nodes, distance, symmetric=True)
+        self.leaf_size = leaf_size
+        self._leaves = {}  # {node: leaf, ...}
+        self._root = self._build_tree(list(self._nodes), [()] * len(self._nodes))
+
+    def _build_tree(self, nodes, rows):
+        """Create a (sub-)tree of `nodes`, given the `rows` of their distances to all parent vantage points"""
+        if len(nodes) <= self.leaf_size:
+            return self._make_leaf(nodes, rows)
+        # nodes far away from the previous vantage point spread out the tree
+        vantage = nodes[max(range(len(nodes)), key=lambda index: rows[index][-1])] if rows[0] else nodes[0]
+        vantage_distances = dengraph.distance.one_to_many(self.distance, vantage, nodes)
+        ordered = sorted(vantage_distances)
+        radius = ordered[len(ordered) // 2]
+        if radius == ordered[0]:
+            # ensure the inner branch is not empty
+            radius = next((value for value in ordered if value > radius), None)
+            if radius is None:
+                return self._make_leaf(nodes, rows)
+        inner = [index for index, value in enumerate(vantage_distances) if value < radius]
+        outer = [index for index, value in enumerate(vantage_distances) if value >= radius]
+        return _VPSplit(
+            vantage, radius, max(vantage_distances[index] for index in inner), radius, ordered[-1],
+            self._build_tree(
+                [nodes[index] for index in inner], [rows[index] + (vantage_distances[index],) for index in inner]
+            ),
+            self._build_tree(
+                [nodes[index] for index in outer], [rows[index] + (vantage_distances[index],) for index in outer]
+            ),
+        )
+
+    def _make_leaf(self, nodes, rows):
+        leaf = _VPLeaf(nodes, rows)
+        for node in nodes:
+            self._leaves[node] = leaf
+        return leaf
+
+    def __setitem__(self, item, value):
+        if value or isinstance(item, slice):
+            raise TypeError('%s does not support edge assignment' % self.__class__.__name__)
+        elif item not in self._nodes:
+            self._nodes.add(item)
+            parent, tree, row = None, self._root, ()
+            while tree.__class__ is _VPSplit:
+                vantage_distance = self.distance(tree.vantage, item)
+                row += (vantage_distance,)
+                parent = tree
+                if vantage_distance < tree.radius:
+                    tree.inner_max = max(tree.inner_max, vantage_distance)
+                    tree = tree.inner
+                else:
+                    tree.outer_min = min(tree.outer_min, vantage_distance)
+                    tree.outer_max = max(tree.outer_max, vantage_distance)
+                    tree = tree.outer
+            tree.nodes.append(item)
+            tree.rows.append(row)
+            self._leaves[item] = tree
+            if len(tree.nodes) > self.leaf_size:
+                subtree = self._build_tree(tree.nodes, tree.rows)
+                if parent is None:
+                    self._root = subtree
+                elif parent.inner is tree:
+                    parent.inner = subtree
+                else:
+                    parent.outer = subtree
+
+    def __delitem__(self, item):
+        # a:b -> slice -> edge
+        if isinstance(item, slice):
+            raise TypeError('%s does not support edge deletion' % self.__class__.__name__)
+        else:
+            try:
+                self._nodes.remove(item)
+            except KeyError:
+                raise graph.NoSuchNode
+            else:
+                leaf = self._leaves.pop(item)
+                index = leaf.nodes.index(item)
+                del leaf.nodes[index]
+                del leaf.rows[index]
+
+    def _query_radius(self, node, distance):
+        """Find all nodes with a distance to `node` of at most `distance`, as pairs of `(neighbour, distance)`"""
+        neighbours = []
+        dist = self.distance
+        stack = [(self._root, ())]  # [(tree, distances of node to all parent vantage points), ...]
+        while stack:
+            tree, row = stack.pop()
+            if tree.__class__ is _VPSplit:
+                vantage_distance = dist(node, tree.vantage)
+                # rounding errors must not exclude neighbours at the limit
+                reach = _reach(distance, vantage_distance)
+                row += (vantage_distance,)
+                if vantage_distance - reach <= tree.inner_max:
+                    stack.append((tree.inner, row))
+                if tree.outer_min <= vantage_distance + reach and vantage_distance - reach <= tree.outer_max:
+                    stack.append((tree.outer, row))
+            elif tree.nodes:
+                reach = _reach(distance, max(row) if row else 0)
+                candidates = [
+                    candidate for candidate, candidate_row in zip(tree.nodes, tree.rows)
+                    if candidate != node and all(abs(a - b) <= reach for a, b in zip(row, candidate_row))
+                ]
+                neighbours.extend(
+                    (candidate, value) for candidate, value in zip(
+                        candidates, dengraph.distance.one_to_many(dist, node, candidates)
+                    ) if value <= distance
+                )
+        return neighbours
+
+    def __add__(self, other):
+        if isinstance(self, other.__class__) and self.distance == other.distance:
+            return self.__class__(self._nodes.union(other), self.distance, self.leaf_size)
+        return NotImplemented
@@ -0,0 +1,85 @@
+class DisjointSet(object):
+    """
+    Disjoint set forest partitioning hashable items into groups
+
+    :param items: initial items, each forming a group of its own
+
+    Groups are merged via :py:meth:`union` and identified by a representative
+    item returned by :py:meth:`find`. Both operations take amortized O(α(N))
+    time by using path compression and union by rank.
+    """
+    def __init__(self, items=()):
+        self._parent = {}  # {item: parent, ...}
+        self._rank = {}  # {root: rank, ...}
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        """Add `item` as a group of its own, unless it is already known"""
+        if item not in self._parent:
+            self._parent[item] = item
+            self._rank[item] = 0
+
+    def find(self, item):
+        """
+        Get the representative of the group of `item`
+
+        :raises KeyError: if `item` was never added
+        """
+        parent = self._parent
+        root = parent[item]
+        while parent[root] != root:
+            root = parent[root]
+        # compress the path, pointing all items directly to their root
+        while item != root:
+            next_item = parent[item]
+            parent[item] = root
+            item = next_item
+        return root
+
+    def find_many(self, items):
+        """
+        Get the set of representatives of the groups of all `items`
+
+        :raises KeyError: if any item was never added
+        """
+        # items of the same group mostly share their parent, so only few are searched
+        return set(map(self.find, set(map(self._parent.__getitem__, items))))
+
+    def union(self, item_a, item_b):
+        """
+        Merge the groups of `item_a` and `item_b`
+
+        :return: the representative of the merged group
+        :raises KeyError: if either item was never added
+        """
+        root_a, root_b = self.find(item_a), self.find(item_b)
+        if root_a == root_b:
+            return root_a
+        rank_a, rank_b = self._rank[root_a], self._rank[root_b]
+        if rank_a < rank_b:
+            root_a, root_b = root_b, root_a
+        elif rank_a == rank_b:
+            self._rank[root_a] += 1
+        self._parent[root_b] = root_a
+        del self._rank[root_b]
+        return root_a
+
+    def groups(self):
+        """Get all groups as a mapping `{representative: [item, item, ...], ...}`"""
+        groups = {}
+        for item in self._parent:
+            groups.setdefault(self.find(item), []).append(item)
+        return groups
+
+    def __contains__(self, item):
+        return item in self._parent
+
+    def __len__(self):
+        return len(self._parent)
+
+    def __iter__(self):
+        return iter(self._parent)
+
+    def __repr__(self):
+        return '%s(groups=%d, items=%d)' % (self.__class__.__name__, len(self._rank), len(self._parent))
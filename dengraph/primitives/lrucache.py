@@ -0,0 +1,96 @@
+import collections
+
+
+#: statistics of a cache, as returned by :py:meth:`LRUCache.info`
+CacheInfo = collections.namedtuple('CacheInfo', ['hits', 'misses', 'max_size', 'size'])
+
+
+class LRUCache(object):
+    """
+    Mapping of limited size, evicting the least recently used items
+
+    :param max_size: maximum number of items, or :py:const:`None` for no limit
+
+    Lookups via :py:meth:`get` count as hits or misses, and mark an item as
+    recently used. Storing an item beyond `max_size` evicts the item which
+    has been used least recently. Both take O(1) time.
+    """
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._data = collections.OrderedDict()  # {key: value, ...} from least to most recently used
+        try:
+            self._mark_used = self._data.move_to_end
+        except AttributeError:  # pragma: no cover
+            self._mark_used = self._reinsert
+
+    def _reinsert(self, key):
+        self._data[key] = self._data.pop(key)
+
+    def get(self, key, default=None):
+        """Get the value of `key` or `default`, counting the lookup as a hit or miss"""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.hits += 1
+        if self.max_size is not None:
+            self._mark_used(key)
+        return value
+
+    def __setitem__(self, key, value):
+        data = self._data
+        data[key] = value
+        if self.max_size is not None:
+            self._mark_used(key)
+            while len(data) > self.max_size:
+                data.popitem(last=False)
+
+    def get_many(self, keys, default=None):
+        """Get a list of the values of all `keys`, like :py:meth:`get` for each key"""
+        data = self._data
+        values = [data.get(key, default) for key in keys]
+        misses = sum(1 for value in values if value is default)
+        self.misses += misses
+        self.hits += len(values) - misses
+        if self.max_size is not None:
+            for key, value in zip(keys, values):
+                if value is not default:
+                    self._mark_used(key)
+        return values
+
+    def update(self, items):
+        """Store all `(key, value)` pairs of `items`, like item assignment for each pair"""
+        if self.max_size is None:
+            self._data.update(items)
+        else:
+            for key, value in items:
+                self[key] = value
+
+    def pop(self, key, default=None):
+        """Remove `key` and return its value, or `default` if it is not cached"""
+        return self._data.pop(key, default)
+
+    def clear(self):
+        """Remove all items, keeping the statistics"""
+        self._data.clear()
+
+    def info(self):
+        """Get the :py:data:`CacheInfo` of hits, misses, maximum and current size"""
+        return CacheInfo(self.hits, self.misses, self.max_size, len(self._data))
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __repr__(self):
+        return '%s(max_size=%r, size=%d, hits=%d, misses=%d)' % (
+            self.__class__.__name__, self.max_size, len(self._data), self.hits, self.misses
+        )
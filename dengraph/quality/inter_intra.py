@@ -1,3 +1,6 @@
+import dengraph.distance
+
+
 def inter_cluster_mean_score(cluster, graph, mean=None):
     """
     The method is based on the calculation of distances for each sample in a given cluster to
@@ -9,13 +12,11 @@ def inter_cluster_mean_score(cluster, graph, mean=None):
     :param mean: A precalculated centroid for given cluster
     :return: Mean distances within the given cluster to its centroid
     """
-    distance = 0
     if cluster:
         if mean is None:
             mean = graph.distance.mean(list(cluster))
-        for node in cluster:
-            distance += graph.distance(mean, node)
-        return distance / float(len(list(cluster)))
+        distances = dengraph.distance.one_to_many(graph.distance, mean, list(cluster))
+        return sum(distances) / float(len(distances))
     raise ValueError
 
 
@@ -52,7 +53,7 @@ def inter_cluster_variance(clusters, graph):
         result = 0
         for cluster in clusters:
             cluster_mean = graph.distance.mean(list(cluster))
-            for node in cluster:
-                result += graph.distance(cluster_mean, node)**2
+            for distance in dengraph.distance.one_to_many(graph.distance, cluster_mean, list(cluster)):
+                result += distance**2
         return result
     return float("inf")
@@ -0,0 +1,25 @@
+"""
+Benchmarks for :py:mod:`dengraph`
+
+Each module of this package can be run as a script to print its timings,
+e.g. `python -m dengraph_benchmarks.bench_array_graph`.
+"""
+from __future__ import print_function
+import time
+
+from dengraph.utilities.pretty import str_time
+
+
+def timed(call, *args, **kwargs):
+    """Run `call(*args, **kwargs)` and return its result and runtime in seconds"""
+    start_time = time.time()
+    result = call(*args, **kwargs)
+    return result, time.time() - start_time
+
+
+def report(label, seconds, count=None):
+    """Print the runtime of a benchmark, optionally as throughput for `count` operations"""
+    if count is None:
+        print('%-40s %s' % (label, str_time(seconds)))
+    else:
+        print('%-40s %s  (%8.0f / s)' % (label, str_time(seconds), count / seconds if seconds else float('inf')))
@@ -0,0 +1,39 @@
+"""
+Materializing adjacency graphs from symmetric and asymmetric distance graphs
+"""
+from __future__ import print_function
+import random
+
+from dengraph.graph import ANY_DISTANCE
+from dengraph.graphs.adjacency_graph import AdjacencyGraph
+from dengraph.graphs.distance_graph import DistanceGraph
+from dengraph.distances.minkowski_distance import MinkowskiDistance
+
+from dengraph_benchmarks import timed, report
+
+
+class CountingDistance(MinkowskiDistance):
+    """Minkowski distance counting how often it is computed"""
+    def __init__(self, p=2):
+        super(CountingDistance, self).__init__(p)
+        self.calls = 0
+
+    def __call__(self, first, second, default=None):
+        self.calls += 1
+        return super(CountingDistance, self).__call__(first, second, default)
+
+
+def main(count=1000, cluster_distance=0.05):
+    nodes = list({(random.random(), random.random()) for _ in range(count)})
+    for symmetric in (True, False):
+        for max_distance in (ANY_DISTANCE, cluster_distance):
+            distance = CountingDistance()
+            graph = DistanceGraph(nodes, distance, symmetric=symmetric)
+            label = 'AdjacencyGraph[symmetric=%s, max_distance=%s]' % (symmetric, max_distance)
+            _, seconds = timed(AdjacencyGraph, graph, max_distance)
+            report(label, seconds, len(nodes))
+            print('%-40s %d' % (label + ' distances', distance.calls))
+
+
+if __name__ == '__main__':
+    main()
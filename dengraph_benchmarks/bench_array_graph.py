@@ -0,0 +1,35 @@
+"""
+Initial clustering on vector nodes via full scan and vectorized graphs
+"""
+from __future__ import print_function
+import random
+
+from dengraph.dengraph import DenGraphIO
+from dengraph.graphs.distance_graph import DistanceGraph
+from dengraph.graphs.array_graph import ArrayDistanceGraph
+from dengraph.distances.minkowski_distance import MinkowskiDistance
+
+from dengraph_benchmarks import timed, report
+
+
+def random_points(count):
+    return [(random.random(), random.random()) for _ in range(count)]
+
+
+def main(counts=(1000, 2000, 10000, 20000)):
+    for count in counts:
+        points = random_points(count)
+        # about 10 neighbours per node on average
+        cluster_distance = (10.0 / count / 3.14) ** 0.5
+        for graph_type, graph in (
+            ('ArrayDistanceGraph', lambda: ArrayDistanceGraph(points)),
+            ('DistanceGraph', lambda: DistanceGraph(points, MinkowskiDistance())),
+        ):
+            if graph_type == 'DistanceGraph' and count > 2000:
+                continue  # O(N^2) Python distance calls
+            _, seconds = timed(DenGraphIO, graph(), cluster_distance=cluster_distance, core_neighbours=5)
+            report('%s[%d]' % (graph_type, count), seconds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Building clusters from the neighbourhoods of core nodes, compared to a breadth-first search
+"""
+from __future__ import print_function
+import random
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: no cover
+    tracemalloc = None
+
+from dengraph.dengraph import DenGraphIO
+from dengraph.graphs.adjacency_graph import AdjacencyGraph
+from dengraph.cluster import DenGraphCluster
+
+from dengraph_benchmarks import timed, report
+
+
+def ring_adjacency(count, degree):
+    """Adjacency of `count` nodes on a ring, each connected to its `degree` closest nodes"""
+    return {
+        node: {(node + offset) % count: 1 for offset in range(-degree // 2, degree // 2 + 1) if offset}
+        for node in range(count)
+    }
+
+
+def random_adjacency(count, degree):
+    """Adjacency of `count` nodes with about `degree` random neighbours each"""
+    adjacency = {node: {} for node in range(count)}
+    for node in range(count):
+        for neighbour in random.sample(range(count), degree // 2):
+            if neighbour != node:
+                adjacency[node][neighbour] = adjacency[neighbour][node] = 1
+    return adjacency
+
+
+def bfs_cluster_cores(io_graph, core_neighbourhoods):
+    """Create clusters as connected components of core nodes, as the previous breadth-first search did"""
+    io_graph._reset_clustering()
+    io_graph.noise.update(io_graph.graph)
+    core_neighbours = dict(core_neighbourhoods)
+    unclustered = set(core_neighbours)
+    for node in core_neighbours:
+        if node in unclustered:
+            cluster = DenGraphCluster(io_graph.graph)
+            unclustered.discard(node)
+            outstanding_nodes = [node]
+            while outstanding_nodes:
+                checking = outstanding_nodes.pop()
+                cluster.core_nodes.add(checking)
+                for neighbour in core_neighbours[checking]:
+                    if neighbour in unclustered:
+                        unclustered.discard(neighbour)
+                        outstanding_nodes.append(neighbour)
+                    elif neighbour not in core_neighbours:
+                        cluster.border_nodes.add(neighbour)
+            io_graph._cluster_added(cluster)
+    return io_graph.clusters
+
+
+def disjoint_set_cluster_cores(io_graph, core_neighbourhoods):
+    """Create clusters via :py:meth:`DenGraphIO._cluster_cores`"""
+    io_graph._reset_clustering()
+    io_graph.noise.update(io_graph.graph)
+    io_graph._cluster_cores(iter(core_neighbourhoods))
+    return io_graph.clusters
+
+
+def peak_memory(call, *args):
+    """Get the peak memory traced while running `call(*args)`, or `None` if tracing is not available"""
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    try:
+        call(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    for name, adjacency, core_neighbours in (
+        ('ring[4000, degree=200]', ring_adjacency(4000, 200), 5),
+        ('random[20000, degree=10]', random_adjacency(20000, 10), 5),
+    ):
+        graph = AdjacencyGraph(adjacency, symmetric=True)
+        io_graph, seconds = timed(DenGraphIO, graph, cluster_distance=1, core_neighbours=core_neighbours)
+        report('DenGraphIO %s' % name, seconds)
+        core_neighbourhoods = list(io_graph._core_neighbourhoods())
+        for label, call in (('bfs', bfs_cluster_cores), ('disjoint set', disjoint_set_cluster_cores)):
+            _, seconds = timed(call, io_graph, core_neighbourhoods)
+            report('%s %s' % (label, name), seconds)
+            memory = peak_memory(call, io_graph, core_neighbourhoods)
+            if memory is not None:
+                print('%-40s %.1f MiB' % ('%s %s memory' % (label, name), memory / 2.0 ** 20))
+
+
+if __name__ == '__main__':
+    main()
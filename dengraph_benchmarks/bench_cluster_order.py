@@ -0,0 +1,38 @@
+"""
+Insertion into a clustering with many clusters, with lazy and eager cluster ordering
+"""
+from __future__ import print_function
+import random
+
+from dengraph.dengraph import DenGraphIO
+from dengraph.graphs.kdtree_graph import KDTreeGraph
+
+from dengraph_benchmarks import timed, report
+
+
+class EagerOrderDenGraphIO(DenGraphIO):
+    """Clustering which sorts its clusters after every insertion"""
+    def __setitem__(self, key, value):
+        super(EagerOrderDenGraphIO, self).__setitem__(key, value)
+        self.clusters
+
+
+def insert_all(io_graph, nodes):
+    for node in nodes:
+        io_graph[node] = {}
+
+
+def main(cluster_counts=(1000, 10000), inserts=2000):
+    for cluster_count in cluster_counts:
+        # clusters of three nodes each, far apart from each other
+        nodes = [(10.0 * cluster + offset,) for cluster in range(cluster_count) for offset in (0, 1, 2)]
+        new_nodes = [(10.0 * random.randrange(cluster_count) + random.random() * 2,) for _ in range(inserts)]
+        for io_class in (EagerOrderDenGraphIO, DenGraphIO):
+            io_graph = io_class(KDTreeGraph(nodes), cluster_distance=1.5, core_neighbours=2)
+            assert len(io_graph.clusters) == cluster_count
+            _, seconds = timed(insert_all, io_graph, new_nodes)
+            report('%s[%d clusters]' % (io_class.__name__, cluster_count), seconds, inserts)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Memory and query speed of the adjacency graph variants
+"""
+from __future__ import print_function
+import array
+import random
+import sys
+
+from dengraph.dengraph import DenGraphIO
+from dengraph.graphs.adjacency_graph import AdjacencyGraph, SortedAdjacencyGraph
+from dengraph.graphs.compact_adjacency_graph import CompactAdjacencyGraph
+
+from dengraph_benchmarks import timed, report
+
+
+def deep_size(obj, seen=None):
+    """Size of `obj` and all containers and values it references, in bytes"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(key, seen) + deep_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deep_size(item, seen) for item in obj)
+    elif not isinstance(obj, (array.array, int, float, str)) and hasattr(obj, '__dict__'):
+        size += deep_size(vars(obj), seen)
+    return size
+
+
+def random_adjacency(count, degree):
+    adjacency = {node: {} for node in range(count)}
+    for node in range(count):
+        for _ in range(degree // 2):
+            neighbour = random.randrange(count)
+            if neighbour != node:
+                adjacency[node][neighbour] = adjacency[neighbour][node] = random.random()
+    return adjacency
+
+
+def main(count=20000, degree=20):
+    adjacency = random_adjacency(count, degree)
+    edges = sum(len(neighbours) for neighbours in adjacency.values())
+    for graph_cls in (AdjacencyGraph, SortedAdjacencyGraph, CompactAdjacencyGraph):
+        graph, seconds = timed(graph_cls, adjacency, symmetric=True)
+        name = '%s[%d edges]' % (graph_cls.__name__, edges)
+        report(name + ' create', seconds)
+        print('%-40s %.1f MiB  (%5.1f bytes / edge)' % (
+            name + ' memory', deep_size(graph) / 2.0 ** 20, float(deep_size(graph)) / edges
+        ))
+        _, seconds = timed(graph.get_neighbours_many, list(graph), 0.5)
+        report(name + ' get_neighbours_many', seconds, len(graph))
+        _, seconds = timed(graph.neighbour_counts, list(graph), 0.5)
+        report(name + ' neighbour_counts', seconds, len(graph))
+        nodes = list(graph)
+        edge_queries = [(random.choice(nodes), random.choice(nodes)) for _ in range(100000)]
+        _, seconds = timed(lambda: [slice(*edge) in graph for edge in edge_queries])
+        report(name + ' edge lookup', seconds, len(edge_queries))
+        _, seconds = timed(DenGraphIO, graph, cluster_distance=0.2, core_neighbours=4)
+        report(name + ' DenGraphIO', seconds)
+
+
+if __name__ == '__main__':
+    main()
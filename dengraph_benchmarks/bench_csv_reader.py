@@ -0,0 +1,31 @@
+"""
+Reading distance matrices from CSV with literal and numeric parsing
+"""
+from __future__ import print_function
+import random
+
+from dengraph.graph import ANY_DISTANCE
+from dengraph.graphs import graph_io
+
+from dengraph_benchmarks import timed, report
+
+
+def random_matrix_csv(size):
+    return [','.join('%.4f' % random.random() for _ in range(size)) for _ in range(size)]
+
+
+def main(size=1000, processes=4):
+    lines = random_matrix_csv(size)
+    for max_distance in (ANY_DISTANCE, 0.1):
+        for name, literal_type in (('literal', graph_io.stripped_literal), ('numeric', float)):
+            for process_count in (1, processes):
+                _, seconds = timed(
+                    graph_io.csv_graph_reader, lines, nodes_header=False, literal_type=literal_type,
+                    max_distance=max_distance, processes=process_count
+                )
+                report('%s[%dx%d, max_distance=%s, processes=%d]' % (
+                    name, size, size, 'any' if max_distance is ANY_DISTANCE else max_distance, process_count
+                ), seconds, size * size)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""
+Neighbourhoods and clustering of distance graphs with bulk distance computation
+"""
+from __future__ import print_function
+import random
+
+from dengraph.dengraph import DenGraphIO
+from dengraph.graphs.distance_graph import DistanceGraph, CachedDistanceGraph
+from dengraph.distances.delta_distance import DeltaDistance
+from dengraph.quality.davies_bouldin import davies_bouldin_score
+
+from dengraph_benchmarks import timed, report
+
+
+def scalar_distance(first, second):
+    return abs(first - second)
+
+
+def main(count=2000, cluster_distance=0.001):
+    nodes = [random.random() for _ in range(count)]
+    for name, distance in (('scalar', scalar_distance), ('DeltaDistance', DeltaDistance())):
+        for graph_type in (DistanceGraph, CachedDistanceGraph):
+            graph = graph_type(nodes, distance, symmetric=True)
+            label = '%s[%s]' % (graph_type.__name__, name)
+            _, seconds = timed(graph.get_neighbours_many, nodes, cluster_distance)
+            report(label + ' get_neighbours_many', seconds, count)
+            graph = graph_type(nodes, distance, symmetric=True)
+            io_graph, seconds = timed(DenGraphIO, graph, cluster_distance=cluster_distance, core_neighbours=3)
+            report(label + ' DenGraphIO', seconds)
+    graph = DistanceGraph(nodes, DeltaDistance(), symmetric=True)
+    clusters = DenGraphIO(graph, cluster_distance, 3).clusters
+    _, seconds = timed(davies_bouldin_score, clusters, graph)
+    report('davies_bouldin_score[%d clusters]' % len(clusters), seconds)
+
+
+if __name__ == '__main__':
+    main()
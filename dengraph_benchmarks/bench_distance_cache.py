@@ -0,0 +1,45 @@
+"""
+Incremental clustering with unbounded and bounded distance caches
+"""
+from __future__ import print_function
+import random
+
+from dengraph.dengraph import DenGraphIO
+from dengraph.graphs.distance_graph import CachedDistanceGraph
+from dengraph.distances.delta_distance import DeltaDistance
+
+from dengraph_benchmarks import timed, report
+
+
+def churn(io_graph, nodes, changes, new_node=random.random):
+    """Replace random nodes of `io_graph` by new ones"""
+    for _ in range(changes):
+        node = nodes.pop(random.randrange(len(nodes)))
+        del io_graph[node]
+        node = new_node()
+        nodes.append(node)
+        io_graph[node] = None
+
+
+def main(count=1000, changes=200, cluster_distance=0.002):
+    nodes = [random.random() for _ in range(count)]
+    for name, cache_options in (
+        ('unbounded', {}),
+        ('cache_size=%d' % (count * 10), {'cache_size': count * 10}),
+        ('cache_distance', {'cache_distance': cluster_distance}),
+    ):
+        random.seed(1)
+        graph = CachedDistanceGraph(nodes, DeltaDistance(), symmetric=True, **cache_options)
+        label = 'CachedDistanceGraph[%s]' % name
+        io_graph, seconds = timed(DenGraphIO, graph, cluster_distance=cluster_distance, core_neighbours=3)
+        report(label + ' init', seconds)
+        _, seconds = timed(churn, io_graph, list(nodes), changes)
+        report(label + ' churn', seconds, changes)
+        print('%-40s %s' % (label + ' cache', graph.cache_info()))
+        removed = random.sample(list(graph), changes)
+        _, seconds = timed(lambda: [graph.__delitem__(node) for node in removed])
+        report(label + ' remove nodes', seconds, changes)
+
+
+if __name__ == '__main__':
+    main()
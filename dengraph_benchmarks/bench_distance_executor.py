@@ -0,0 +1,52 @@
+"""
+Materializing adjacency graphs with distances computed in thread and process pools
+"""
+from __future__ import print_function
+import concurrent.futures
+import multiprocessing
+import random
+
+from dengraph.graphs.adjacency_graph import AdjacencyGraph
+from dengraph.graphs.distance_graph import DistanceGraph
+from dengraph.distances.delta_distance import DeltaDistance
+
+from dengraph_benchmarks import timed, report
+
+
+class SlowDeltaDistance(DeltaDistance):
+    """Delta distance with additional work, as a stand-in for expensive distances"""
+    def __init__(self, work=200):
+        self.work = work
+
+    def __call__(self, x, y, default=None):
+        for _ in range(self.work):
+            pass
+        return abs(x - y)
+
+    def one_to_many(self, first, others):
+        return [self(first, other) for other in others]
+
+
+def main(count=1000, workers=None):
+    workers = workers if workers is not None else multiprocessing.cpu_count()
+    nodes = [random.random() for _ in range(count)]
+    print('%-40s %d' % ('workers', workers))
+    for name, make_executor in (
+        ('serial', lambda: None),
+        ('ThreadPoolExecutor', lambda: concurrent.futures.ThreadPoolExecutor(workers)),
+        ('ProcessPoolExecutor', lambda: concurrent.futures.ProcessPoolExecutor(workers)),
+    ):
+        executor = make_executor()
+        try:
+            graph = DistanceGraph(nodes, SlowDeltaDistance(), executor=executor)
+            _, seconds = timed(AdjacencyGraph, graph)
+            report('AdjacencyGraph[%s]' % name, seconds, count * (count - 1))
+            _, seconds = timed(graph.get_neighbours_many, nodes, 0.01)
+            report('get_neighbours_many[%s]' % name, seconds, count)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Writing and reading graphs as plain and compressed edge lists
+"""
+from __future__ import print_function
+import os
+import shutil
+import tempfile
+
+from dengraph.graphs.adjacency_graph import AdjacencyGraph
+from dengraph.graphs.graph_io import open_graph_file, edge_list_reader, edge_list_writer
+
+from dengraph_benchmarks import timed, report
+from dengraph_benchmarks.bench_compact_graph import random_adjacency
+
+
+def write(graph, path):
+    with open_graph_file(path, 'w') as graph_file:
+        edge_list_writer(graph, graph_file)
+
+
+def read(path, **kwargs):
+    with open_graph_file(path) as graph_file:
+        return edge_list_reader(graph_file, node_type=int, literal_type=float, symmetric=True, **kwargs)
+
+
+def main(count=20000, degree=20):
+    graph = AdjacencyGraph(random_adjacency(count, degree), symmetric=True)
+    edges = sum(len(graph[node]) for node in graph)
+    directory = tempfile.mkdtemp()
+    try:
+        for file_name in ('graph.edges', 'graph.edges.gz'):
+            path = os.path.join(directory, file_name)
+            name = '%s[%d edges]' % (file_name, edges)
+            _, seconds = timed(write, graph, path)
+            report(name + ' write', seconds, edges)
+            print('%-40s %.1f MiB' % (name + ' size', os.path.getsize(path) / 2.0 ** 20))
+            _, seconds = timed(read, path)
+            report(name + ' read', seconds, edges)
+            _, seconds = timed(read, path, max_distance=0.2)
+            report(name + ' read max_distance=0.2', seconds, edges)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
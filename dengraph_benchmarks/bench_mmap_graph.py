@@ -0,0 +1,45 @@
+"""
+Storing, opening and querying memory-mapped graph files
+"""
+from __future__ import print_function
+import os
+import random
+import shutil
+import tempfile
+
+from dengraph.dengraph import DenGraphIO
+from dengraph.graphs.adjacency_graph import AdjacencyGraph
+from dengraph.graphs.mmap_graph import MMapGraph, write_mmap_graph
+
+from dengraph_benchmarks import timed, report
+from dengraph_benchmarks.bench_compact_graph import random_adjacency
+
+
+def main(count=20000, degree=20):
+    graph = AdjacencyGraph(random_adjacency(count, degree), symmetric=True)
+    edges = sum(len(graph[node]) for node in graph)
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'graph.dengraph')
+        _, seconds = timed(write_mmap_graph, graph, path)
+        report('write_mmap_graph[%d edges]' % edges, seconds, edges)
+        print('%-40s %.1f MiB' % ('file size', os.path.getsize(path) / 2.0 ** 20))
+        for name, open_graph in (('AdjacencyGraph', lambda: graph), ('MMapGraph', lambda: MMapGraph(path))):
+            mapped_graph, seconds = timed(open_graph)
+            report(name + ' open', seconds)
+            nodes = list(mapped_graph)
+            _, seconds = timed(mapped_graph.get_neighbours_many, nodes, 0.5)
+            report(name + ' get_neighbours_many', seconds, len(nodes))
+            edge_queries = [(random.choice(nodes), random.choice(nodes)) for _ in range(100000)]
+            _, seconds = timed(lambda: [slice(*edge) in mapped_graph for edge in edge_queries])
+            report(name + ' edge lookup', seconds, len(edge_queries))
+            _, seconds = timed(DenGraphIO, mapped_graph, cluster_distance=0.2, core_neighbours=4)
+            report(name + ' DenGraphIO', seconds)
+            if isinstance(mapped_graph, MMapGraph):
+                mapped_graph.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
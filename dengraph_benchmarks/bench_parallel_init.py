@@ -0,0 +1,29 @@
+"""
+Initial clustering with sequential and parallel neighbourhood queries
+"""
+from __future__ import print_function
+import random
+import multiprocessing
+
+from dengraph.dengraph import DenGraphIO
+from dengraph.graphs.distance_graph import DistanceGraph
+from dengraph.distances.minkowski_distance import MinkowskiDistance
+
+from dengraph_benchmarks import timed, report
+
+
+def main(counts=(1000, 2000), processes=(1, 2, multiprocessing.cpu_count())):
+    for count in counts:
+        points = [(random.random(), random.random()) for _ in range(count)]
+        graph = DistanceGraph(points, MinkowskiDistance())
+        # about 10 neighbours per node on average
+        cluster_distance = (10.0 / count / 3.14) ** 0.5
+        for process_count in sorted(set(processes)):
+            _, seconds = timed(
+                DenGraphIO, graph, cluster_distance=cluster_distance, core_neighbours=5, processes=process_count
+            )
+            report('DistanceGraph[%d] processes=%d' % (count, process_count), seconds)
+
+
+if __name__ == '__main__':
+    main()
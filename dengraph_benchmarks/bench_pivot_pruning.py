@@ -0,0 +1,50 @@
+"""
+Clustering with and without pivot pruning for metric distances
+"""
+from __future__ import print_function
+import random
+
+from dengraph.dengraph import DenGraphIO
+from dengraph.graphs.distance_graph import DistanceGraph
+from dengraph.distances.delta_distance import DeltaDistance
+from dengraph.distances.minkowski_distance import MinkowskiDistance
+
+from dengraph_benchmarks import timed, report
+from dengraph_benchmarks.bench_distance_cache import churn
+
+
+class CountingDistance(MinkowskiDistance):
+    """Euclidean distance counting its calls, as a stand-in for expensive metrics"""
+    calls = 0
+
+    def __call__(self, first, second, default=None):
+        self.calls += 1
+        return super(CountingDistance, self).__call__(first, second)
+
+
+def random_points(count):
+    """Create `count` 3-d points around a few centers"""
+    return [
+        tuple(random.gauss(center, 1) for center in random.choice(((0, 0, 0), (10, 0, 5), (5, 5, 5))))
+        for _ in range(count)
+    ]
+
+
+def main(count=2000, changes=100):
+    points = random_points(count)
+    floats = [random.random() for _ in range(count)]
+    for pivots in (0, 8):
+        distance = CountingDistance()
+        graph = DistanceGraph(points, distance, symmetric=True, pivots=pivots)
+        _, seconds = timed(DenGraphIO, graph, cluster_distance=0.5, core_neighbours=5)
+        report('DenGraphIO[Minkowski, pivots=%d]' % pivots, seconds)
+        print('%-40s %d' % ('distance calls', distance.calls))
+        graph = DistanceGraph(floats, DeltaDistance(), symmetric=True, pivots=pivots)
+        io_graph, seconds = timed(DenGraphIO, graph, cluster_distance=0.002, core_neighbours=3)
+        report('DenGraphIO[Delta, pivots=%d]' % pivots, seconds)
+        _, seconds = timed(churn, io_graph, list(floats), changes)
+        report('DenGraphIO[Delta, pivots=%d] churn' % pivots, seconds, changes)
+
+
+if __name__ == '__main__':
+    main()
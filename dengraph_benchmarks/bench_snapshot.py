@@ -0,0 +1,29 @@
+"""
+Restoring a clustering from a snapshot compared to the initial clustering
+"""
+from __future__ import print_function
+import io
+
+from dengraph.dengraph import DenGraphIO
+from dengraph.graphs.adjacency_graph import AdjacencyGraph
+
+from dengraph_benchmarks import timed, report
+from dengraph_benchmarks.bench_compact_graph import random_adjacency
+
+
+def main(count=100000, degree=10):
+    graph = AdjacencyGraph(random_adjacency(count, degree), symmetric=True)
+    io_graph, seconds = timed(DenGraphIO, graph, cluster_distance=0.3, core_neighbours=3)
+    report('DenGraphIO[%d nodes] init' % count, seconds)
+    snapshot = io.BytesIO()
+    _, seconds = timed(io_graph.snapshot, snapshot)
+    report('DenGraphIO[%d nodes] snapshot' % count, seconds)
+    print('%-40s %.1f MiB' % ('snapshot size', len(snapshot.getvalue()) / 2.0 ** 20))
+    snapshot.seek(0)
+    restored, seconds = timed(DenGraphIO.restore, graph, snapshot)
+    report('DenGraphIO[%d nodes] restore' % count, seconds)
+    assert restored == io_graph
+
+
+if __name__ == '__main__':
+    main()
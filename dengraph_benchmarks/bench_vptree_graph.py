@@ -0,0 +1,36 @@
+"""
+Clustering with a vantage-point tree compared to scanning and other indices
+"""
+from __future__ import print_function
+
+from dengraph.dengraph import DenGraphIO
+from dengraph.graphs.distance_graph import DistanceGraph
+from dengraph.graphs.kdtree_graph import KDTreeGraph
+from dengraph.graphs.vptree_graph import VPTreeGraph
+
+from dengraph_benchmarks import timed, report
+from dengraph_benchmarks.bench_distance_cache import churn
+from dengraph_benchmarks.bench_pivot_pruning import CountingDistance, random_points
+
+
+def main(count=5000, changes=200):
+    points = random_points(count)
+    for name, make_graph in (
+        ('DistanceGraph[pivots=8]', lambda distance: DistanceGraph(points, distance, pivots=8)),
+        ('KDTreeGraph', lambda distance: KDTreeGraph(points, distance)),
+        ('VPTreeGraph', lambda distance: VPTreeGraph(points, distance)),
+    ):
+        distance = CountingDistance()
+        graph, seconds = timed(make_graph, distance)
+        report(name + ' build', seconds)
+        io_graph, seconds = timed(DenGraphIO, graph, cluster_distance=0.5, core_neighbours=5)
+        report(name + ' DenGraphIO', seconds)
+        print('%-40s %d' % ('distance calls', distance.calls))
+        distance.calls = 0
+        _, seconds = timed(churn, io_graph, list(points), changes, lambda: random_points(1)[0])
+        report(name + ' churn', seconds, changes)
+        print('%-40s %d' % ('distance calls', distance.calls))
+
+
+if __name__ == '__main__':
+    main()
@@ -7,7 +7,7 @@ import matplotlib
 
 from dengraph_examples.distributions import Circle2D, Checkers, Moon, Gaussian
 from dengraph.utilities.pretty import str_time
-from dengraph.graphs import adjacency_graph, distance_graph
+from dengraph.graphs import kdtree_graph
 from dengraph.dengraph import DenGraphIO
 
 
@@ -75,16 +75,10 @@ if __name__ == "__main__":
             print('Generated %6d  points in %s' % (len(points), str_time(done_time - start_time)))
             # create graph
             start_time = time.time()
-            graph = adjacency_graph.AdjacencyGraph(
-                distance_graph.DistanceGraph(
-                    nodes=points,
-                    distance=lambda point_a, point_b:
-                        math.sqrt((point_a[0] - point_b[0]) ** 2 + (point_a[1] - point_b[1]) ** 2)
-                )
-            )
+            graph = kdtree_graph.KDTreeGraph(nodes=points)
             done_time = time.time()
             graph_time = done_time - start_time
-            print('Generated %6d^2 edges in %s' % (len(points), str_time(graph_time)))
+            print('Indexed   %6d  points in %s' % (len(points), str_time(graph_time)))
             # guess clustering settings
             # one percent of points make a cluster
             distance = 0.05
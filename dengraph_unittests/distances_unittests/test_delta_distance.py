@@ -1,5 +1,8 @@
+import datetime
+import random
 import unittest
 
+import dengraph.distance
 from dengraph.distances.delta_distance import DeltaDistance
 
 
@@ -39,3 +42,27 @@ class TestDeltaDistance(unittest.TestCase):
     def test_median_exception_with_default(self):
         distance = DeltaDistance()
         self.assertIsNone(distance.median(default=None))
+
+    def test_one_to_many(self):
+        distance = DeltaDistance()
+        for others in (
+            [random.randint(-100, 100) for _ in range(length)] for length in (0, 5, 100)
+        ):
+            for first in (3, 2.5, -2 ** 62, 2 ** 70):
+                for nodes in (others, [other * 1.5 for other in others], [other * 2 ** 62 for other in others]):
+                    expected = [distance(first, other) for other in nodes]
+                    result = distance.one_to_many(first, iter(nodes))
+                    self.assertEqual(expected, result)
+                    self.assertEqual([type(value) for value in expected], [type(value) for value in result])
+        now = datetime.datetime.now()
+        self.assertEqual([datetime.timedelta(0)] * 100, distance.one_to_many(now, [now] * 100))
+        with self.assertRaises(TypeError):
+            distance.one_to_many(1, [(1, 2)] * 100)
+
+    def test_pairwise(self):
+        distance = DeltaDistance()
+        self.assertEqual([[2, 3], [1, 2]], distance.pairwise([1, 2], iter([3, 4])))
+        self.assertEqual([[0, 1], [1, 0]], distance.pairwise(range(2), range(2)))
+
+    def test_plain_function(self):
+        self.assertEqual([1, 2], dengraph.distance.one_to_many(lambda first, second: abs(first - second), 0, [1, 2]))
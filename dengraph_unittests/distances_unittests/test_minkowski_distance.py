@@ -0,0 +1,34 @@
+import unittest
+
+from dengraph.distances.minkowski_distance import MinkowskiDistance
+
+
+class TestMinkowskiDistance(unittest.TestCase):
+    def test_distance(self):
+        self.assertEqual(5, MinkowskiDistance()((0, 0), (3, 4)))
+        self.assertEqual(7, MinkowskiDistance(1)((0, 0), (3, -4)))
+        self.assertEqual(4, MinkowskiDistance(float('inf'))((0, 0), (3, 4)))
+        self.assertAlmostEqual(2 ** (1 / 3.), MinkowskiDistance(3)((0, 0), (1, 1)))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            MinkowskiDistance(0.5)
+
+    def test_mean(self):
+        distance = MinkowskiDistance()
+        self.assertEqual((1.5, 2.5), distance.mean([(1, 2), (2, 3)]))
+        self.assertEqual((1.5, 2.5), distance.mean((1, 2), (2, 3)))
+        with self.assertRaises(ValueError):
+            distance.mean()
+        self.assertIsNone(distance.mean(default=None))
+
+    def test_median(self):
+        distance = MinkowskiDistance()
+        self.assertEqual((2, 3), distance.median([(1, 5), (2, 3), (3, 1)]))
+        with self.assertRaises(ValueError):
+            distance.median([])
+        self.assertIsNone(distance.median([], default=None))
+
+    def test_equality(self):
+        self.assertEqual(MinkowskiDistance(), MinkowskiDistance(2))
+        self.assertNotEqual(MinkowskiDistance(1), MinkowskiDistance(2))
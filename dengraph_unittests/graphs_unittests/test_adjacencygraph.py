@@ -279,6 +279,36 @@ class TestAdjacencyGraph(unittest.TestCase):
         with self.assertRaises(dengraph.graph.NoSuchNode):
             graph.get_neighbours(9)
 
+    def test_neighbours_many(self):
+        for content in self.make_content_samples():
+            graph = self.graph_cls(source=content, symmetric=True)
+            for distance in (dengraph.graph.ANY_DISTANCE, 0, 0.25, 0.5, 1.0):
+                neighbours = graph.get_neighbours_many(list(graph), distance)
+                counts = graph.neighbour_counts(list(graph), distance)
+                self.assertEqual(set(graph), set(neighbours))
+                for node in graph:
+                    self.assertEqual(set(graph.get_neighbours(node, distance)), neighbours[node])
+                    self.assertEqual(len(neighbours[node]), counts[node])
+            with self.assertRaises(dengraph.graph.NoSuchNode):
+                graph.get_neighbours_many([-1])
+            with self.assertRaises(dengraph.graph.NoSuchNode):
+                graph.neighbour_counts([-1], 0.5)
+
+    def test_neighbour_distances(self):
+        for content in self.make_content_samples():
+            graph = self.graph_cls(source=content, symmetric=True)
+            for distance in (dengraph.graph.ANY_DISTANCE, 0, 0.25, 0.5, 1.0):
+                neighbour_distances = graph.get_neighbour_distances(list(graph), distance)
+                self.assertEqual(set(graph), set(neighbour_distances))
+                for node in graph:
+                    self.assertEqual(set(graph.get_neighbours(node, distance)), set(neighbour_distances[node]))
+                    for neighbour, value in neighbour_distances[node].items():
+                        self.assertEqual(graph[node:neighbour], value)
+                copy = dengraph.graphs.adjacency_graph.AdjacencyGraph(graph, distance, symmetric=True)
+                self.assertEqual(neighbour_distances, {node: copy[node] for node in copy})
+            with self.assertRaises(dengraph.graph.NoSuchNode):
+                graph.get_neighbour_distances([-1], 0.5)
+
 
 class TestBoundedAdjacencyGraph(TestAdjacencyGraph):
     #: distance graph class to test
@@ -308,3 +338,51 @@ class TestBoundedAdjacencyGraph(TestAdjacencyGraph):
         graph[9] = {}
         graph[9:1] = 1
         self.assertEqual(1, graph[1:9])
+
+
+class TestSortedAdjacencyGraph(TestAdjacencyGraph):
+    #: distance graph class to test
+    graph_cls = dengraph.graphs.adjacency_graph.SortedAdjacencyGraph
+
+    def assertSorted(self, graph):
+        for node in graph:
+            distances, neighbours = graph._sorted[node]
+            self.assertEqual(sorted(distances), distances)
+            self.assertEqual(graph[node], dict(zip(neighbours, distances)))
+
+    def test_modification(self):
+        for symmetric in (True, False):
+            for content in self.make_content_samples(distance_range=4):
+                content = {
+                    node: {other: int(distance) for other, distance in content[node].items() if other != node}
+                    for node in content
+                }
+                graph = self.graph_cls(source=content, symmetric=symmetric)
+                self.assertSorted(graph)
+                nodes = list(graph)
+                for _ in range(len(nodes)):
+                    node_a, node_b = random.choice(nodes), random.choice(nodes)
+                    if node_a == node_b:
+                        continue
+                    elif slice(node_a, node_b) in graph and random.random() < 0.5:
+                        del graph[node_a:node_b]
+                    else:
+                        graph[node_a:node_b] = random.randint(0, 4)
+                self.assertSorted(graph)
+                node = random.choice(nodes)
+                graph[node] = {other: random.randint(0, 4) for other in random.sample(nodes, 3) if other != node}
+                self.assertSorted(graph)
+                for node in random.sample(nodes, len(nodes) // 2):
+                    del graph[node]
+                self.assertSorted(graph)
+                for distance in (dengraph.graph.ANY_DISTANCE, 0, 1, 2.5):
+                    counts = graph.neighbour_counts(graph, distance)
+                    for node in graph:
+                        self.assertEqual(
+                            {
+                                other for other, other_distance in graph[node].items()
+                                if distance is dengraph.graph.ANY_DISTANCE or other_distance <= distance
+                            },
+                            set(graph.get_neighbours(node, distance))
+                        )
+                        self.assertEqual(len(set(graph.get_neighbours(node, distance))), counts[node])
@@ -0,0 +1,156 @@
+import random
+import itertools
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import dengraph.graphs.distance_graph
+import dengraph.graphs.array_graph
+from dengraph.graph import NoSuchNode, NoSuchEdge
+from dengraph.dengraph import DenGraphIO
+from dengraph.distances.minkowski_distance import MinkowskiDistance
+
+from dengraph_unittests.utility import unittest
+
+
+def cosine_distance(node_a, node_b):
+    norm = MinkowskiDistance()(node_a, [0] * len(node_a)) * MinkowskiDistance()(node_b, [0] * len(node_b))
+    if norm == 0:
+        return 1
+    return 1 - sum(a * b for a, b in zip(node_a, node_b)) / norm
+
+
+@unittest.skipIf(numpy is None, 'requires numpy')
+class TestArrayDistanceGraph(unittest.TestCase):
+    #: distance graph class to test
+    graph_cls = dengraph.graphs.array_graph.ArrayDistanceGraph
+    #: reference distances for metrics
+    metrics = {
+        'euclidean': MinkowskiDistance(2),
+        'manhattan': MinkowskiDistance(1),
+        'chebyshev': MinkowskiDistance(float('inf')),
+        'cosine': cosine_distance,
+    }
+
+    @staticmethod
+    def random_points(count, dimensions=2):
+        return list({tuple(random.random() for _ in range(dimensions)) for _ in range(count)})
+
+    def make_point_samples(self, counts=(1, 5, 50)):
+        yield [(0, 0), (0, 1), (1, 0), (1, 1), (5, 5)]
+        for count in counts:
+            for dimensions in (1, 2, 3):
+                yield self.random_points(count, dimensions)
+
+    def assertNeighbours(self, graph, reference):
+        self.assertEqual(set(graph), set(reference))
+        for distance in (0, 0.01, 0.1, 0.5, 2):
+            many = graph.get_neighbours_many(list(reference), distance)
+            counts = graph.neighbour_counts(list(reference), distance)
+            for node in reference:
+                expected = set(reference.get_neighbours(node, distance))
+                self.assertEqual(expected, set(graph.get_neighbours(node, distance)))
+                self.assertEqual(expected, many[node])
+                self.assertEqual(len(expected), counts[node])
+        for node in reference:
+            self.assertEqual(set(reference.get_neighbours(node)), set(graph.get_neighbours(node)))
+
+    def test_neighbours(self):
+        """Array Graph: neighbours match full scan"""
+        for metric, distance in self.metrics.items():
+            for points in self.make_point_samples():
+                graph = self.graph_cls(points, metric)
+                reference = dengraph.graphs.distance_graph.DistanceGraph(points, distance)
+                self.assertEqual(len(graph), len(reference))
+                self.assertNeighbours(graph, reference)
+
+    def test_blocks(self):
+        """Array Graph: batch neighbours in several blocks"""
+        points = self.random_points(100)
+        graph = self.graph_cls(points)
+        graph.block_size = 150
+        reference = dengraph.graphs.distance_graph.DistanceGraph(points, MinkowskiDistance())
+        self.assertNeighbours(graph, reference)
+
+    def test_edges(self):
+        """Array Graph: edges are distances"""
+        for metric, distance in self.metrics.items():
+            points = self.random_points(10, 3)
+            graph = self.graph_cls(points, metric)
+            for node_a, node_b in itertools.product(points, points):
+                self.assertAlmostEqual(distance(node_a, node_b), graph[node_a:node_b])
+            for node in points:
+                adjacency = graph[node]
+                self.assertEqual(set(points) - {node}, set(adjacency))
+                for other in adjacency:
+                    self.assertAlmostEqual(distance(node, other), adjacency[other])
+            with self.assertRaises(NoSuchEdge):
+                graph[points[0]:(2, 2, 2)]
+            with self.assertRaises(NoSuchNode):
+                graph[(2, 2, 2)]
+            with self.assertRaises(TypeError):
+                graph[points[0]:points[1]] = 1
+            with self.assertRaises(TypeError):
+                del graph[points[0]:points[1]]
+
+    def test_incremental(self):
+        """Array Graph: adding and removing nodes"""
+        for points in self.make_point_samples():
+            graph = self.graph_cls([])
+            reference = dengraph.graphs.distance_graph.DistanceGraph([], MinkowskiDistance())
+            for point in points:
+                graph[point] = None
+                reference[point] = None
+                self.assertIn(point, graph)
+            self.assertNeighbours(graph, reference)
+            for point in points[::2]:
+                del graph[point]
+                del reference[point]
+                self.assertNotIn(point, graph)
+                with self.assertRaises(NoSuchNode):
+                    del graph[point]
+                with self.assertRaises(NoSuchNode):
+                    graph.get_neighbours(point, 1)
+            self.assertNeighbours(graph, reference)
+            self.assertEqual(len(points) - len(points[::2]), len(graph.points))
+
+    def test_invalid(self):
+        """Array Graph: invalid metrics and nodes"""
+        with self.assertRaises(ValueError):
+            self.graph_cls([(1, 2), (1, 2, 3)])
+        with self.assertRaises(ValueError):
+            self.graph_cls([(1, 2)], metric='nonsense')
+        graph = self.graph_cls([(1, 2)])
+        with self.assertRaises(ValueError):
+            graph[(1, 2, 3)] = None
+        with self.assertRaises(NoSuchNode):
+            graph.get_neighbours_many([(1, 2), (3, 4)], 1)
+
+    def test_array_nodes(self):
+        """Array Graph: nodes from array"""
+        graph = self.graph_cls(numpy.array([[0, 0], [0, 1], [3, 4]]))
+        self.assertEqual({(0, 0), (0, 1), (3, 4)}, set(graph))
+        self.assertEqual(5, graph[(0, 0):(3, 4)])
+
+    def test_add(self):
+        """Array Graph: addition of graphs"""
+        points = self.random_points(50)
+        graph_a, graph_b = self.graph_cls(points[:25]), self.graph_cls(points[25:])
+        self.assertEqual(set(graph_a + graph_b), set(points))
+
+    def test_clustering(self):
+        """Array Graph: clustering matches full scan"""
+        points = self.random_points(300)
+        reference = DenGraphIO(
+            dengraph.graphs.distance_graph.DistanceGraph(points, MinkowskiDistance()),
+            cluster_distance=0.05,
+            core_neighbours=5
+        )
+        clustering = DenGraphIO(self.graph_cls(points), cluster_distance=0.05, core_neighbours=5)
+        self.assertEqual(reference.noise, clustering.noise)
+        self.assertEqual(
+            sorted(sorted(cluster.core_nodes) for cluster in reference),
+            sorted(sorted(cluster.core_nodes) for cluster in clustering),
+        )
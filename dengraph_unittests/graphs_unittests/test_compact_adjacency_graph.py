@@ -0,0 +1,97 @@
+import random
+
+import dengraph.graph
+import dengraph.dengraph
+import dengraph.graphs.adjacency_graph
+import dengraph.graphs.compact_adjacency_graph
+
+from dengraph_unittests.graphs_unittests import test_adjacencygraph
+
+
+class TestCompactAdjacencyGraph(test_adjacencygraph.TestAdjacencyGraph):
+    #: distance graph class to test
+    graph_cls = dengraph.graphs.compact_adjacency_graph.CompactAdjacencyGraph
+
+    @staticmethod
+    def without_loops(content):
+        return {node: {other: distance for other, distance in content[node].items() if other != node} for node in content}
+
+    def assertSameGraph(self, graph, reference):
+        self.assertEqual(set(reference), set(graph))
+        self.assertEqual(len(reference), len(graph))
+        for node in reference:
+            self.assertEqual(reference[node], graph[node])
+            for distance in (dengraph.graph.ANY_DISTANCE, 0.5):
+                self.assertEqual(
+                    set(reference.get_neighbours(node, distance)), set(graph.get_neighbours(node, distance))
+                )
+
+    def test_modification(self):
+        for content in self.make_content_samples():
+            content = self.without_loops(content)
+            reference = dengraph.graphs.adjacency_graph.AdjacencyGraph(source=content, symmetric=True)
+            graph = self.graph_cls(source=content, symmetric=True)
+            self.assertSameGraph(graph, reference)
+            nodes = list(reference)
+            for _ in range(len(nodes)):
+                node_a, node_b = random.choice(nodes), random.choice(nodes)
+                if node_a == node_b:
+                    continue
+                if slice(node_a, node_b) in reference:
+                    del reference[node_a:node_b]
+                    del graph[node_a:node_b]
+                else:
+                    reference[node_a:node_b] = graph[node_a:node_b] = random.random()
+                self.assertEqual(slice(node_a, node_b) in reference, slice(node_a, node_b) in graph)
+            self.assertSameGraph(graph, reference)
+            for node in random.sample(nodes, len(nodes) // 2):
+                del reference[node]
+                del graph[node]
+                self.assertNotIn(node, graph)
+            self.assertSameGraph(graph, reference)
+            # re-added nodes must not inherit edges of removed ones
+            for node in nodes:
+                if node not in reference:
+                    reference[node] = graph[node] = None
+            self.assertSameGraph(graph, reference)
+            graph.compact()
+            self.assertSameGraph(graph, reference)
+
+    def test_compact(self):
+        graph = self.graph_cls(
+            source={idx: {other: 1 for other in (idx - 1, idx + 1) if 0 <= other < 100} for idx in range(100)},
+            symmetric=True
+        )
+        self.assertFalse(graph._rows)
+        graph[0:1] = 2
+        self.assertEqual({0, 1}, set(graph._rows))
+        del graph[50]
+        self.assertEqual({48}, set(graph.get_neighbours(49)))
+        self.assertEqual({52}, set(graph.get_neighbours(51)))
+        graph.compact()
+        self.assertFalse(graph._rows)
+        self.assertEqual(99, len(graph._nodes))
+        self.assertEqual(2, graph[1:0])
+        self.assertEqual({48}, set(graph.get_neighbours(49)))
+        self.assertEqual({52}, set(graph.get_neighbours(51)))
+        self.assertNotIn(50, graph)
+        # modifications are compacted automatically
+        for idx in range(0, 46, 2):
+            graph[idx:idx + 2] = 2
+        self.assertLessEqual(len(graph._rows), graph.compact_ratio * len(graph) + 1)
+        self.assertEqual(2, graph[40:42])
+
+    def test_clustering(self):
+        content = self.without_loops(self.random_content(200, connections=600))
+        reference, io_graph = (
+            dengraph.dengraph.DenGraphIO(
+                base_graph=graph_cls(source=content, symmetric=True),
+                cluster_distance=0.3,
+                core_neighbours=3
+            ) for graph_cls in (dengraph.graphs.adjacency_graph.AdjacencyGraph, self.graph_cls)
+        )
+        self.assertEqual(reference, io_graph)
+        removed = list(content)[::5]
+        reference.update(remove=removed)
+        io_graph.update(remove=removed)
+        self.assertEqual(reference, io_graph)
@@ -1,8 +1,19 @@
 import random
 import itertools
+import pickle
+import datetime
 
+try:
+    import concurrent.futures
+except ImportError:  # pragma: no cover
+    concurrent = None
 
+
+import dengraph.graph
+import dengraph.dengraph
+import dengraph.graphs.adjacency_graph
 import dengraph.graphs.distance_graph
+import dengraph.distances.minkowski_distance
 from dengraph.graph import NoSuchNode, NoSuchEdge
 from dengraph.distances.delta_distance import DeltaDistance
 
@@ -222,6 +233,68 @@ class TestDistanceGraph(unittest.TestCase):
                 }
             )
 
+    def test_neighbours_many(self):
+        """Distance Graph: get neighbours of several nodes"""
+        for nodes in self.make_node_samples():
+            graph = self.graph_cls(nodes, self.distance_cls())
+            for distance in (dengraph.graph.ANY_DISTANCE, 0, 1, 5, 20):
+                neighbours = graph.get_neighbours_many(nodes[::2], distance)
+                counts = graph.neighbour_counts(nodes[::2], distance)
+                self.assertEqual(set(nodes[::2]), set(neighbours))
+                for node in nodes[::2]:
+                    self.assertEqual(set(graph.get_neighbours(node, distance)), neighbours[node])
+                    self.assertEqual(len(neighbours[node]), counts[node])
+            for node in (object(), None, max(nodes) + 1, min(nodes) - 1):
+                with self.assertRaises(NoSuchNode):
+                    graph.get_neighbours_many([nodes[0], node], 1)
+
+    def test_neighbours_many_symmetric(self):
+        """Distance Graph: neighbours of several nodes compute each distance once"""
+        calls = []
+
+        def distance(node_a, node_b):
+            calls.append((node_a, node_b))
+            return abs(node_a - node_b)
+
+        nodes = list(range(20))
+        graph = self.graph_cls(nodes, distance, symmetric=True)
+        graph.get_neighbours_many(nodes, 2)
+        self.assertEqual(len(nodes) * (len(nodes) - 1) // 2, len(calls))
+
+    def test_neighbour_distances(self):
+        """Distance Graph: get edges of several nodes"""
+        for symmetric in (True, False):
+            for nodes in self.make_node_samples():
+                graph = self.graph_cls(nodes, self.distance_cls(), symmetric=symmetric)
+                for distance in (dengraph.graph.ANY_DISTANCE, 0, 1, 5, 20):
+                    neighbour_distances = graph.get_neighbour_distances(nodes[::2], distance)
+                    self.assertEqual(set(nodes[::2]), set(neighbour_distances))
+                    for node in nodes[::2]:
+                        self.assertEqual(set(graph.get_neighbours(node, distance)), set(neighbour_distances[node]))
+                        for neighbour, value in neighbour_distances[node].items():
+                            self.assertEqual(graph[node:neighbour], value)
+                with self.assertRaises(NoSuchNode):
+                    graph.get_neighbour_distances([nodes[0], max(nodes) + 1], 1)
+
+    def test_adjacency_symmetric(self):
+        """Distance Graph: adjacency of symmetric graphs computes each distance once"""
+        calls = []
+
+        def distance(node_a, node_b):
+            calls.append((node_a, node_b))
+            return abs(node_a - node_b)
+
+        nodes = list(range(20))
+        for max_distance in (dengraph.graph.ANY_DISTANCE, 2):
+            del calls[:]
+            graph = self.graph_cls(nodes, distance, symmetric=True)
+            adjacency = dengraph.graphs.adjacency_graph.AdjacencyGraph(graph, max_distance, symmetric=True)
+            self.assertEqual(len(nodes) * (len(nodes) - 1) // 2, len(calls))
+            for node in nodes:
+                self.assertEqual(set(graph.get_neighbours(node, max_distance)), set(adjacency.get_neighbours(node)))
+                for neighbour in adjacency.get_neighbours(node):
+                    self.assertEqual(abs(node - neighbour), adjacency[node:neighbour])
+
     def test_exception(self):
         graph = self.graph_cls(
             nodes=[],
@@ -232,6 +305,110 @@ class TestDistanceGraph(unittest.TestCase):
         with self.assertRaises(NoSuchNode):
             del graph[1]
 
+    def test_bulk_distance(self):
+        """Distance Graph: bulk distance computation"""
+        class BulkDistance(self.distance_cls):
+            def __init__(self):
+                self.calls = 0
+
+            def one_to_many(self, first, others):
+                self.calls += 1
+                return super(BulkDistance, self).one_to_many(first, others)
+
+        for symmetric in (True, False):
+            with self.subTest(symmetric=symmetric):
+                for nodes in self.make_node_samples():
+                    distance = BulkDistance()
+                    graph = self.graph_cls(nodes, distance, symmetric=symmetric)
+                    reference = self.graph_cls(nodes, lambda first, second: abs(first - second), symmetric=symmetric)
+                    for node in nodes:
+                        self.assertEqual(reference[node], graph[node])
+                        self.assertEqual(set(reference.get_neighbours(node, 20)), set(graph.get_neighbours(node, 20)))
+                    self.assertEqual(reference.get_neighbours_many(nodes, 20), graph.get_neighbours_many(nodes, 20))
+                    self.assertGreater(distance.calls, 0)
+
+    def test_pivot_pruning(self):
+        """Distance Graph: prune neighbourhoods of metric distances"""
+        class CountingDistance(dengraph.distances.minkowski_distance.MinkowskiDistance):
+            calls = 0
+
+            def __call__(self, first, second, default=None):
+                self.calls += 1
+                return super(CountingDistance, self).__call__(first, second)
+
+        numpy = dengraph.graphs.distance_graph.numpy
+        for use_numpy in (True, False):
+            dengraph.graphs.distance_graph.numpy = numpy if use_numpy else None
+            try:
+                with self.subTest(numpy=use_numpy):
+                    nodes = [(random.randint(0, 100), random.randint(0, 100)) for _ in range(200)]
+                    nodes.extend([(0, 0), (0, 1), (1, 0), (3, 4)])
+                    distance = CountingDistance()
+                    graph = self.graph_cls(nodes, distance, symmetric=True)
+                    reference = self.graph_cls(nodes, CountingDistance(), symmetric=True, pivots=0)
+                    for cluster_distance in (1, 5, 20):
+                        self.assertEqual(
+                            reference.get_neighbours_many(nodes, cluster_distance),
+                            graph.get_neighbours_many(nodes, cluster_distance),
+                        )
+                        self.assertEqual(
+                            set(reference.get_neighbours((0, 0), cluster_distance)),
+                            set(graph.get_neighbours((0, 0), cluster_distance)),
+                        )
+                    self.assertLess(distance.calls, reference.distance.calls / 2)
+                    # nodes added and removed after choosing pivots
+                    for node in list(graph)[:10]:
+                        del graph[node]
+                        del reference[node]
+                    for node in ((50, 50), (50.5, 50.5), (-10, 0)):
+                        graph[node] = {}
+                        reference[node] = {}
+                    self.assertEqual(reference.get_neighbours_many(graph, 5), graph.get_neighbours_many(graph, 5))
+            finally:
+                dengraph.graphs.distance_graph.numpy = numpy
+
+    def test_datetime_nodes(self):
+        """Distance Graph: metric distances which are not real numbers"""
+        start = datetime.datetime(2017, 1, 1)
+        nodes = [start + datetime.timedelta(minutes=random.randint(0, 600)) for _ in range(100)]
+        nodes = list(set(nodes))
+        graph = self.graph_cls(nodes, DeltaDistance())
+        reference = self.graph_cls(nodes, DeltaDistance(), pivots=0)
+        cluster_distance = datetime.timedelta(minutes=2)
+        self.assertEqual(
+            reference.get_neighbours_many(nodes, cluster_distance), graph.get_neighbours_many(nodes, cluster_distance)
+        )
+        clustering = dengraph.dengraph.DenGraphIO(graph, cluster_distance, 2)
+        reference_clustering = dengraph.dengraph.DenGraphIO(reference, cluster_distance, 2)
+        self.assertEqual(
+            sorted(sorted(cluster.core_nodes) for cluster in reference_clustering),
+            sorted(sorted(cluster.core_nodes) for cluster in clustering),
+        )
+        # nodes added and removed after the first query
+        for changed_graph in (graph, reference):
+            changed_graph[start - datetime.timedelta(minutes=1)] = None
+            del changed_graph[nodes[0]]
+        self.assertEqual(
+            reference.get_neighbours_many(reference, cluster_distance),
+            graph.get_neighbours_many(graph, cluster_distance),
+        )
+
+    @unittest.skipIf(concurrent is None, 'requires concurrent.futures')
+    def test_executor(self):
+        """Distance Graph: compute distances in an executor"""
+        for executor_type in (concurrent.futures.ThreadPoolExecutor, concurrent.futures.ProcessPoolExecutor):
+            with self.subTest(executor=executor_type.__name__), executor_type(max_workers=2) as executor:
+                for nodes in self.make_node_samples(lengths=(20,)):
+                    reference = self.graph_cls(nodes, self.distance_cls())
+                    graph = self.graph_cls(nodes, self.distance_cls(), executor=executor, chunk_size=3)
+                    for node in nodes:
+                        self.assertEqual(reference[node], graph[node])
+                        self.assertEqual(set(reference.get_neighbours(node, 20)), set(graph.get_neighbours(node, 20)))
+                    self.assertEqual(reference.get_neighbours_many(nodes, 20), graph.get_neighbours_many(nodes, 20))
+                    adjacency = dengraph.graphs.adjacency_graph.AdjacencyGraph(graph)
+                    self.assertEqual({node: reference[node] for node in nodes}, {node: adjacency[node] for node in nodes})
+                    self.assertIsNone(pickle.loads(pickle.dumps(graph)).executor)
+
 
 class TestCachedDistanceGraph(TestDistanceGraph):
     #: the distance function/class with which to test
@@ -253,3 +430,87 @@ class TestCachedDistanceGraph(TestDistanceGraph):
                             del graph[node_a:node_b]
                         with self.assertRaises(NoSuchEdge):
                             del graph[node_b:node_a]
+
+    def test_delitem_node_cache(self):
+        """Distance Graph: remove nodes with cached distances"""
+        for symmetric in (True, False):
+            with self.subTest(symmetric=symmetric):
+                for nodes in self.make_node_samples():
+                    graph = self.graph_cls(nodes, self.distance_cls(), symmetric=symmetric)
+                    for node_a, node_b in itertools.product(nodes, nodes):
+                        graph[node_a:node_b]
+                    for node_a, node_b in zip(nodes, reversed(nodes)):
+                        del graph[node_a:node_b]
+                    removed = random.sample(nodes, len(nodes) // 2)
+                    for node in removed:
+                        del graph[node]
+                    remaining = set(nodes) - set(removed)
+                    for node_a, node_b in itertools.product(remaining, remaining):
+                        self.assertIn(graph[node_a:node_b], (abs(node_a - node_b), float('inf')))
+                    # re-added nodes do not see stale distances
+                    for node in removed:
+                        graph[node] = {}
+                    for node_a, node_b in zip(nodes, reversed(nodes)):
+                        if node_a in removed or node_b in removed:
+                            self.assertEqual(abs(node_a - node_b), graph[node_a:node_b])
+                    for node in nodes:
+                        del graph[node]
+                    # bounded caches evict the distances of removed nodes eventually
+                    if graph.cache_info().max_size is None:
+                        self.assertEqual(0, graph.cache_info().size)
+                    self.assertEqual({}, graph._pairs)
+                    self.assertEqual(set(), graph._deleted_edges)
+
+    def test_hash_collision(self):
+        """Distance Graph: nodes with equal hash"""
+        self.assertEqual(hash(-1), hash(-2))
+        graph = self.graph_cls([-1, -2, 3], self.distance_cls(), symmetric=True)
+        self.assertEqual(1, graph[-1:-2])
+        self.assertEqual(1, graph[-2:-1])
+        self.assertEqual(1, graph.cache_info().size)
+        del graph[-2:-1]
+        self.assertEqual(float('inf'), graph[-1:-2])
+        self.assertEqual({-2: float('inf'), 3: 4}, graph[-1])
+        del graph[-1]
+        self.assertEqual(5, graph[-2:3])
+
+
+class BoundedCachedDistanceGraph(dengraph.graphs.distance_graph.CachedDistanceGraph):
+    def __init__(self, nodes, distance, symmetric=True, pivots=8, executor=None, chunk_size=256):
+        super(BoundedCachedDistanceGraph, self).__init__(
+            nodes, distance, symmetric, cache_size=5, cache_distance=10, pivots=pivots, executor=executor,
+            chunk_size=chunk_size,
+        )
+
+
+class TestBoundedCachedDistanceGraph(TestCachedDistanceGraph):
+    #: distance graph class to test
+    graph_cls = BoundedCachedDistanceGraph
+
+    def test_datetime_nodes(self):
+        self.skipTest('numeric cache_distance of test graph is not comparable to timedelta')
+
+    def test_cache(self):
+        """Distance Graph: bounded cache"""
+        graph = dengraph.graphs.distance_graph.CachedDistanceGraph(
+            range(100), self.distance_cls(), cache_size=10, cache_distance=5
+        )
+        for node in range(20):
+            self.assertEqual(node, graph[0:node])
+        info = graph.cache_info()
+        self.assertEqual((0, 20, 10, 6), info)
+        # distances beyond the cache distance are never cached
+        self.assertEqual(15, graph[0:15])
+        self.assertEqual((0, 21, 10, 6), graph.cache_info())
+        for node in range(6):
+            self.assertEqual(node, graph[node:0])
+        self.assertEqual((6, 21, 10, 6), graph.cache_info())
+        for node in range(50, 70):
+            self.assertEqual(1, graph[node:node + 1])
+        self.assertEqual(10, graph.cache_info().size)
+        # deleted edges are not evicted
+        del graph[50:51]
+        for node in range(70, 90):
+            self.assertEqual(1, graph[node:node + 1])
+        self.assertEqual(float('inf'), graph[50:51])
+        self.assertEqual(10, graph.cache_info().size)
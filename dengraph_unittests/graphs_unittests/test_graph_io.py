@@ -1,10 +1,17 @@
+import itertools
+import os
+import random
+import shutil
+import tempfile
 import textwrap
 
 
 import dengraph.graph
 import dengraph.graphs.graph_io
+import dengraph.graphs.adjacency_graph
 
 from dengraph_unittests.utility import unittest
+from dengraph_unittests.graphs_unittests import test_adjacencygraph
 
 
 class GraphIOTest(unittest.TestCase):
@@ -122,3 +129,127 @@ class GraphIOTest(unittest.TestCase):
                             graph[node_from:node_to]
                     else:
                         self.assertEqual(graph[node_from:node_to], abs(column_idx - row_idx))
+
+    def test_numeric(self):
+        """CSV GraphIO: fast numeric mode"""
+        literal = '\n'.join(
+            ','.join(str(random.choice((0, 0.5, random.random(), random.randint(1, 3)))) for _ in range(20))
+            for _ in range(20)
+        )
+        numpy = dengraph.graphs.graph_io.numpy
+        for use_numpy in (True, False):
+            dengraph.graphs.graph_io.numpy = numpy if use_numpy else None
+            try:
+                for symmetric, max_distance, valid_edge in itertools.product(
+                        (True, False), (dengraph.graph.ANY_DISTANCE, 1), (bool, lambda edge: edge != 0.5)
+                ):
+                    with self.subTest(
+                            numpy=use_numpy, symmetric=symmetric, max_distance=max_distance, valid_edge=valid_edge
+                    ):
+                        reference, graph = (
+                            dengraph.graphs.graph_io.csv_graph_reader(
+                                literal.splitlines(), nodes_header=False, literal_type=literal_type,
+                                max_distance=max_distance, valid_edge=valid_edge, symmetric=symmetric
+                            ) for literal_type in (dengraph.graphs.graph_io.stripped_literal, float)
+                        )
+                        self.assertEqual(sorted(reference), sorted(graph))
+                        for node in reference:
+                            self.assertEqual(reference[node], graph[node])
+                            self.assertTrue(all(isinstance(distance, float) for distance in graph[node].values()))
+            finally:
+                dengraph.graphs.graph_io.numpy = numpy
+
+    def test_processes(self):
+        """CSV GraphIO: parsing rows in parallel"""
+        literal = '\n'.join(
+            ','.join(str(random.choice((0, 0.5, random.random(), random.randint(1, 3)))) for _ in range(50))
+            for _ in range(50)
+        )
+        for symmetric, max_distance, literal_type, nodes_header in itertools.product(
+                (True, False), (dengraph.graph.ANY_DISTANCE, 1),
+                (dengraph.graphs.graph_io.stripped_literal, float), (False, ['N%02d' % num for num in range(50)])
+        ):
+            with self.subTest(
+                    symmetric=symmetric, max_distance=max_distance, literal_type=literal_type, nodes_header=nodes_header
+            ):
+                reference, graph = (
+                    dengraph.graphs.graph_io.csv_graph_reader(
+                        literal.splitlines(), nodes_header=nodes_header, literal_type=literal_type,
+                        max_distance=max_distance, symmetric=symmetric, processes=processes
+                    ) for processes in (1, 2)
+                )
+                self.assertEqual(list(reference), list(graph))
+                for node in reference:
+                    self.assertEqual(reference[node], graph[node])
+
+
+class EdgeListIOTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_reader(self):
+        """Edge List GraphIO: reading edges, nodes and comments"""
+        literal = textwrap.dedent("""
+        # edges of a graph
+        a b 2
+        a c 1
+
+        b c 3
+        d
+        """)
+        graph = dengraph.graphs.graph_io.edge_list_reader(literal.splitlines())
+        self.assertEqual({'a', 'b', 'c', 'd'}, set(graph))
+        self.assertEqual({'b': 2, 'c': 1}, graph['a'])
+        self.assertEqual({'c': 3}, graph['b'])
+        self.assertEqual({}, graph['c'])
+        self.assertEqual({}, graph['d'])
+        graph = dengraph.graphs.graph_io.edge_list_reader(
+            literal.splitlines(), symmetric=True, max_distance=2,
+            graph_type=dengraph.graphs.adjacency_graph.BoundedAdjacencyGraph
+        )
+        self.assertIsInstance(graph, dengraph.graphs.adjacency_graph.BoundedAdjacencyGraph)
+        self.assertEqual({'a', 'b', 'c', 'd'}, set(graph))
+        self.assertEqual({'b': 2, 'c': 1}, graph['a'])
+        self.assertEqual({'a': 2}, graph['b'])
+        self.assertEqual({'a': 1}, graph['c'])
+        self.assertEqual({}, graph['d'])
+
+    def test_roundtrip(self):
+        """Edge List GraphIO: writing and reading graphs"""
+        for symmetric in (True, False):
+            for content in test_adjacencygraph.TestAdjacencyGraph().make_content_samples():
+                content[-1] = {}  # isolated node
+                if not symmetric:
+                    content[-2] = {-1: 0.5}
+                    content[-1][-3] = 0.25
+                    content[-3] = {}
+                reference = dengraph.graphs.adjacency_graph.AdjacencyGraph(content, symmetric=symmetric)
+                for file_name in ('graph.edges', 'graph.edges.gz'):
+                    with self.subTest(symmetric=symmetric, file_name=file_name, nodes=len(reference)):
+                        path = os.path.join(self.directory, file_name)
+                        with dengraph.graphs.graph_io.open_graph_file(path, 'w') as graph_file:
+                            dengraph.graphs.graph_io.edge_list_writer(reference, graph_file)
+                        with dengraph.graphs.graph_io.open_graph_file(path) as graph_file:
+                            # lines are native strings for python 2 and python 3
+                            for line in graph_file:
+                                self.assertIsInstance(line, str)
+                        with dengraph.graphs.graph_io.open_graph_file(path) as graph_file:
+                            graph = dengraph.graphs.graph_io.edge_list_reader(
+                                graph_file, node_type=int, literal_type=float, symmetric=symmetric
+                            )
+                        self.assertEqual(set(reference), set(graph))
+                        for node in reference:
+                            self.assertEqual(reference[node], graph[node])
+                path = os.path.join(self.directory, 'bounded.edges')
+                with dengraph.graphs.graph_io.open_graph_file(path, 'w') as graph_file:
+                    dengraph.graphs.graph_io.edge_list_writer(reference, graph_file, max_distance=0.5)
+                with dengraph.graphs.graph_io.open_graph_file(path) as graph_file:
+                    graph = dengraph.graphs.graph_io.edge_list_reader(
+                        graph_file, node_type=int, literal_type=float, symmetric=symmetric
+                    )
+                self.assertEqual(set(reference), set(graph))
+                for node in reference:
+                    self.assertEqual(set(reference.get_neighbours(node, 0.5)), set(graph[node]))
@@ -0,0 +1,119 @@
+import random
+import itertools
+
+import dengraph.graphs.distance_graph
+import dengraph.graphs.grid_graph
+from dengraph.graph import NoSuchNode
+from dengraph.dengraph import DenGraphIO
+from dengraph.distances.minkowski_distance import MinkowskiDistance
+
+from dengraph_unittests.utility import unittest
+
+
+class TestGridGraph(unittest.TestCase):
+    #: distance graph class to test
+    graph_cls = dengraph.graphs.grid_graph.GridGraph
+
+    @staticmethod
+    def random_points(count, dimensions=2):
+        return list({tuple(round(random.random(), 3) for _ in range(dimensions)) for _ in range(count)})
+
+    def make_point_samples(self, counts=(1, 5, 50)):
+        yield [(0, 0), (0, 1), (1, 0), (1, 1), (5, 5), (-0.5, -0.5)]
+        for count in counts:
+            for dimensions in (1, 2, 3):
+                yield self.random_points(count, dimensions)
+
+    def assertNeighbours(self, graph, reference):
+        self.assertEqual(set(graph), set(reference))
+        for node in reference:
+            for distance in (0, 0.01, 0.1, 0.5, 2):
+                self.assertEqual(
+                    set(reference.get_neighbours(node, distance)),
+                    set(graph.get_neighbours(node, distance)),
+                )
+            self.assertEqual(set(reference.get_neighbours(node)), set(graph.get_neighbours(node)))
+        for distance in (0.1, 2):
+            self.assertEqual(
+                reference.get_neighbours_many(list(reference), distance),
+                graph.get_neighbours_many(list(reference), distance),
+            )
+            self.assertEqual(
+                reference.get_neighbour_distances(list(reference), distance),
+                graph.get_neighbour_distances(list(reference), distance),
+            )
+
+    def test_neighbours(self):
+        """Grid Graph: neighbours match full scan"""
+        for p in (1, 2, float('inf')):
+            for points in self.make_point_samples():
+                for cell_size in (0.01, 0.1, 1):
+                    distance = MinkowskiDistance(p)
+                    graph = self.graph_cls(points, cell_size, distance)
+                    reference = dengraph.graphs.distance_graph.DistanceGraph(points, distance)
+                    self.assertEqual(len(graph), len(reference))
+                    self.assertNeighbours(graph, reference)
+
+    def test_edges(self):
+        """Grid Graph: edges are distances"""
+        distance = MinkowskiDistance()
+        points = self.random_points(20)
+        graph = self.graph_cls(points, 0.1)
+        for node_a, node_b in itertools.product(points, points):
+            self.assertEqual(distance(node_a, node_b), graph[node_a:node_b])
+        with self.assertRaises(TypeError):
+            graph[points[0]:points[1]] = 1
+        with self.assertRaises(TypeError):
+            del graph[points[0]:points[1]]
+
+    def test_incremental(self):
+        """Grid Graph: adding and removing nodes"""
+        for points in self.make_point_samples():
+            graph = self.graph_cls([], 0.1)
+            reference = dengraph.graphs.distance_graph.DistanceGraph([], MinkowskiDistance())
+            for point in points:
+                graph[point] = None
+                reference[point] = None
+                self.assertIn(point, graph)
+            self.assertNeighbours(graph, reference)
+            for point in points[::2]:
+                del graph[point]
+                del reference[point]
+                self.assertNotIn(point, graph)
+                with self.assertRaises(NoSuchNode):
+                    del graph[point]
+                with self.assertRaises(NoSuchNode):
+                    graph.get_neighbours(point, 1)
+            self.assertNeighbours(graph, reference)
+
+    def test_invalid(self):
+        """Grid Graph: invalid cells and nodes"""
+        with self.assertRaises(ValueError):
+            self.graph_cls([(1, 2)], 0)
+        with self.assertRaises(ValueError):
+            self.graph_cls([(1, 2), (1, 2, 3)], 1)
+        graph = self.graph_cls([(1, 2)], 1)
+        with self.assertRaises(ValueError):
+            graph[(1, 2, 3)] = None
+
+    def test_add(self):
+        """Grid Graph: addition of graphs"""
+        points = self.random_points(50)
+        graph_a, graph_b = self.graph_cls(points[:25], 0.1), self.graph_cls(points[25:], 0.1)
+        self.assertEqual(set(graph_a + graph_b), set(points))
+        self.assertNeighbours(graph_a + graph_b, dengraph.graphs.distance_graph.DistanceGraph(points, MinkowskiDistance()))
+
+    def test_clustering(self):
+        """Grid Graph: clustering matches full scan"""
+        points = self.random_points(300)
+        reference = DenGraphIO(
+            dengraph.graphs.distance_graph.DistanceGraph(points, MinkowskiDistance()),
+            cluster_distance=0.05,
+            core_neighbours=5
+        )
+        clustering = DenGraphIO(self.graph_cls(points, 0.05), cluster_distance=0.05, core_neighbours=5)
+        self.assertEqual(reference.noise, clustering.noise)
+        self.assertEqual(
+            sorted(sorted(cluster.core_nodes) for cluster in reference),
+            sorted(sorted(cluster.core_nodes) for cluster in clustering),
+        )
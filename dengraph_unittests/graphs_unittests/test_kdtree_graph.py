@@ -0,0 +1,119 @@
+import random
+import itertools
+
+import dengraph.graphs.distance_graph
+import dengraph.graphs.kdtree_graph
+from dengraph.graph import NoSuchNode
+from dengraph.dengraph import DenGraphIO
+from dengraph.distances.minkowski_distance import MinkowskiDistance
+
+from dengraph_unittests.utility import unittest
+
+
+class TestKDTreeGraph(unittest.TestCase):
+    #: distance graph class to test
+    graph_cls = dengraph.graphs.kdtree_graph.KDTreeGraph
+
+    @staticmethod
+    def random_points(count, dimensions=2):
+        return list({tuple(round(random.random(), 3) for _ in range(dimensions)) for _ in range(count)})
+
+    def make_point_samples(self, counts=(1, 5, 50)):
+        yield [(0, 0), (0, 1), (1, 0), (1, 1), (5, 5)]
+        yield [(1, 1)] * 3 + [(1, 2)] * 3
+        for count in counts:
+            for dimensions in (1, 2, 3):
+                yield self.random_points(count, dimensions)
+
+    def assertNeighbours(self, graph, reference):
+        self.assertEqual(set(graph), set(reference))
+        for node in reference:
+            for distance in (0, 0.01, 0.1, 0.5, 2):
+                self.assertEqual(
+                    set(reference.get_neighbours(node, distance)),
+                    set(graph.get_neighbours(node, distance)),
+                )
+            self.assertEqual(set(reference.get_neighbours(node)), set(graph.get_neighbours(node)))
+        for distance in (0.1, 2):
+            self.assertEqual(
+                reference.get_neighbours_many(list(reference), distance),
+                graph.get_neighbours_many(list(reference), distance),
+            )
+            self.assertEqual(
+                reference.get_neighbour_distances(list(reference), distance),
+                graph.get_neighbour_distances(list(reference), distance),
+            )
+
+    def test_neighbours(self):
+        """KDTree Graph: neighbours match full scan"""
+        for p in (1, 2, float('inf')):
+            for points in self.make_point_samples():
+                for leaf_size in (1, 16):
+                    distance = MinkowskiDistance(p)
+                    graph = self.graph_cls(points, distance, leaf_size=leaf_size)
+                    reference = dengraph.graphs.distance_graph.DistanceGraph(points, distance)
+                    self.assertEqual(len(graph), len(reference))
+                    self.assertNeighbours(graph, reference)
+
+    def test_edges(self):
+        """KDTree Graph: edges are distances"""
+        distance = MinkowskiDistance()
+        points = self.random_points(20)
+        graph = self.graph_cls(points)
+        for node_a, node_b in itertools.product(points, points):
+            self.assertEqual(distance(node_a, node_b), graph[node_a:node_b])
+        with self.assertRaises(TypeError):
+            graph[points[0]:points[1]] = 1
+        with self.assertRaises(TypeError):
+            del graph[points[0]:points[1]]
+
+    def test_incremental(self):
+        """KDTree Graph: adding and removing nodes"""
+        for points in self.make_point_samples():
+            points = list(set(points))
+            graph = self.graph_cls([], leaf_size=2)
+            reference = dengraph.graphs.distance_graph.DistanceGraph([], MinkowskiDistance())
+            for point in points:
+                graph[point] = None
+                reference[point] = None
+                self.assertIn(point, graph)
+            self.assertNeighbours(graph, reference)
+            for point in points[::2]:
+                del graph[point]
+                del reference[point]
+                self.assertNotIn(point, graph)
+                with self.assertRaises(NoSuchNode):
+                    del graph[point]
+                with self.assertRaises(NoSuchNode):
+                    graph.get_neighbours(point, 1)
+            self.assertNeighbours(graph, reference)
+
+    def test_dimensions(self):
+        """KDTree Graph: nodes must have the same dimension"""
+        with self.assertRaises(ValueError):
+            self.graph_cls([(1, 2), (1, 2, 3)])
+        graph = self.graph_cls([(1, 2)])
+        with self.assertRaises(ValueError):
+            graph[(1, 2, 3)] = None
+
+    def test_add(self):
+        """KDTree Graph: addition of graphs"""
+        points = self.random_points(50)
+        graph_a, graph_b = self.graph_cls(points[:25]), self.graph_cls(points[25:])
+        self.assertEqual(set(graph_a + graph_b), set(points))
+        self.assertNeighbours(graph_a + graph_b, dengraph.graphs.distance_graph.DistanceGraph(points, MinkowskiDistance()))
+
+    def test_clustering(self):
+        """KDTree Graph: clustering matches full scan"""
+        points = self.random_points(300)
+        reference = DenGraphIO(
+            dengraph.graphs.distance_graph.DistanceGraph(points, MinkowskiDistance()),
+            cluster_distance=0.05,
+            core_neighbours=5
+        )
+        clustering = DenGraphIO(self.graph_cls(points), cluster_distance=0.05, core_neighbours=5)
+        self.assertEqual(reference.noise, clustering.noise)
+        self.assertEqual(
+            sorted(sorted(cluster.core_nodes) for cluster in reference),
+            sorted(sorted(cluster.core_nodes) for cluster in clustering),
+        )
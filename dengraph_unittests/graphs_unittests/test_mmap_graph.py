@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+import dengraph.graph
+import dengraph.dengraph
+import dengraph.graphs.adjacency_graph
+import dengraph.graphs.distance_graph
+import dengraph.graphs.mmap_graph
+import dengraph.distances.delta_distance
+
+from dengraph_unittests.graphs_unittests import test_adjacencygraph
+
+
+class TestMMapGraph(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'graph.dengraph')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def stored(self, graph, **kwargs):
+        dengraph.graphs.mmap_graph.write_mmap_graph(graph, self.path, **kwargs)
+        return dengraph.graphs.mmap_graph.MMapGraph(self.path)
+
+    def assertSameGraph(self, graph, reference):
+        self.assertEqual(list(reference), list(graph))
+        self.assertEqual(len(reference), len(graph))
+        for node in reference:
+            self.assertIn(node, graph)
+            self.assertEqual(reference[node], graph[node])
+            for distance in (dengraph.graph.ANY_DISTANCE, 0.5):
+                self.assertEqual(
+                    set(reference.get_neighbours(node, distance)), set(graph.get_neighbours(node, distance))
+                )
+            for neighbour in reference:
+                self.assertEqual(slice(node, neighbour) in reference, slice(node, neighbour) in graph)
+                if slice(node, neighbour) in reference:
+                    self.assertEqual(reference[node:neighbour], graph[node:neighbour])
+                else:
+                    with self.assertRaises(dengraph.graph.NoSuchEdge):
+                        graph[node:neighbour]
+        nodes = list(reference)
+        self.assertEqual(reference.get_neighbours_many(nodes, 0.5), graph.get_neighbours_many(nodes, 0.5))
+        self.assertEqual(reference.neighbour_counts(nodes, 0.5), graph.neighbour_counts(nodes, 0.5))
+
+    def test_adjacency(self):
+        for content in test_adjacencygraph.TestAdjacencyGraph().make_content_samples():
+            reference = dengraph.graphs.adjacency_graph.AdjacencyGraph(source=content, symmetric=True)
+            with self.stored(reference) as graph:
+                self.assertTrue(graph.symmetric)
+                self.assertSameGraph(graph, reference)
+                with self.assertRaises(dengraph.graph.NoSuchNode):
+                    graph['not a node']
+                with self.assertRaises(dengraph.graph.NoSuchNode):
+                    graph.get_neighbours('not a node')
+                with self.assertRaises(TypeError):
+                    graph[next(iter(reference))] = {}
+
+    def test_max_distance(self):
+        reference = dengraph.graphs.distance_graph.DistanceGraph(
+            nodes=[float(idx) for idx in range(20)],
+            distance=dengraph.distances.delta_distance.DeltaDistance(),
+            symmetric=True,
+        )
+        with self.stored(reference, max_distance=2) as graph:
+            self.assertEqual({1.0: 1, 2.0: 2}, graph[0.0])
+            self.assertEqual({8.0, 9.0, 11.0, 12.0}, set(graph.get_neighbours(10.0)))
+            self.assertEqual({9.0, 11.0}, set(graph.get_neighbours(10.0, 1)))
+            self.assertNotIn(slice(0.0, 3.0), graph)
+
+    def test_empty(self):
+        with self.stored(dengraph.graphs.adjacency_graph.AdjacencyGraph()) as graph:
+            self.assertEqual(0, len(graph))
+            self.assertEqual([], list(graph))
+
+    def test_invalid(self):
+        with open(self.path, 'wb') as graph_file:
+            graph_file.write(b'not a graph file, but long enough for a header')
+        with self.assertRaises(ValueError):
+            dengraph.graphs.mmap_graph.MMapGraph(self.path)
+
+    def test_clustering(self):
+        content = test_adjacencygraph.TestAdjacencyGraph.random_content(200, connections=600)
+        reference = dengraph.graphs.adjacency_graph.AdjacencyGraph(source=content, symmetric=True)
+        with self.stored(reference) as graph:
+            self.assertEqual(
+                dengraph.dengraph.DenGraphIO(base_graph=reference, cluster_distance=0.3, core_neighbours=3),
+                dengraph.dengraph.DenGraphIO(base_graph=graph, cluster_distance=0.3, core_neighbours=3),
+            )
@@ -0,0 +1,192 @@
+import random
+import itertools
+import datetime
+
+import dengraph.distance
+import dengraph.graphs.distance_graph
+import dengraph.graphs.vptree_graph
+from dengraph.graph import NoSuchNode
+from dengraph.dengraph import DenGraphIO
+from dengraph.distances.delta_distance import DeltaDistance
+from dengraph.distances.minkowski_distance import MinkowskiDistance
+
+from dengraph_unittests.utility import unittest
+
+
+class CountingDistance(MinkowskiDistance):
+    """Minkowski distance counting how often it is computed"""
+    def __init__(self, p=2):
+        super(CountingDistance, self).__init__(p)
+        self.calls = 0
+
+    def __call__(self, first, second, default=None):
+        self.calls += 1
+        return super(CountingDistance, self).__call__(first, second, default)
+
+
+class TestVPTreeGraph(unittest.TestCase):
+    #: distance graph class to test
+    graph_cls = dengraph.graphs.vptree_graph.VPTreeGraph
+
+    @staticmethod
+    def random_points(count, dimensions=2):
+        return list({tuple(round(random.random(), 3) for _ in range(dimensions)) for _ in range(count)})
+
+    def make_point_samples(self, counts=(1, 5, 50)):
+        yield [(0, 0), (0, 1), (1, 0), (1, 1), (5, 5)]
+        yield [(1, 1)] * 3 + [(1, 2)] * 3
+        for count in counts:
+            for dimensions in (1, 2, 3):
+                yield self.random_points(count, dimensions)
+
+    def assertNeighbours(self, graph, reference):
+        self.assertEqual(set(graph), set(reference))
+        for node in reference:
+            for distance in (0, 0.01, 0.1, 0.5, 2):
+                self.assertEqual(
+                    set(reference.get_neighbours(node, distance)),
+                    set(graph.get_neighbours(node, distance)),
+                )
+            self.assertEqual(set(reference.get_neighbours(node)), set(graph.get_neighbours(node)))
+        for distance in (0.1, 2):
+            self.assertEqual(
+                reference.get_neighbours_many(list(reference), distance),
+                graph.get_neighbours_many(list(reference), distance),
+            )
+            self.assertEqual(
+                reference.get_neighbour_distances(list(reference), distance),
+                graph.get_neighbour_distances(list(reference), distance),
+            )
+
+    def test_neighbours(self):
+        """VPTree Graph: neighbours match full scan"""
+        for p in (1, 2, float('inf')):
+            for points in self.make_point_samples():
+                for leaf_size in (1, 16):
+                    distance = MinkowskiDistance(p)
+                    graph = self.graph_cls(points, distance, leaf_size=leaf_size)
+                    reference = dengraph.graphs.distance_graph.DistanceGraph(points, distance, pivots=0)
+                    self.assertEqual(len(graph), len(reference))
+                    self.assertNeighbours(graph, reference)
+
+    def test_scalar_nodes(self):
+        """VPTree Graph: nodes which are not vectors"""
+        nodes = [random.randint(-1000, 1000) for _ in range(200)]
+        graph = self.graph_cls(nodes, DeltaDistance(), leaf_size=4)
+        reference = dengraph.graphs.distance_graph.DistanceGraph(nodes, DeltaDistance(), pivots=0)
+        for node in nodes:
+            for distance in (0, 1, 10, 100):
+                self.assertEqual(
+                    set(reference.get_neighbours(node, distance)),
+                    set(graph.get_neighbours(node, distance)),
+                )
+
+    def test_datetime_nodes(self):
+        """VPTree Graph: metric distances which are not real numbers"""
+        start = datetime.datetime(2017, 1, 1)
+        nodes = list({start + datetime.timedelta(minutes=random.randint(0, 600)) for _ in range(200)})
+        graph = self.graph_cls(nodes, DeltaDistance(), leaf_size=4)
+        reference = dengraph.graphs.distance_graph.DistanceGraph(nodes, DeltaDistance(), pivots=0)
+        for distance in (datetime.timedelta(0), datetime.timedelta(minutes=2), datetime.timedelta(hours=1)):
+            self.assertEqual(reference.get_neighbours_many(nodes, distance), graph.get_neighbours_many(nodes, distance))
+        node = start - datetime.timedelta(minutes=1)
+        graph[node] = None
+        reference[node] = None
+        self.assertEqual(
+            set(reference.get_neighbours(node, datetime.timedelta(minutes=5))),
+            set(graph.get_neighbours(node, datetime.timedelta(minutes=5))),
+        )
+
+    def test_metric(self):
+        """VPTree Graph: distance must be a metric"""
+        with self.assertRaises(ValueError):
+            self.graph_cls([1, 2, 3], lambda first, second: abs(first - second))
+        with self.assertRaises(ValueError):
+            self.graph_cls([1, 2, 3], dengraph.distance.Distance())
+        with self.assertRaises(ValueError):
+            self.graph_cls([1, 2, 3], DeltaDistance(), leaf_size=0)
+
+    def test_edges(self):
+        """VPTree Graph: edges are distances"""
+        distance = MinkowskiDistance()
+        points = self.random_points(20)
+        graph = self.graph_cls(points, distance)
+        for node_a, node_b in itertools.product(points, points):
+            self.assertEqual(distance(node_a, node_b), graph[node_a:node_b])
+        with self.assertRaises(TypeError):
+            graph[points[0]:points[1]] = 1
+        with self.assertRaises(TypeError):
+            del graph[points[0]:points[1]]
+
+    def test_incremental(self):
+        """VPTree Graph: adding and removing nodes"""
+        for points in self.make_point_samples():
+            points = list(set(points))
+            graph = self.graph_cls([], MinkowskiDistance(), leaf_size=2)
+            reference = dengraph.graphs.distance_graph.DistanceGraph([], MinkowskiDistance(), pivots=0)
+            for point in points:
+                graph[point] = None
+                reference[point] = None
+                self.assertIn(point, graph)
+            self.assertNeighbours(graph, reference)
+            for point in points[::2]:
+                del graph[point]
+                del reference[point]
+                self.assertNotIn(point, graph)
+                with self.assertRaises(NoSuchNode):
+                    del graph[point]
+                with self.assertRaises(NoSuchNode):
+                    graph.get_neighbours(point, 1)
+            self.assertNeighbours(graph, reference)
+            for point in points[::2]:
+                graph[point] = None
+                reference[point] = None
+            self.assertNeighbours(graph, reference)
+
+    def test_add(self):
+        """VPTree Graph: addition of graphs"""
+        points = self.random_points(50)
+        graph_a = self.graph_cls(points[:25], MinkowskiDistance())
+        graph_b = self.graph_cls(points[25:], MinkowskiDistance())
+        self.assertEqual(set(graph_a + graph_b), set(points))
+        self.assertNeighbours(graph_a + graph_b, dengraph.graphs.distance_graph.DistanceGraph(points, MinkowskiDistance()))
+
+    def test_distance_calls(self):
+        """VPTree Graph: queries compute few distances"""
+        points = self.random_points(1000)
+        distance = CountingDistance()
+        graph = self.graph_cls(points, distance)
+        distance.calls = 0
+        for point in points[:100]:
+            list(graph.get_neighbours(point, 0.05))
+        self.assertLess(distance.calls, 100 * len(points) / 4)
+
+    def test_clustering(self):
+        """VPTree Graph: clustering matches full scan"""
+        points = self.random_points(300)
+        reference = DenGraphIO(
+            dengraph.graphs.distance_graph.DistanceGraph(points, MinkowskiDistance()),
+            cluster_distance=0.05,
+            core_neighbours=5
+        )
+        clustering = DenGraphIO(self.graph_cls(points, MinkowskiDistance()), cluster_distance=0.05, core_neighbours=5)
+        self.assertEqual(reference.noise, clustering.noise)
+        self.assertEqual(
+            sorted(sorted(cluster.core_nodes) for cluster in reference),
+            sorted(sorted(cluster.core_nodes) for cluster in clustering),
+        )
+        nodes = list(points)
+        for _ in range(20):
+            node = nodes.pop(random.randrange(len(nodes)))
+            del reference[node]
+            del clustering[node]
+            node = (round(random.random(), 3), round(random.random(), 3))
+            if node not in nodes:
+                nodes.append(node)
+                reference[node] = None
+                clustering[node] = None
+        self.assertEqual(reference.noise, clustering.noise)
+        self.assertEqual(
+            sorted(sorted(cluster.core_nodes) for cluster in reference),
+            sorted(sorted(cluster.core_nodes) for cluster in clustering),
+        )
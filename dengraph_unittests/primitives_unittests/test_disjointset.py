@@ -0,0 +1,60 @@
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from dengraph.primitives import disjointset
+
+
+class TestDisjointSet(unittest.TestCase):
+    def test_init(self):
+        groups = disjointset.DisjointSet(range(5))
+        self.assertEqual(len(groups), 5)
+        for item in range(5):
+            self.assertIn(item, groups)
+            self.assertEqual(groups.find(item), item)
+        self.assertNotIn(5, groups)
+        with self.assertRaises(KeyError):
+            groups.find(5)
+
+    def test_union(self):
+        groups = disjointset.DisjointSet(range(10))
+        for item in range(0, 8, 2):
+            groups.union(item, item + 2)
+        groups.union(1, 3)
+        self.assertEqual(groups.find(0), groups.find(8))
+        self.assertEqual(groups.find(1), groups.find(3))
+        self.assertNotEqual(groups.find(0), groups.find(1))
+        self.assertEqual(groups.union(2, 6), groups.find(4))
+        self.assertEqual(
+            sorted(sorted(members) for members in groups.groups().values()),
+            [[0, 2, 4, 6, 8], [1, 3], [5], [7], [9]]
+        )
+
+    def test_add(self):
+        groups = disjointset.DisjointSet()
+        groups.add('a')
+        groups.add('b')
+        groups.union('a', 'b')
+        # adding known items must not split groups
+        groups.add('a')
+        self.assertEqual(groups.find('a'), groups.find('b'))
+        self.assertEqual(sorted(groups), ['a', 'b'])
+
+    def test_path_compression(self):
+        groups = disjointset.DisjointSet('abcd')
+        # union by rank never creates long paths, so build one directly
+        groups._parent.update({'a': 'b', 'b': 'c', 'c': 'd'})
+        self.assertEqual(groups.find('a'), 'd')
+        self.assertEqual({item: 'd' for item in 'abcd'}, groups._parent)
+
+    def test_find_many(self):
+        groups = disjointset.DisjointSet(range(10))
+        for item in range(0, 8, 2):
+            groups.union(item, item + 2)
+        groups.union(1, 3)
+        self.assertEqual(groups.find_many([0, 4, 8]), {groups.find(0)})
+        self.assertEqual(groups.find_many([0, 1, 3, 5]), {groups.find(0), groups.find(1), 5})
+        self.assertEqual(groups.find_many([]), set())
+        with self.assertRaises(KeyError):
+            groups.find_many([0, 10])
@@ -0,0 +1,56 @@
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from dengraph.primitives import lrucache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_unbounded(self):
+        cache = lrucache.LRUCache()
+        for item in range(100):
+            cache[item] = item * 2
+        self.assertEqual(len(cache), 100)
+        for item in range(100):
+            self.assertIn(item, cache)
+            self.assertEqual(cache.get(item), item * 2)
+        self.assertIsNone(cache.get(100))
+        self.assertEqual(cache.info(), (100, 1, None, 100))
+
+    def test_eviction(self):
+        cache = lrucache.LRUCache(max_size=3)
+        for item in range(3):
+            cache[item] = item
+        # using 0 makes 1 the least recently used item
+        self.assertEqual(cache.get(0), 0)
+        cache[3] = 3
+        self.assertEqual(sorted(cache), [0, 2, 3])
+        # updating 2 makes 0 the least recently used item
+        cache[2] = 4
+        cache[5] = 5
+        self.assertEqual(sorted(cache), [2, 3, 5])
+        self.assertEqual(cache.get(2), 4)
+        self.assertEqual(cache.get(1, 'default'), 'default')
+        self.assertEqual(cache.info(), (2, 1, 3, 3))
+
+    def test_pop(self):
+        cache = lrucache.LRUCache(max_size=3)
+        cache[1] = 1
+        self.assertEqual(cache.pop(1), 1)
+        self.assertIsNone(cache.pop(1))
+        self.assertNotIn(1, cache)
+        cache[1] = 1
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_bulk(self):
+        for max_size in (None, 3):
+            cache = lrucache.LRUCache(max_size=max_size)
+            cache.update((item, item * 2) for item in range(3))
+            self.assertEqual(sorted(cache), [0, 1, 2])
+            self.assertEqual(cache.get_many([0, 5, 2], 'default'), [0, 'default', 4])
+            self.assertEqual(cache.info(), (2, 1, max_size, 3))
+            # using 0 and 2 makes 1 the least recently used item
+            cache.update([(3, 6)])
+            self.assertEqual(sorted(cache), [0, 1, 2, 3] if max_size is None else [0, 2, 3])
@@ -0,0 +1,112 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from dengraph.dengraph import DenGraphIO
+from dengraph.changelog import ChangeLog
+from dengraph.graphs.distance_graph import CachedDistanceGraph
+from dengraph.distances.delta_distance import DeltaDistance
+
+
+class TestChangeLog(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.directory, 'clustering.log')
+        self.snapshot_path = os.path.join(self.directory, 'clustering.snapshot')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    @staticmethod
+    def make_graph(nodes):
+        return CachedDistanceGraph(nodes=nodes, distance=DeltaDistance(), symmetric=True)
+
+    def make_changes(self, io_graph, nodes):
+        """Apply random changes to `io_graph` and `nodes`, returning the number of changes"""
+        changes = 0
+        for node in random.sample(nodes, 5):
+            del io_graph[node]
+            nodes.remove(node)
+            changes += 1
+        for node in set(random.randint(0, 100) for _ in range(5)) - set(nodes):
+            io_graph[node] = {}
+            nodes.append(node)
+            changes += 1
+        remove = random.sample(nodes, 5)
+        add = set(random.randint(0, 100) for _ in range(5)) - set(nodes)
+        io_graph.update(add=add, remove=iter(remove))
+        nodes[:] = list(set(nodes) - set(remove) | add)
+        return changes + 1
+
+    def test_recover(self):
+        for _ in range(5):
+            nodes = list(set(random.randint(0, 100) for _ in range(60)))
+            io_graph = DenGraphIO(self.make_graph(nodes), cluster_distance=2, core_neighbours=3)
+            io_graph.change_log = ChangeLog(self.log_path)
+            io_graph.change_log.compact(io_graph, self.snapshot_path)
+            snapshot_nodes = list(nodes)
+            changes = self.make_changes(io_graph, nodes)
+            self.assertEqual(changes, len(list(ChangeLog.read(self.log_path))))
+            io_graph.change_log.close()
+            recovered = ChangeLog.recover(self.make_graph(snapshot_nodes), self.snapshot_path, self.log_path)
+            self.assertEqual(io_graph, recovered)
+            self.assertEqual(DenGraphIO(self.make_graph(nodes), cluster_distance=2, core_neighbours=3), recovered)
+            # compacting clears the log
+            recovered.change_log = ChangeLog(self.log_path)
+            self.assertEqual(changes, len(list(ChangeLog.read(self.log_path))))
+            recovered.change_log.compact(recovered, self.snapshot_path)
+            self.assertEqual(0, len(list(ChangeLog.read(self.log_path))))
+            recovered.change_log.close()
+            os.remove(self.log_path)
+
+    def test_partial_record(self):
+        nodes = list(range(0, 40, 2))
+        io_graph = DenGraphIO(self.make_graph(nodes), cluster_distance=2, core_neighbours=2)
+        io_graph.change_log = ChangeLog(self.log_path)
+        io_graph.change_log.compact(io_graph, self.snapshot_path)
+        del io_graph[10]
+        io_graph.change_log.close()
+        with open(self.log_path, 'ab') as log_file:
+            log_file.write(b'\xff\x00\x00\x00incomplete')
+        self.assertEqual([('del', 10)], list(ChangeLog.read(self.log_path)))
+        # new records are appended after the last complete record
+        io_graph.change_log = ChangeLog(self.log_path)
+        io_graph[10] = {}
+        io_graph.change_log.close()
+        self.assertEqual([('del', 10), ('set', 10, {})], list(ChangeLog.read(self.log_path)))
+        recovered = ChangeLog.recover(self.make_graph(nodes), self.snapshot_path, self.log_path)
+        self.assertEqual(io_graph, recovered)
+
+    def test_interrupted_compaction(self):
+        nodes = list(range(0, 40, 2))
+        io_graph = DenGraphIO(self.make_graph(nodes), cluster_distance=2, core_neighbours=2)
+        io_graph.change_log = ChangeLog(self.log_path)
+        io_graph.change_log.compact(io_graph, self.snapshot_path)
+        del io_graph[10]
+        del io_graph[20]
+        with open(self.log_path, 'rb') as log_file:
+            log_data = log_file.read()
+        io_graph.change_log.compact(io_graph, self.snapshot_path)
+        io_graph.change_log.close()
+        # crash after writing the snapshot, but before clearing the log
+        with open(self.log_path, 'wb') as log_file:
+            log_file.write(log_data)
+        recovered = ChangeLog.recover(
+            self.make_graph([node for node in nodes if node not in (10, 20)]), self.snapshot_path, self.log_path
+        )
+        self.assertEqual(io_graph, recovered)
+
+    def test_replay_unlogged(self):
+        nodes = list(range(0, 40, 2))
+        io_graph = DenGraphIO(self.make_graph(nodes), cluster_distance=2, core_neighbours=2)
+        io_graph.change_log = ChangeLog(self.log_path)
+        del io_graph[10]
+        io_graph.change_log.close()
+        replayed = DenGraphIO(self.make_graph(nodes), cluster_distance=2, core_neighbours=2)
+        replayed.change_log = ChangeLog(os.path.join(self.directory, 'other.log'))
+        self.assertEqual(1, ChangeLog.replay(replayed, self.log_path))
+        self.assertEqual(io_graph, replayed)
+        self.assertEqual([], list(ChangeLog.read(replayed.change_log.path)))
+        replayed.change_log.close()
@@ -4,6 +4,7 @@ import dengraph.graph
 
 from dengraph.cluster import DenGraphCluster, FrozenDenGraphCluster, GraphError
 from dengraph.graphs.distance_graph import DistanceGraph
+from dengraph.graphs.adjacency_graph import AdjacencyGraph
 from dengraph.distances.delta_distance import DeltaDistance
 
 
@@ -51,6 +52,20 @@ class TestDenGraphCluster(unittest.TestCase):
         with self.assertRaises(dengraph.graph.NoSuchEdge):
             cluster[3:2]
 
+    def test_adjacency(self):
+        cluster = DenGraphCluster(graph=DistanceGraph(
+            nodes=[1,2,3,4],
+            distance=DeltaDistance(),
+            symmetric=True
+        ))
+        cluster.categorize_node(1, cluster.CORE_NODE)
+        cluster.categorize_node(2, cluster.CORE_NODE)
+        cluster.categorize_node(4, cluster.BORDER_NODE)
+        adjacency = AdjacencyGraph(cluster)
+        self.assertEqual({1: {2: 1, 4: 3}, 2: {1: 1, 4: 2}, 4: {1: 3, 2: 2}}, {node: adjacency[node] for node in adjacency})
+        adjacency = AdjacencyGraph(cluster, max_distance=2)
+        self.assertEqual({1: {2: 1}, 2: {1: 1, 4: 2}, 4: {2: 2}}, {node: adjacency[node] for node in adjacency})
+
     def test_set(self):
         cluster = DenGraphCluster(graph=DistanceGraph(
             nodes=[1,2,3,4],
@@ -8,10 +8,12 @@ import sys
 import io
 
 import dengraph.graph
+import dengraph.dengraph
 import dengraph.graphs.graph_io
 
 from dengraph.dengraph import DenGraphIO
 from dengraph.graphs.distance_graph import CachedDistanceGraph
+from dengraph.graphs.adjacency_graph import AdjacencyGraph
 
 import dengraph_unittests
 
@@ -626,6 +628,323 @@ class TestDenGraphIO(unittest.TestCase):
         del io_graph["1"]
         self.assertEqual(validation_io_graph, io_graph)
 
+    def assertClusterIndex(self, io_graph):
+        """Assert that the node to cluster lookups of `io_graph` match its clusters"""
+        core_cluster, node_clusters = {}, {}
+        for cluster in io_graph.clusters:
+            for node in cluster.core_nodes:
+                core_cluster[node] = cluster
+            for node in cluster:
+                node_clusters.setdefault(node, set()).add(cluster)
+        self.assertEqual(set(core_cluster), set(io_graph._core_cluster))
+        for node, cluster in core_cluster.items():
+            self.assertIs(cluster, io_graph.core_cluster_for_node(node))
+        self.assertEqual(set(node_clusters), set(io_graph._node_clusters))
+        for node, clusters in node_clusters.items():
+            self.assertEqual(
+                {id(cluster) for cluster in clusters},
+                {id(cluster) for cluster in io_graph.clusters_for_node(node)}
+            )
+            self.assertIn(node, io_graph)
+
+    def test_cluster_index(self):
+        nodes = [1, 2, 3, 4, 5, 6, 9, 14, 15, 16, 17, 18, 19, 20]
+        io_graph = self._validation_graph_for_nodes(
+            nodes=nodes,
+            distance=self.distance_cls,
+            cluster_distance=5,
+            core_neighbours=5
+        )
+        self.assertClusterIndex(io_graph)
+        with self.assertRaises(dengraph.dengraph.NoSuchCluster):
+            io_graph.core_cluster_for_node(9)
+        self.assertEqual(2, len(list(io_graph.clusters_for_node(9))))
+        # merge both clusters via new core nodes
+        for node in (10, 11, 12):
+            io_graph[node] = {}
+            self.assertClusterIndex(io_graph)
+        self.assertEqual(1, len(io_graph.clusters))
+        for node in (10, 11, 12):
+            del io_graph[node]
+            self.assertClusterIndex(io_graph)
+        io_graph._recluster(io_graph.clusters[0])
+        self.assertClusterIndex(io_graph)
+
+    def test_cluster_index_incremental(self):
+        for _ in range(5):
+            nodes = list(set(self.random_nodes(50, 10) + self.random_nodes(50, 40)))
+            random.shuffle(nodes)
+            io_graph = DenGraphIO(
+                base_graph=CachedDistanceGraph(nodes=[], distance=self.distance_cls(), symmetric=True),
+                cluster_distance=2,
+                core_neighbours=4
+            )
+            for node in nodes:
+                io_graph[node] = {}
+                self.assertClusterIndex(io_graph)
+            validation_io_graph = self._validation_graph_for_nodes(
+                nodes=nodes,
+                distance=self.distance_cls,
+                cluster_distance=2,
+                core_neighbours=4
+            )
+            self.assertClusterIndex(validation_io_graph)
+            self.assertEqual(validation_io_graph, io_graph)
+
+    def test_parallel_init(self):
+        for nodes, cluster_distance, core_neighbours in (
+            ([1, 2, 3, 4, 5, 6, 9, 14, 15, 16, 17, 18, 19, 20], 5, 5),
+            (self.random_nodes(200, 10) + self.random_nodes(200, 40), 1, 4),
+            (self.random_nodes(500, 10), 0, 2),
+            ([], 1, 1),
+        ):
+            graph = CachedDistanceGraph(nodes=nodes, distance=self.distance_cls(), symmetric=True)
+            sequential = DenGraphIO(graph, cluster_distance=cluster_distance, core_neighbours=core_neighbours)
+            for processes in (2, None):
+                parallel = DenGraphIO(
+                    graph, cluster_distance=cluster_distance, core_neighbours=core_neighbours, processes=processes
+                )
+                self.assertEqual(sequential, parallel)
+                self.assertEqual(len(sequential.clusters), len(parallel.clusters))
+                self.assertClusterIndex(parallel)
+
+    def test_cluster_cores_order(self):
+        for _ in range(5):
+            adjacency = {node: {} for node in range(60)}
+            for _ in range(100):
+                node_from, node_to = random.sample(range(60), 2)
+                adjacency[node_from][node_to] = adjacency[node_to][node_from] = 1
+            io_graph = DenGraphIO(
+                base_graph=AdjacencyGraph(adjacency, symmetric=True),
+                cluster_distance=1,
+                core_neighbours=3
+            )
+            core_neighbourhoods = list(io_graph._core_neighbourhoods())
+            # clusters are the connected components of core nodes, plus their neighbours
+            core_neighbours = dict(core_neighbourhoods)
+            unclustered, expected = set(core_neighbours), []
+            while unclustered:
+                outstanding, cores, neighbours = [unclustered.pop()], set(), set()
+                while outstanding:
+                    node = outstanding.pop()
+                    cores.add(node)
+                    neighbours.update(core_neighbours[node])
+                    outstanding.extend(core_neighbours[node] & unclustered)
+                    unclustered.difference_update(core_neighbours[node])
+                expected.append((sorted(cores), sorted(neighbours - set(core_neighbours))))
+            for _ in range(5):
+                random.shuffle(core_neighbourhoods)
+                io_graph._reset_clustering()
+                io_graph.noise.update(io_graph.graph)
+                io_graph._cluster_cores(core_neighbourhoods)
+                self.assertEqual(
+                    sorted(expected),
+                    sorted((sorted(cluster.core_nodes), sorted(cluster.border_nodes)) for cluster in io_graph.clusters)
+                )
+                self.assertClusterIndex(io_graph)
+
+    def test_cluster_cores_self_edges(self):
+        # core nodes with an edge to themselves are amongst their own neighbours
+        core_neighbourhoods = [(1, {1, 2, 5}), (2, {1, 2, 3}), (3, {2, 4}), (6, {6, 7})]
+        for _ in range(5):
+            random.shuffle(core_neighbourhoods)
+            io_graph = DenGraphIO(
+                base_graph=AdjacencyGraph({node: {} for node in range(8)}, symmetric=True),
+                cluster_distance=1,
+                core_neighbours=3
+            )
+            io_graph.noise.update(io_graph.graph)
+            io_graph._cluster_cores(iter(core_neighbourhoods))
+            self.assertEqual(
+                [([1, 2, 3], [4, 5]), ([6], [7])],
+                sorted((sorted(cluster.core_nodes), sorted(cluster.border_nodes)) for cluster in io_graph.clusters)
+            )
+            self.assertClusterIndex(io_graph)
+
+    def test_remove_random_nodes(self):
+        for _ in range(5):
+            nodes = list(set(self.random_nodes(40, 10) + self.random_nodes(40, 40)))
+            io_graph = self._validation_graph_for_nodes(
+                nodes=nodes,
+                distance=self.distance_cls,
+                cluster_distance=1,
+                core_neighbours=3
+            )
+            random.shuffle(nodes)
+            while nodes:
+                del io_graph[nodes.pop()]
+                self.assertClusterIndex(io_graph)
+                self.assertEqual(
+                    self._validation_graph_for_nodes(
+                        nodes=nodes,
+                        distance=self.distance_cls,
+                        cluster_distance=1,
+                        core_neighbours=3
+                    ),
+                    io_graph
+                )
+
+    def test_remove_random_edges(self):
+        for _ in range(5):
+            adjacency = {node: {} for node in range(40)}
+            for _ in range(120):
+                node_from, node_to = random.sample(range(40), 2)
+                adjacency[node_from][node_to] = adjacency[node_to][node_from] = 1
+            io_graph = DenGraphIO(
+                base_graph=AdjacencyGraph(adjacency, symmetric=True),
+                cluster_distance=1,
+                core_neighbours=4
+            )
+            edges = list({(min(a, b), max(a, b)) for a in adjacency for b in adjacency[a]})
+            random.shuffle(edges)
+            for node_from, node_to in edges:
+                del io_graph[node_from:node_to]
+                del adjacency[node_from][node_to], adjacency[node_to][node_from]
+                self.assertClusterIndex(io_graph)
+                self.assertEqual(
+                    DenGraphIO(
+                        base_graph=AdjacencyGraph(adjacency, symmetric=True),
+                        cluster_distance=1,
+                        core_neighbours=4
+                    ),
+                    io_graph
+                )
+
+    def test_remove_local_search(self):
+        class CountingGraph(CachedDistanceGraph):
+            queries = 0
+
+            def get_neighbours(self, node, distance=dengraph.graph.ANY_DISTANCE):
+                self.queries += 1
+                return super(CountingGraph, self).get_neighbours(node, distance)
+
+        graph = CountingGraph(nodes=range(1000), distance=self.distance_cls(), symmetric=True)
+        io_graph = DenGraphIO(base_graph=graph, cluster_distance=2, core_neighbours=2)
+        self.assertEqual(1, len(io_graph.clusters))
+        # the former neighbours of the node reconnect right away
+        graph.queries = 0
+        del io_graph[500]
+        self.assertEqual(1, len(io_graph.clusters))
+        self.assertLess(graph.queries, 20)
+        # only the smaller part is traversed when splitting
+        graph.queries = 0
+        del io_graph[10]
+        del io_graph[11]
+        self.assertEqual(2, len(io_graph.clusters))
+        self.assertLess(graph.queries, 50)
+        self.assertClusterIndex(io_graph)
+
+    def test_cluster_order(self):
+        io_graph = self._validation_graph_for_nodes(
+            nodes=[1, 2, 3, 10, 11, 12, 13, 14, 30, 31, 32, 33],
+            distance=self.distance_cls,
+            cluster_distance=1,
+            core_neighbours=2
+        )
+        self.assertEqual([3, 4, 5], [len(cluster) for cluster in io_graph.clusters])
+        self.assertIs(io_graph.clusters, io_graph.clusters)
+        for node in (4, 5, 6, 7):
+            io_graph[node] = {}
+        self.assertEqual([4, 5, 7], [len(cluster) for cluster in io_graph.clusters])
+        self.assertEqual(io_graph.clusters, list(io_graph))
+        io_graph.update(remove=[1, 2, 3])
+        self.assertEqual([4, 4, 5], [len(cluster) for cluster in io_graph.clusters])
+
+    def test_update(self):
+        for _ in range(5):
+            nodes = list(set(self.random_nodes(40, 10) + self.random_nodes(40, 40)))
+            bulk_io_graph = self._validation_graph_for_nodes(
+                nodes=nodes, distance=self.distance_cls, cluster_distance=1, core_neighbours=3
+            )
+            single_io_graph = self._validation_graph_for_nodes(
+                nodes=nodes, distance=self.distance_cls, cluster_distance=1, core_neighbours=3
+            )
+            for _ in range(5):
+                remove = random.sample(nodes, min(10, len(nodes)))
+                add = list(set(self.random_nodes(20, 10)) - set(nodes) | set(remove[:3]))
+                bulk_io_graph.update(add=add, remove=remove)
+                for node in remove:
+                    del single_io_graph[node]
+                for node in add:
+                    single_io_graph[node] = {}
+                nodes = list(set(nodes) - set(remove) | set(add))
+                self.assertClusterIndex(bulk_io_graph)
+                self.assertEqual(single_io_graph, bulk_io_graph)
+                self.assertEqual(
+                    self._validation_graph_for_nodes(
+                        nodes=nodes, distance=self.distance_cls, cluster_distance=1, core_neighbours=3
+                    ),
+                    bulk_io_graph
+                )
+
+    def test_update_edges(self):
+        adjacency = {node: {} for node in range(40)}
+        for _ in range(120):
+            node_from, node_to = random.sample(range(40), 2)
+            adjacency[node_from][node_to] = adjacency[node_to][node_from] = 1
+        io_graph = DenGraphIO(
+            base_graph=AdjacencyGraph(adjacency, symmetric=True),
+            cluster_distance=1,
+            core_neighbours=4
+        )
+        edges = list({(min(a, b), max(a, b)) for a in adjacency for b in adjacency[a]})
+        remove = [slice(*edge) for edge in random.sample(edges, 20)] + [0, 1, 2]
+        io_graph.update(remove=remove)
+        for item in remove:
+            if isinstance(item, slice):
+                adjacency[item.start].pop(item.stop, None)
+                adjacency[item.stop].pop(item.start, None)
+            else:
+                for neighbour in adjacency.pop(item):
+                    adjacency[neighbour].pop(item, None)
+        self.assertClusterIndex(io_graph)
+        self.assertEqual(
+            DenGraphIO(base_graph=AdjacencyGraph(adjacency, symmetric=True), cluster_distance=1, core_neighbours=4),
+            io_graph
+        )
+
+    def test_snapshot(self):
+        for _ in range(5):
+            nodes = list(set(self.random_nodes(40, 10) + self.random_nodes(40, 40)))
+            io_graph = self._validation_graph_for_nodes(
+                nodes=nodes, distance=self.distance_cls, cluster_distance=1, core_neighbours=3
+            )
+            snapshot = io.BytesIO()
+            io_graph.snapshot(snapshot)
+            snapshot.seek(0)
+            restored = DenGraphIO.restore(io_graph.graph, snapshot)
+            self.assertClusterIndex(restored)
+            self.assertEqual(io_graph, restored)
+            self.assertEqual(
+                [len(cluster) for cluster in io_graph.clusters], [len(cluster) for cluster in restored.clusters]
+            )
+            # restored clusterings continue incrementally
+            remove = random.sample(nodes, 10)
+            restored.update(remove=remove)
+            self.assertClusterIndex(restored)
+            self.assertEqual(
+                self._validation_graph_for_nodes(
+                    nodes=list(set(nodes) - set(remove)), distance=self.distance_cls,
+                    cluster_distance=1, core_neighbours=3
+                ),
+                restored
+            )
+
+    def test_snapshot_invalid(self):
+        io_graph = self._validation_graph_for_nodes(
+            nodes=[1, 2, 3, 10, 11, 12], distance=self.distance_cls, cluster_distance=1, core_neighbours=2
+        )
+        snapshot = io.BytesIO()
+        io_graph.snapshot(snapshot)
+        for graph_nodes in ([1, 2, 3, 10, 11], [1, 2, 3, 10, 11, 13]):
+            snapshot.seek(0)
+            with self.assertRaises(ValueError):
+                DenGraphIO.restore(
+                    CachedDistanceGraph(nodes=graph_nodes, distance=self.distance_cls(), symmetric=True), snapshot
+                )
+        with self.assertRaises(ValueError):
+            DenGraphIO.restore(io_graph.graph, io.BytesIO(b'not a snapshot'))
+
     def _validation_graph_for_nodes(self, distance, nodes, cluster_distance, core_neighbours, graph_type=CachedDistanceGraph):
         graph = graph_type(
             nodes=nodes,
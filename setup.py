@@ -53,6 +53,7 @@ if __name__ == '__main__':
         # what we need for special things
         extras_require={
             # 'feature': ['package', 'package'], 'feature': []
+            'numpy': ['numpy'],
         },
         # unit tests
         test_suite='dengraph_unittests',